@@ -71,6 +71,25 @@ DATABASES = {
     }
 }
 
+# Bancos SQLite separados (opcional). Com o caminho preenchido, ApplicationLog
+# e/ou a fila do django-background-tasks ficam em arquivos próprios, cada um
+# com sua trava de escrita, e rajadas de log ou de tarefas não bloqueiam a
+# sincronização no banco principal. Depois de configurar, rode
+# `python manage.py migrar_bancos_separados --mover-dados`.
+LOG_DB_ARQUIVO = config("LOG_DB_ARQUIVO", default="")
+TAREFAS_DB_ARQUIVO = config("TAREFAS_DB_ARQUIVO", default="")
+if LOG_DB_ARQUIVO:
+    DATABASES["logs"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": LOG_DB_ARQUIVO,
+    }
+if TAREFAS_DB_ARQUIVO:
+    DATABASES["tarefas"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": TAREFAS_DB_ARQUIVO,
+    }
+DATABASE_ROUTERS = ["sync.db_routers.BancosSeparadosRouter"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -117,8 +136,168 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Pool de conexões ODBC (sync.services.odbc_pool)
+# Tempos em segundos.
+ODBC_POOL_MAX_SIZE = config("ODBC_POOL_MAX_SIZE", default=5, cast=int)
+ODBC_POOL_MAX_IDLE_TIME = config("ODBC_POOL_MAX_IDLE_TIME", default=300, cast=int)
+ODBC_POOL_MAX_LIFETIME = config("ODBC_POOL_MAX_LIFETIME", default=1800, cast=int)
+ODBC_POOL_WAIT_TIMEOUT = config("ODBC_POOL_WAIT_TIMEOUT", default=10, cast=int)
+
+# Cache do Django: listagens ODBC (sync.services.listagem_cache), totais das
+# contagens e métricas do dashboard. Precisa ser compartilhado entre os
+# processos, porque o espelho e a sincronização em lote rodam no process_tasks
+# e invalidam as listagens servidas pelo web. CACHE_BACKEND:
+# - "arquivo" (padrão): um arquivo por entrada em CACHE_DIRETORIO;
+# - "banco": tabela CACHE_TABELA no banco principal (crie com
+#   `python manage.py createcachetable`);
+# - "memoria": um cache por processo; só serve com um único processo, pois as
+#   invalidações dos jobs não chegam ao web. As métricas do dashboard
+#   (DASHBOARD_METRICAS_TTL) também ficam por processo, o que só custa uma
+#   consulta a mais por processo.
+CACHE_BACKEND = config("CACHE_BACKEND", default="arquivo")
+CACHE_DIRETORIO = config("CACHE_DIRETORIO", default=str(BASE_DIR / "cache"))
+CACHE_TABELA = config("CACHE_TABELA", default="sync_cache")
+CACHE_MAX_ENTRADAS = config("CACHE_MAX_ENTRADAS", default=5000, cast=int)
+CACHES = {
+    "default": {
+        "BACKEND": {
+            "arquivo": "django.core.cache.backends.filebased.FileBasedCache",
+            "banco": "django.core.cache.backends.db.DatabaseCache",
+            "memoria": "django.core.cache.backends.locmem.LocMemCache",
+        }[CACHE_BACKEND],
+        "LOCATION": {
+            "arquivo": CACHE_DIRETORIO,
+            "banco": CACHE_TABELA,
+            "memoria": "sync",
+        }[CACHE_BACKEND],
+        "OPTIONS": {"MAX_ENTRIES": CACHE_MAX_ENTRADAS},
+    }
+}
+
+# Listagens paginadas via ODBC trazem o total junto com a página em uma única
+# consulta (COUNT(*) OVER()). Desative para sempre usar um COUNT(*) separado;
+# servidores que recusam a função de janela já caem nesse modo sozinhos.
+ODBC_CONTAGEM_JANELA = config("ODBC_CONTAGEM_JANELA", default=True, cast=bool)
+
+# Segundos em que o total de uma listagem ODBC (por tabela e filtro) fica em
+# cache; enquanto válido, as páginas seguintes não recontam. 0 desativa.
+ODBC_CONTAGEM_CACHE_TTL = config("ODBC_CONTAGEM_CACHE_TTL", default=120, cast=int)
+
+# Cache das páginas de listagem ODBC (sync.services.listagem_cache): por
+# LISTAGEM_CACHE_TTL segundos a página vem direto do cache; depois, por mais
+# LISTAGEM_CACHE_STALE segundos, a página antiga é servida enquanto é renovada
+# em segundo plano. LISTAGEM_CACHE_TTL=0 desativa o cache.
+LISTAGEM_CACHE_TTL = config("LISTAGEM_CACHE_TTL", default=60, cast=int)
+LISTAGEM_CACHE_STALE = config("LISTAGEM_CACHE_STALE", default=300, cast=int)
+
+# Detalhes da empresa: as listagens das abas rodam em até
+# LISTAGEM_PARALELA_THREADS threads (compartilhadas entre as requisições). A
+# aba que não terminar em LISTAGEM_PARALELA_PRAZO segundos mostra um aviso de
+# carregamento em vez de segurar a página.
+LISTAGEM_PARALELA_THREADS = config("LISTAGEM_PARALELA_THREADS", default=4, cast=int)
+LISTAGEM_PARALELA_PRAZO = config("LISTAGEM_PARALELA_PRAZO", default=8, cast=float)
+
+# Métricas do dashboard (sync.services.dashboard_metricas_service): calculadas
+# com uma consulta agregada e guardadas no cache do Django (CACHE_BACKEND) por
+# DASHBOARD_METRICAS_TTL segundos (0 = calcular a cada acesso).
+DASHBOARD_METRICAS_TTL = config("DASHBOARD_METRICAS_TTL", default=30, cast=int)
+
+# Carimbo de versão da configuração ODBC ativa (sync.services.odbc_config_registry).
+# Reescrito a cada alteração de ODBCConfiguration para que todos os processos
+# (web e process_tasks) recarreguem a configuração sem reiniciar.
+ODBC_CONFIG_STAMP_FILE = config(
+    "ODBC_CONFIG_STAMP_FILE", default=str(BASE_DIR / "odbc_config.stamp")
+)
+
+# Sincronização em lote de fornecedores (sync.services.sincronizacao_lote_service):
+# quantidade de fornecedores lidos do ODBC e enfileirados por vez.
+SINCRONIZACAO_LOTE_TAMANHO = config("SINCRONIZACAO_LOTE_TAMANHO", default=500, cast=int)
+# Fornecedores sincronizados por tarefa de background (uma sessão HTTP e uma
+# escrita de status em lote por tarefa).
+SINCRONIZACAO_LOTE_FORNECEDORES_POR_TAREFA = config(
+    "SINCRONIZACAO_LOTE_FORNECEDORES_POR_TAREFA", default=200, cast=int
+)
+
+# Limitador de taxa das chamadas à API Fiscaut (sync.services.rate_limiter).
+# A taxa e a rajada ficam em FiscautApiConfig; aqui só o arquivo de estado
+# compartilhado pelos processos e a espera máxima por uma vaga (segundos).
+FISCAUT_RATE_LIMIT_DB = config(
+    "FISCAUT_RATE_LIMIT_DB", default=str(BASE_DIR / "rate_limit.sqlite3")
+)
+FISCAUT_RATE_LIMIT_MAX_WAIT = config(
+    "FISCAUT_RATE_LIMIT_MAX_WAIT", default=300, cast=int
+)
+
+# Conexões keep-alive mantidas pela sessão HTTP da API Fiscaut
+# (sync.services.fiscaut_http) por processo.
+FISCAUT_HTTP_POOL_MAXSIZE = config("FISCAUT_HTTP_POOL_MAXSIZE", default=10, cast=int)
+
+# Envio assíncrono (sync.services.fiscaut_async_sender, requer httpx): as
+# tarefas de sincronização em lote mantêm até FISCAUT_ASYNC_MAX_EM_ANDAMENTO
+# requisições simultâneas e gravam os status a cada
+# FISCAUT_ASYNC_TAMANHO_LOTE_ESCRITA resultados. Não se aplica quando
+# FiscautApiConfig.tamanho_lote_envio > 1 (envio em arrays).
+FISCAUT_ENVIO_ASSINCRONO = config("FISCAUT_ENVIO_ASSINCRONO", default=False, cast=bool)
+FISCAUT_ASYNC_MAX_EM_ANDAMENTO = config(
+    "FISCAUT_ASYNC_MAX_EM_ANDAMENTO", default=20, cast=int
+)
+FISCAUT_ASYNC_TAMANHO_LOTE_ESCRITA = config(
+    "FISCAUT_ASYNC_TAMANHO_LOTE_ESCRITA", default=100, cast=int
+)
+
+# Novas tentativas nas chamadas à API Fiscaut (sync.services.fiscaut_retry):
+# timeouts, erros de conexão e HTTP 429/502/503/504 são repetidos até
+# FISCAUT_RETRY_TENTATIVAS vezes no total, com backoff exponencial a partir de
+# FISCAUT_RETRY_ESPERA_BASE segundos, limitado a FISCAUT_RETRY_ESPERA_MAXIMA.
+FISCAUT_RETRY_TENTATIVAS = config("FISCAUT_RETRY_TENTATIVAS", default=4, cast=int)
+FISCAUT_RETRY_ESPERA_BASE = config("FISCAUT_RETRY_ESPERA_BASE", default=1.0, cast=float)
+FISCAUT_RETRY_ESPERA_MAXIMA = config(
+    "FISCAUT_RETRY_ESPERA_MAXIMA", default=30.0, cast=float
+)
+
+# Espelho local das tabelas ODBC (sync.services.espelho_service). As listagens
+# usam o espelho enquanto a última atualização tiver menos de
+# ESPELHO_ODBC_IDADE_MAXIMA segundos (0 = sempre consultar o ODBC). Agende a
+# atualização com `manage.py atualizar_espelho_odbc --agendar <segundos>`.
+ESPELHO_ODBC_IDADE_MAXIMA = config("ESPELHO_ODBC_IDADE_MAXIMA", default=3600, cast=int)
+ESPELHO_ODBC_TAMANHO_LOTE = config("ESPELHO_ODBC_TAMANHO_LOTE", default=500, cast=int)
+
 LOGGING_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+# Logs gravados no banco (ApplicationLog) por sync.log_handlers.BufferedDatabaseLogHandler:
+# ficam em uma fila de até LOG_DB_FILA_CAPACIDADE registros e são gravados em
+# lote por uma thread a cada LOG_DB_LOTE registros ou LOG_DB_INTERVALO segundos.
+# Com a fila cheia, registros abaixo de WARNING são descartados.
+LOG_DB_FILA_CAPACIDADE = config("LOG_DB_FILA_CAPACIDADE", default=10000, cast=int)
+LOG_DB_LOTE = config("LOG_DB_LOTE", default=200, cast=int)
+LOG_DB_INTERVALO = config("LOG_DB_INTERVALO", default=1.0, cast=float)
+
+# Retenção dos logs do banco (sync.services.log_retencao_service): dias que cada
+# nível é mantido, no formato "NIVEL=DIAS,..." (0 = manter sempre). A limpeza
+# roda pelo comando `purgar_logs` (ou agendada com `purgar_logs --agendar`) e
+# apaga em lotes de LOG_RETENCAO_LOTE registros, cada um em sua transação.
+# Depois, o arquivo é compactado (VACUUM) se as páginas livres passarem de
+# LOG_RETENCAO_VACUUM_MINIMO do total.
+LOG_RETENCAO_DIAS = {
+    nivel.strip().upper(): int(dias)
+    for nivel, dias in (
+        item.split("=", 1)
+        for item in config(
+            "LOG_RETENCAO_DIAS",
+            default="DEBUG=2,INFO=14,WARNING=30,ERROR=90,CRITICAL=180",
+            cast=Csv(),
+        )
+    )
+}
+LOG_RETENCAO_LOTE = config("LOG_RETENCAO_LOTE", default=5000, cast=int)
+LOG_RETENCAO_VACUUM_MINIMO = config(
+    "LOG_RETENCAO_VACUUM_MINIMO", default=0.25, cast=float
+)
+# Resumo dos logs por hora, nível e módulo (ApplicationLogResumo), usado pelo
+# dashboard e pela análise de logs: mantido por LOG_RESUMO_RETENCAO_DIAS dias
+# (0 = manter sempre), independente da retenção dos logs.
+LOG_RESUMO_RETENCAO_DIAS = config("LOG_RESUMO_RETENCAO_DIAS", default=365, cast=int)
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -138,7 +317,10 @@ LOGGING = {
     "handlers": {
         "db_log": {
             "level": "INFO",
-            "class": "sync.log_handlers.DatabaseLogHandler",
+            "class": "sync.log_handlers.BufferedDatabaseLogHandler",
+            "capacidade": LOG_DB_FILA_CAPACIDADE,
+            "lote": LOG_DB_LOTE,
+            "intervalo": LOG_DB_INTERVALO,
         },
         "console": {
             "level": "DEBUG",
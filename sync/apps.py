@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SyncConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "sync"
+
+    def ready(self):
+        # Registra os receivers de sinais do app
+        from . import signals  # noqa: F401
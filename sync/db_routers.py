@@ -0,0 +1,103 @@
+"""
+Roteamento de modelos para bancos SQLite separados.
+
+Com LOG_DB_ARQUIVO e/ou TAREFAS_DB_ARQUIVO preenchidos, o settings cria os
+aliases "logs" e "tarefas" em DATABASES e este router envia para eles:
+- "logs": ApplicationLog e ApplicationLogResumo;
+- "tarefas": as tabelas do django-background-tasks (Task, CompletedTask).
+
+Cada arquivo SQLite tem sua própria trava de escrita, então rajadas de log e o
+enfileiramento/consumo de tarefas deixam de bloquear as atualizações de status
+da sincronização no banco principal. Sem os caminhos configurados, tudo fica
+no banco "default", como antes. Os bancos são criados e migrados pelo comando
+`manage.py migrar_bancos_separados`.
+"""
+
+from contextlib import ExitStack, contextmanager
+from typing import Iterator, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, router, transaction
+
+BANCO_LOGS = "logs"
+BANCO_TAREFAS = "tarefas"
+
+# (app_label, model_name) -> alias; model_name None vale para o app inteiro
+ROTAS = {
+    ("sync", "applicationlog"): BANCO_LOGS,
+    ("sync", "applicationlogresumo"): BANCO_LOGS,
+    ("background_task", None): BANCO_TAREFAS,
+}
+
+# Apps cujas tabelas também são criadas no banco separado por serem alvo de
+# chave estrangeira (Task.creator_content_type): o SQLite recusa inserções se
+# a tabela referenciada não existir. As leituras continuam no banco principal.
+DEPENDENCIAS = {
+    BANCO_TAREFAS: ("contenttypes",),
+}
+
+
+def banco_do_modelo(app_label: str, model_name: Optional[str]) -> Optional[str]:
+    """Alias separado do modelo, ou None se ele fica no banco principal."""
+    alias = ROTAS.get((app_label, model_name)) or ROTAS.get((app_label, None))
+    if alias and alias in settings.DATABASES:
+        return alias
+    return None
+
+
+def bancos_separados() -> List[str]:
+    """Aliases separados configurados em DATABASES."""
+    return sorted({a for a in ROTAS.values() if a in settings.DATABASES})
+
+
+def modelos_do_banco(alias: str) -> list:
+    """Modelos roteados para o alias."""
+    return [
+        model
+        for model in apps.get_models()
+        if banco_do_modelo(model._meta.app_label, model._meta.model_name) == alias
+    ]
+
+
+@contextmanager
+def transacao_com_fila_de_tarefas() -> Iterator[None]:
+    """
+    transaction.atomic() no banco principal e, se a fila de tarefas estiver em
+    outro banco, também nele: tarefas enfileiradas em sequência continuam
+    sendo gravadas com um único commit.
+    """
+    from background_task.models import Task
+
+    with ExitStack() as pilha:
+        pilha.enter_context(transaction.atomic())
+        alias_tarefas = router.db_for_write(Task)
+        if alias_tarefas != DEFAULT_DB_ALIAS:
+            pilha.enter_context(transaction.atomic(using=alias_tarefas))
+        yield
+
+
+class BancosSeparadosRouter:
+    """
+    Envia os modelos de ROTAS para seus bancos, quando configurados, e impede
+    que os demais modelos sejam migrados nesses bancos.
+    """
+
+    def db_for_read(self, model, **hints):
+        return banco_do_modelo(model._meta.app_label, model._meta.model_name)
+
+    def db_for_write(self, model, **hints):
+        return banco_do_modelo(model._meta.app_label, model._meta.model_name)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in ROTAS.values():
+            if app_label in DEPENDENCIAS.get(db, ()):
+                return True
+            if model_name is None:
+                # Operações sem modelo (ex.: RunPython) só se o app inteiro
+                # pertence a este banco
+                return ROTAS.get((app_label, None)) == db
+            return banco_do_modelo(app_label, model_name) == db
+        if model_name is not None and banco_do_modelo(app_label, model_name):
+            return False
+        return None
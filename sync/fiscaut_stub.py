@@ -0,0 +1,206 @@
+"""
+Servidor local que imita os endpoints da API Fiscaut usados pelo conector.
+
+Serve para testar a sincronização (individual e em lote) sem depender da API
+real. Atende:
+- GET  /up                      -> {"status": true}
+- POST /contabil/fornecedores   -> objeto: um fornecedor; array: lote de fornecedores
+
+Use pelo comando `python manage.py fiscaut_stub_server` ou, em testes,
+iniciar_servidor_em_thread().
+"""
+
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_OBRIGATORIOS = ("cnpj_empresa", "nome_fornecedor", "cnpj_fornecedor")
+
+
+class FiscautStubServer(ThreadingHTTPServer):
+    """
+    Servidor HTTP com as opções de comportamento do stub.
+
+    - api_key: se informada, exige "Authorization: Bearer <api_key>"
+    - aceita_lote: False faz o servidor recusar arrays com HTTP 422
+    - tamanho_maximo_lote: arrays maiores são recusados com HTTP 413
+    - falha_a_cada: a cada N fornecedores recebidos, um é rejeitado (0 = nunca)
+    - latencia: segundos de espera antes de cada resposta (simula a rede/API)
+    - indisponivel_a_cada: a cada N POSTs, responde HTTP 503 com Retry-After
+      (0 = nunca), para testar as novas tentativas
+    - retry_after: valor do cabeçalho Retry-After dessas respostas (segundos)
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        endereco: Tuple[str, int],
+        api_key: Optional[str] = None,
+        aceita_lote: bool = True,
+        tamanho_maximo_lote: int = 500,
+        falha_a_cada: int = 0,
+        latencia: float = 0,
+        indisponivel_a_cada: int = 0,
+        retry_after: int = 1,
+    ):
+        super().__init__(endereco, FiscautStubHandler)
+        self.api_key = api_key
+        self.aceita_lote = aceita_lote
+        self.tamanho_maximo_lote = tamanho_maximo_lote
+        self.falha_a_cada = falha_a_cada
+        self.latencia = latencia
+        self.indisponivel_a_cada = indisponivel_a_cada
+        self.retry_after = retry_after
+        self.posts = 0
+        self._lock = threading.Lock()
+        self.requisicoes = 0
+        self.fornecedores_recebidos = 0
+        self.fornecedores: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def simular_indisponibilidade(self) -> bool:
+        """Conta o POST e indica se ele deve receber HTTP 503."""
+        with self._lock:
+            self.posts += 1
+            return bool(
+                self.indisponivel_a_cada and self.posts % self.indisponivel_a_cada == 0
+            )
+
+    def processar_fornecedor(self, dados: Any) -> Tuple[bool, Dict[str, Any]]:
+        """Valida e "grava" (upsert em memória) um fornecedor."""
+        if not isinstance(dados, dict):
+            return False, {"status": False, "message": "Item inválido."}
+
+        faltando = [c for c in CAMPOS_OBRIGATORIOS if not dados.get(c)]
+        with self._lock:
+            self.fornecedores_recebidos += 1
+            forcar_falha = (
+                self.falha_a_cada
+                and self.fornecedores_recebidos % self.falha_a_cada == 0
+            )
+            if not faltando and not forcar_falha:
+                chave = (str(dados["cnpj_empresa"]), str(dados["cnpj_fornecedor"]))
+                self.fornecedores[chave] = dados
+
+        if faltando:
+            return False, {
+                "status": False,
+                "cnpj_fornecedor": dados.get("cnpj_fornecedor"),
+                "message": "Dados do fornecedor incompletos.",
+                "errors": {c: ["Campo obrigatório."] for c in faltando},
+            }
+        if forcar_falha:
+            return False, {
+                "status": False,
+                "cnpj_fornecedor": dados.get("cnpj_fornecedor"),
+                "message": "Falha simulada pelo servidor de testes.",
+            }
+        return True, {
+            "status": True,
+            "cnpj_fornecedor": dados.get("cnpj_fornecedor"),
+            "message": "Fornecedor sincronizado.",
+        }
+
+
+class FiscautStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, como a API real
+    server: FiscautStubServer
+
+    def do_GET(self):
+        if not self._autorizado():
+            return
+        if self.path.rstrip("/").endswith("/up"):
+            self._responder(200, {"status": True})
+        else:
+            self._responder(404, {"status": False, "message": "Não encontrado."})
+
+    def do_POST(self):
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        corpo = self.rfile.read(tamanho)
+        if not self._autorizado():
+            return
+        if not self.path.rstrip("/").endswith("/contabil/fornecedores"):
+            self._responder(404, {"status": False, "message": "Não encontrado."})
+            return
+        if self.server.simular_indisponibilidade():
+            self._responder(
+                503,
+                {"status": False, "message": "Indisponibilidade simulada."},
+                {"Retry-After": str(self.server.retry_after)},
+            )
+            return
+
+        try:
+            dados = json.loads(corpo or b"null")
+        except ValueError:
+            self._responder(400, {"status": False, "message": "JSON inválido."})
+            return
+
+        if isinstance(dados, list):
+            self._responder(*self._processar_lote(dados))
+            return
+
+        sucesso, resultado = self.server.processar_fornecedor(dados)
+        self._responder(200 if sucesso else 422, resultado)
+
+    def _processar_lote(self, itens: List[Any]) -> Tuple[int, Dict[str, Any]]:
+        if not self.server.aceita_lote:
+            return 422, {"status": False, "message": "Envio em lote não suportado."}
+        if len(itens) > self.server.tamanho_maximo_lote:
+            return 413, {
+                "status": False,
+                "message": f"Lote acima do máximo de {self.server.tamanho_maximo_lote} itens.",
+            }
+        resultados = [self.server.processar_fornecedor(item)[1] for item in itens]
+        return 200, {
+            "status": all(r["status"] for r in resultados),
+            "resultados": resultados,
+        }
+
+    def _autorizado(self) -> bool:
+        with self.server._lock:
+            self.server.requisicoes += 1
+        if self.server.api_key is None:
+            return True
+        if self.headers.get("Authorization") == f"Bearer {self.server.api_key}":
+            return True
+        self._responder(401, {"status": False, "message": "Não autorizado."})
+        return False
+
+    def _responder(
+        self,
+        status_code: int,
+        corpo: Dict[str, Any],
+        cabecalhos: Optional[Dict[str, str]] = None,
+    ) -> None:
+        if self.server.latencia:
+            time.sleep(self.server.latencia)
+        dados = json.dumps(corpo).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Stub Fiscaut: {self.address_string()} {format % args}")
+
+
+def iniciar_servidor_em_thread(
+    host: str = "127.0.0.1", port: int = 0, **opcoes
+) -> FiscautStubServer:
+    """
+    Inicia o stub em uma thread daemon e retorna o servidor. Com port=0 uma
+    porta livre é escolhida; a URL base fica em
+    f"http://{host}:{servidor.server_port}". Encerre com servidor.shutdown().
+    """
+    servidor = FiscautStubServer((host, port), **opcoes)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
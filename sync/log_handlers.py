@@ -1,5 +1,10 @@
 import logging
+import os
+import queue
+import threading
+import time
 import traceback
+from datetime import datetime, timezone as dt_timezone
 
 # Tentar importar o serviço de logging.
 # Se houver um problema aqui (ex: AppRegistryNotReady durante a inicialização do Django antes que os apps estejam carregados),
@@ -76,55 +81,249 @@ class DatabaseLogHandler(logging.Handler):
                 return  # Não foi possível carregar o serviço
 
         try:
-            # Mapear o levelno do LogRecord para a string de nível esperada pelo serviço/modelo
-            level_name = record.levelname.upper()
-
-            # Obter informações do LogRecord
-            module_name = record.module
-            func_name = record.funcName
-            line_no = record.lineno
-            message = self.format(
-                record
-            )  # Pega a mensagem formatada pelo Formatter do handler
-
-            tb = None
-            if record.exc_info:
-                # Se exc_info está presente, formatar o traceback
-                tb = traceback.format_exception(*record.exc_info)
-                tb = "".join(
-                    tb
-                )  # Converter a lista de strings do traceback em uma única string
-            elif (
-                record.levelno >= logging.ERROR
-                and hasattr(record, "stack_info")
-                and record.stack_info
-            ):
-                # Para erros onde exc_info não está, mas stack_info (Python 3.2+) pode estar
-                tb = record.stack_info
-
             # Chamar o serviço de logging
-            logging_service.log(
-                level=level_name,
-                message=message,
-                module=module_name,
-                func_name=func_name,
-                line_no=line_no,
-                traceback=tb,
-            )
+            logging_service.log(**self._montar_registro(record))
+        except Exception as e:
+            self._registrar_falha(record, e)
+
+    def _montar_registro(self, record: logging.LogRecord) -> dict:
+        """Converte o LogRecord nos argumentos de LoggingService.log()."""
+        # Mapear o levelno do LogRecord para a string de nível esperada pelo serviço/modelo
+        level_name = record.levelname.upper()
+
+        # Obter informações do LogRecord
+        module_name = record.module
+        func_name = record.funcName
+        line_no = record.lineno
+        message = self.format(
+            record
+        )  # Pega a mensagem formatada pelo Formatter do handler
+
+        tb = None
+        if record.exc_info:
+            # Se exc_info está presente, formatar o traceback
+            tb = traceback.format_exception(*record.exc_info)
+            tb = "".join(
+                tb
+            )  # Converter a lista de strings do traceback em uma única string
+        elif (
+            record.levelno >= logging.ERROR
+            and hasattr(record, "stack_info")
+            and record.stack_info
+        ):
+            # Para erros onde exc_info não está, mas stack_info (Python 3.2+) pode estar
+            tb = record.stack_info
+
+        return {
+            "level": level_name,
+            "message": message,
+            "module": module_name,
+            "func_name": func_name,
+            "line_no": line_no,
+            "traceback": tb,
+            # Momento em que o evento ocorreu, não o da gravação
+            "timestamp": datetime.fromtimestamp(record.created, tz=dt_timezone.utc),
+        }
+
+    @staticmethod
+    def _registrar_falha(record: logging.LogRecord, e: Exception) -> None:
+        # O que fazer se o logging para o banco de dados falhar aqui?
+        # Poderíamos usar logging.warning() para logar no console/arquivo padrão do Django
+        # para evitar um loop infinito se o próprio logging_service.log() falhar de forma que caia aqui.
+        # O LoggingService já tem um fallback para logar erros internos ao logger padrão,
+        # mas uma falha catastrófica (ex: DB completamente indisponível) pode precisar de atenção aqui.
+
+        # Usar o sistema de logging padrão para registrar a falha do handler.
+        # É importante não tentar usar o logging_service aqui para evitar recursão infinita.
+        log = logging.getLogger(
+            "DatabaseLogHandlerInternal"
+        )  # Usar um logger específico para erros do handler
+        log.error(f"Falha no DatabaseLogHandler ao emitir log: {e}", exc_info=True)
+        # Também podemos adicionar mais detalhes sobre o record que falhou:
+        log.error(
+            f"LogRecord que falhou: Level={record.levelname}, Module={record.module}, Message (raw)={record.getMessage()[:200]}..."
+        )
+
+
+class BufferedDatabaseLogHandler(DatabaseLogHandler):
+    """
+    DatabaseLogHandler que não grava no banco na thread que emitiu o log.
+
+    emit() só formata o registro e o coloca em uma fila limitada; uma thread
+    em segundo plano grava a fila com bulk_create quando junta `lote`
+    registros ou a cada `intervalo` segundos, o que vier primeiro. Assim as
+    requisições não disputam a trava de escrita do SQLite a cada log.
+
+    Com a fila cheia (banco lento ou indisponível), registros abaixo de
+    WARNING são descartados; WARNING ou acima descartam o registro mais
+    antigo da fila para entrar. A quantidade descartada é gravada como um
+    WARNING na gravação seguinte. close() (chamado por logging.shutdown ao
+    encerrar o processo) grava o que restou na fila.
+    """
+
+    LOGGER_INTERNO = "DatabaseLogHandlerInternal"
+
+    def __init__(
+        self,
+        level=logging.NOTSET,
+        capacidade: int = 10000,
+        lote: int = 200,
+        intervalo: float = 1.0,
+        espera_encerramento: float = 5.0,
+    ):
+        super().__init__(level=level)
+        self.capacidade = max(1, int(capacidade))
+        self.lote = max(1, int(lote))
+        self.intervalo = max(0.05, float(intervalo))
+        self.espera_encerramento = espera_encerramento
+        self._fila: "queue.Queue" = queue.Queue(maxsize=self.capacidade)
+        self._descartados = 0
+        self._lock_descartados = threading.Lock()
+        self._lock_thread = threading.Lock()
+        self._lock_gravacao = threading.Lock()
+        self._encerrar = threading.Event()
+        self._local = threading.local()
+        self._thread = None
+        self._pid = None
+
+    def emit(self, record: logging.LogRecord):
+        if hasattr(self, "disabled") and self.disabled:
+            return
+        # Logs gerados pela própria gravação (ex.: falha do banco) não voltam
+        # para a fila: vão só para os outros handlers (console).
+        if record.name == self.LOGGER_INTERNO or getattr(
+            self._local, "gravando", False
+        ):
+            return
+
+        try:
+            registro = self._montar_registro(record)
         except Exception as e:
-            # O que fazer se o logging para o banco de dados falhar aqui?
-            # Poderíamos usar logging.warning() para logar no console/arquivo padrão do Django
-            # para evitar um loop infinito se o próprio logging_service.log() falhar de forma que caia aqui.
-            # O LoggingService já tem um fallback para logar erros internos ao logger padrão,
-            # mas uma falha catastrófica (ex: DB completamente indisponível) pode precisar de atenção aqui.
-
-            # Usar o sistema de logging padrão para registrar a falha do handler.
-            # É importante não tentar usar o logging_service aqui para evitar recursão infinita.
-            log = logging.getLogger(
-                "DatabaseLogHandlerInternal"
-            )  # Usar um logger específico para erros do handler
-            log.error(f"Falha no DatabaseLogHandler ao emitir log: {e}", exc_info=True)
-            # Também podemos adicionar mais detalhes sobre o record que falhou:
-            log.error(
-                f"LogRecord que falhou: Level={record.levelname}, Module={record.module}, Message (raw)={record.getMessage()[:200]}..."
+            self._registrar_falha(record, e)
+            return
+
+        self._iniciar_thread()
+        try:
+            self._fila.put_nowait(registro)
+        except queue.Full:
+            self._enfileirar_com_fila_cheia(registro, record.levelno)
+
+    def flush(self):
+        """Grava agora, na thread atual, tudo o que está na fila."""
+        self._gravar_pendentes()
+
+    def close(self):
+        self._encerrar.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(self.espera_encerramento)
+        # O que a thread não conseguiu gravar no prazo é gravado aqui
+        self._gravar_pendentes()
+        super().close()
+
+    # ------------------------------------------------------------------ #
+    # Auxiliares
+    # ------------------------------------------------------------------ #
+    def _enfileirar_com_fila_cheia(self, registro: dict, levelno: int) -> None:
+        if levelno >= logging.WARNING:
+            try:
+                self._fila.get_nowait()  # abre espaço descartando o mais antigo
+            except queue.Empty:
+                pass
+            try:
+                self._fila.put_nowait(registro)
+            except queue.Full:
+                pass
+            else:
+                self._contar_descarte()
+                return
+        self._contar_descarte()
+
+    def _contar_descarte(self) -> None:
+        with self._lock_descartados:
+            self._descartados += 1
+
+    def _iniciar_thread(self) -> None:
+        # A thread é iniciada no primeiro log (e de novo após um fork, já que
+        # o processo filho não herda threads).
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock_thread:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._encerrar.clear()
+            self._thread = threading.Thread(
+                target=self._executar, name="db-log-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _executar(self) -> None:
+        while not self._encerrar.is_set():
+            registros = self._coletar_lote()
+            if registros:
+                self._gravar(registros)
+        self._gravar_pendentes()
+
+    def _coletar_lote(self) -> list:
+        """Espera até juntar `lote` registros ou passar `intervalo` segundos."""
+        registros = []
+        limite = time.monotonic() + self.intervalo
+        while len(registros) < self.lote and not self._encerrar.is_set():
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                registros.append(self._fila.get(timeout=restante))
+            except queue.Empty:
+                break
+        return registros
+
+    def _gravar_pendentes(self) -> None:
+        while True:
+            registros = []
+            try:
+                while len(registros) < self.lote:
+                    registros.append(self._fila.get_nowait())
+            except queue.Empty:
+                pass
+            if not registros:
+                self._gravar([])  # ainda pode haver descartes a registrar
+                return
+            self._gravar(registros)
+
+    def _gravar(self, registros: list) -> None:
+        with self._lock_descartados:
+            descartados, self._descartados = self._descartados, 0
+        if descartados:
+            registros.append(
+                {
+                    "level": "WARNING",
+                    "message": (
+                        f"{descartados} registros de log descartados: fila de gravação "
+                        f"no banco cheia (capacidade {self.capacidade})."
+                    ),
+                    "module": "log_handlers",
+                    "func_name": "BufferedDatabaseLogHandler",
+                    "timestamp": datetime.now(tz=dt_timezone.utc),
+                }
             )
+        if not registros:
+            return
+
+        if logging_service is None and not self._ensure_service():
+            return
+        with self._lock_gravacao:
+            self._local.gravando = True
+            try:
+                if not logging_service.log_em_lote(registros):
+                    # Banco indisponível: evita reutilizar uma conexão quebrada
+                    from django.db import close_old_connections
+
+                    close_old_connections()
+            except Exception as e:
+                logging.getLogger(self.LOGGER_INTERNO).error(
+                    f"Falha ao gravar {len(registros)} logs em lote: {e}", exc_info=True
+                )
+            finally:
+                self._local.gravando = False
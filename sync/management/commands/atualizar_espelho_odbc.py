@@ -0,0 +1,84 @@
+from background_task.models import Task
+from django.core.management.base import BaseCommand, CommandError
+
+from sync.services.espelho_service import espelho_service
+from sync.tasks import FILA_ESPELHO_ODBC, atualizar_espelho_task
+
+
+class Command(BaseCommand):
+    help = (
+        "Atualiza o espelho local das tabelas ODBC (geempre, effornece, efclientes, "
+        "ctcontas, efacumuladores) das empresas habilitadas, ou agenda a "
+        "atualização periódica em segundo plano."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--empresa",
+            type=int,
+            default=None,
+            help="Atualiza só esta empresa (codi_emp).",
+        )
+        parser.add_argument(
+            "--entidade",
+            action="append",
+            choices=list(espelho_service.entidades),
+            help="Atualiza só esta entidade (pode ser repetido).",
+        )
+        parser.add_argument(
+            "--agendar",
+            type=int,
+            default=None,
+            metavar="SEGUNDOS",
+            help=(
+                "Em vez de atualizar agora, agenda a atualização de todas as empresas "
+                f"a cada SEGUNDOS na fila '{FILA_ESPELHO_ODBC}' (substitui o agendamento anterior)."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        entidades = options["entidade"]
+
+        if options["agendar"] is not None:
+            if options["agendar"] < 60:
+                raise CommandError("O intervalo mínimo é de 60 segundos.")
+            # Só os agendamentos periódicos; atualizações avulsas (ex.: de uma
+            # empresa recém-habilitada) continuam na fila
+            removidas, _ = Task.objects.filter(
+                task_name=atualizar_espelho_task.name, repeat__gt=Task.NEVER
+            ).delete()
+            atualizar_espelho_task(
+                entidades=entidades,
+                repeat=options["agendar"],
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Atualização do espelho agendada a cada {options['agendar']}s "
+                    f"({removidas} agendamento(s) anterior(es) removido(s))."
+                )
+            )
+            return
+
+        if options["empresa"] is not None:
+            resultados = {
+                options["empresa"]: espelho_service.atualizar_empresa(
+                    options["empresa"], entidades
+                )
+            }
+        else:
+            resultados = espelho_service.atualizar_todas(entidades)
+
+        if not resultados:
+            self.stdout.write("Nenhuma empresa com sincronização habilitada.")
+        for codi_emp, por_entidade in resultados.items():
+            for entidade, resultado in por_entidade.items():
+                if "erro" in resultado:
+                    self.stderr.write(
+                        f"Empresa {codi_emp} - {entidade}: erro: {resultado['erro']}"
+                    )
+                else:
+                    self.stdout.write(
+                        f"Empresa {codi_emp} - {entidade}: {resultado['registros']} registros "
+                        f"(+{resultado['inseridos']} ~{resultado['atualizados']} "
+                        f"-{resultado['removidos']})"
+                    )
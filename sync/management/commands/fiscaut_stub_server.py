@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand
+
+from sync.fiscaut_stub import FiscautStubServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Inicia um servidor local que imita a API Fiscaut (/up e "
+        "/contabil/fornecedores, individual e em lote) para testes de sincronização."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--api-key",
+            default=None,
+            help="Exige este Bearer token (padrão: aceita qualquer um).",
+        )
+        parser.add_argument(
+            "--sem-lote",
+            action="store_true",
+            help="Recusa envios em array, para testar o reenvio individual.",
+        )
+        parser.add_argument(
+            "--tamanho-maximo-lote",
+            type=int,
+            default=500,
+            help="Arrays maiores que isso são recusados com HTTP 413.",
+        )
+        parser.add_argument(
+            "--falha-a-cada",
+            type=int,
+            default=0,
+            help="Rejeita um a cada N fornecedores recebidos (0 = nunca).",
+        )
+        parser.add_argument(
+            "--latencia-ms",
+            type=int,
+            default=0,
+            help="Atraso em milissegundos antes de cada resposta.",
+        )
+        parser.add_argument(
+            "--indisponivel-a-cada",
+            type=int,
+            default=0,
+            help="Responde HTTP 503 a um a cada N POSTs (0 = nunca).",
+        )
+        parser.add_argument(
+            "--retry-after",
+            type=int,
+            default=1,
+            help="Segundos informados no Retry-After das respostas 503.",
+        )
+
+    def handle(self, *args, **options):
+        servidor = FiscautStubServer(
+            (options["host"], options["port"]),
+            api_key=options["api_key"],
+            aceita_lote=not options["sem_lote"],
+            tamanho_maximo_lote=options["tamanho_maximo_lote"],
+            falha_a_cada=options["falha_a_cada"],
+            latencia=options["latencia_ms"] / 1000,
+            indisponivel_a_cada=options["indisponivel_a_cada"],
+            retry_after=options["retry_after"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Stub da API Fiscaut em http://{options['host']}:{servidor.server_port} "
+                "(Ctrl+C para encerrar)."
+            )
+        )
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.server_close()
+            self.stdout.write(
+                f"Encerrado. {servidor.requisicoes} requisições, "
+                f"{servidor.fornecedores_recebidos} fornecedores recebidos."
+            )
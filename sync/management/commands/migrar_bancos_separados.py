@@ -0,0 +1,112 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from sync.db_routers import bancos_separados, modelos_do_banco
+from sync.models import ApplicationLog, ApplicationLogResumo
+from sync.services.log_resumo_service import log_resumo_service
+
+
+class Command(BaseCommand):
+    help = (
+        "Cria e migra os bancos SQLite separados configurados em LOG_DB_ARQUIVO "
+        "e TAREFAS_DB_ARQUIVO e, opcionalmente, move para eles os registros que "
+        "ainda estão no banco principal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--mover-dados",
+            action="store_true",
+            help=(
+                "Move os logs e as tarefas existentes do banco principal para os "
+                "bancos separados (as tarefas pendentes continuam na fila)."
+            ),
+        )
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=2000,
+            help="Registros movidos por transação (padrão: 2000).",
+        )
+
+    def handle(self, *args, **options):
+        if options["lote"] < 1:
+            raise CommandError("--lote deve ser maior que zero.")
+
+        aliases = bancos_separados()
+        if not aliases:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Nenhum banco separado configurado (LOG_DB_ARQUIVO / TAREFAS_DB_ARQUIVO)."
+                )
+            )
+            return
+
+        for alias in aliases:
+            arquivo = Path(settings.DATABASES[alias]["NAME"])
+            arquivo.parent.mkdir(parents=True, exist_ok=True)
+            self.stdout.write(f"Migrando o banco '{alias}' ({arquivo})...")
+            call_command(
+                "migrate",
+                database=alias,
+                interactive=False,
+                verbosity=max(0, options["verbosity"] - 1),
+            )
+
+            if not options["mover_dados"]:
+                continue
+            for model in modelos_do_banco(alias):
+                movidos = self._mover(model, alias, options["lote"])
+                self.stdout.write(
+                    f"  {model._meta.label}: {movidos} registro(s) movido(s)."
+                )
+
+        self.stdout.write(self.style.SUCCESS("Bancos separados prontos."))
+
+    def _mover(self, model, alias: str, lote: int) -> int:
+        """Copia os registros do banco principal para o alias e os apaga da origem, em lotes."""
+        origem = connections[DEFAULT_DB_ALIAS]
+        if model._meta.db_table not in origem.introspection.table_names():
+            return 0
+
+        # Logs movidos entram no resumo por hora do destino, a não ser que o
+        # banco principal tenha o próprio resumo (que é movido junto)
+        resumir = (
+            model is ApplicationLog
+            and ApplicationLogResumo._meta.db_table
+            not in origem.introspection.table_names()
+        )
+
+        manager = model._base_manager
+        movidos = 0
+        while True:
+            registros = list(manager.using(DEFAULT_DB_ALIAS).order_by("pk")[:lote])
+            if not registros:
+                return movidos
+            ids = [r.pk for r in registros]
+            # Os processos que já usam o banco separado gravam nele com ids
+            # próprios: os registros antigos entram com ids novos (nada os
+            # referencia) e a origem só é apagada depois da cópia confirmada.
+            # Uma interrupção entre os dois commits deixa no máximo um lote
+            # copiado duas vezes.
+            with transaction.atomic(using=alias):
+                if model is ApplicationLogResumo:
+                    log_resumo_service.somar(
+                        {
+                            (r.periodo, r.level, r.module): r.quantidade
+                            for r in registros
+                        }
+                    )
+                else:
+                    for registro in registros:
+                        registro.pk = None
+                    manager.using(alias).bulk_create(registros)
+                    if resumir:
+                        log_resumo_service.somar(log_resumo_service.contar(registros))
+            with transaction.atomic(using=DEFAULT_DB_ALIAS):
+                manager.using(DEFAULT_DB_ALIAS).filter(pk__in=ids).delete()
+            movidos += len(registros)
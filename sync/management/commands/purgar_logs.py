@@ -0,0 +1,92 @@
+from background_task.models import Task
+from django.core.management.base import BaseCommand, CommandError
+
+from sync.services.log_retencao_service import log_retencao_service
+from sync.tasks import purgar_logs_task
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga os logs do banco mais antigos que a retenção do seu nível "
+        "(LOG_RETENCAO_DIAS), em lotes, e compacta o banco de logs; ou agenda "
+        "a limpeza periódica em segundo plano."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dias",
+            action="append",
+            metavar="NIVEL=DIAS",
+            help=(
+                "Substitui a retenção de um nível nesta execução (ex.: DEBUG=1; "
+                "pode ser repetido)."
+            ),
+        )
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=None,
+            help="Registros apagados por transação (padrão: LOG_RETENCAO_LOTE).",
+        )
+        parser.add_argument(
+            "--sem-compactar",
+            action="store_true",
+            help="Não executa ANALYZE/VACUUM ao final.",
+        )
+        parser.add_argument(
+            "--simular",
+            action="store_true",
+            help="Só mostra quantos logs seriam apagados.",
+        )
+        parser.add_argument(
+            "--agendar",
+            type=int,
+            default=None,
+            metavar="SEGUNDOS",
+            help=(
+                "Em vez de limpar agora, agenda a limpeza a cada SEGUNDOS "
+                "(substitui o agendamento anterior)."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["lote"] is not None and options["lote"] < 1:
+            raise CommandError("--lote deve ser maior que zero.")
+
+        if options["agendar"] is not None:
+            if options["agendar"] < 300:
+                raise CommandError("O intervalo mínimo é de 300 segundos.")
+            removidas, _ = Task.objects.filter(
+                task_name=purgar_logs_task.name, repeat__gt=Task.NEVER
+            ).delete()
+            purgar_logs_task(repeat=options["agendar"])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Limpeza dos logs agendada a cada {options['agendar']}s "
+                    f"({removidas} agendamento(s) anterior(es) removido(s))."
+                )
+            )
+            return
+
+        politica = dict(log_retencao_service.politica)
+        for item in options["dias"] or []:
+            nivel, _, dias = item.partition("=")
+            try:
+                politica[nivel.strip().upper()] = int(dias)
+            except ValueError:
+                raise CommandError(f"Valor inválido para --dias: '{item}'.")
+
+        resultado = log_retencao_service.purgar(
+            politica=politica,
+            lote=options["lote"],
+            compactar=not options["sem_compactar"],
+            simular=options["simular"],
+        )
+
+        verbo = "seriam apagados" if options["simular"] else "apagados"
+        for nivel, quantidade in resultado.items():
+            self.stdout.write(
+                f"{nivel} (> {politica[nivel]} dias): {quantidade} {verbo}"
+            )
+        if not resultado:
+            self.stdout.write("Nenhum nível com retenção configurada.")
@@ -0,0 +1,95 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:25
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0006_applicationlog_alter_fiscautapiconfig_options_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SincronizacaoLoteJob",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "codi_emp",
+                    models.IntegerField(
+                        db_index=True, verbose_name="Código da Empresa ODBC"
+                    ),
+                ),
+                (
+                    "cnpj_empresa",
+                    models.CharField(max_length=20, verbose_name="CNPJ da Empresa"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDENTE", "Pendente"),
+                            ("EM_ANDAMENTO", "Em Andamento"),
+                            ("CONCLUIDO", "Concluído"),
+                            ("ERRO", "Erro"),
+                        ],
+                        default="PENDENTE",
+                        max_length=20,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "fornecedores_lidos",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Fornecedores Lidos"
+                    ),
+                ),
+                (
+                    "fornecedores_ignorados",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Fornecedores sem código, CNPJ ou nome.",
+                        verbose_name="Fornecedores Ignorados",
+                    ),
+                ),
+                (
+                    "tarefas_enfileiradas",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Tarefas Enfileiradas"
+                    ),
+                ),
+                (
+                    "mensagem",
+                    models.TextField(blank=True, null=True, verbose_name="Mensagem"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Criado em"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Atualizado em"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Finalizado em"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Job de Sincronização em Lote",
+                "verbose_name_plural": "Jobs de Sincronização em Lote",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0007_sincronizacaolotejob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sincronizacaolotejob",
+            name="fornecedores_enfileirados",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Fornecedores Enfileirados"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="sincronizacaolotejob",
+            name="tarefas_enfileiradas",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Cada tarefa sincroniza um grupo de fornecedores.",
+                verbose_name="Tarefas Enfileiradas",
+            ),
+        ),
+    ]
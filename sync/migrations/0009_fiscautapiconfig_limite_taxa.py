@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0008_sincronizacaolotejob_fornecedores_enfileirados"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fiscautapiconfig",
+            name="rajada_maxima",
+            field=models.PositiveIntegerField(
+                default=1,
+                help_text="Quantidade de requisições que podem ser feitas de uma vez após um período ocioso.",
+                verbose_name="Rajada Máxima",
+            ),
+        ),
+        migrations.AddField(
+            model_name="fiscautapiconfig",
+            name="requisicoes_por_segundo",
+            field=models.FloatField(
+                default=1.0,
+                help_text="Taxa máxima de envios à API somando todos os workers. 0 desativa o limite.",
+                verbose_name="Requisições por Segundo",
+            ),
+        ),
+    ]
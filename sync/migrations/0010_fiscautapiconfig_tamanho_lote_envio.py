@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0009_fiscautapiconfig_limite_taxa"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fiscautapiconfig",
+            name="tamanho_lote_envio",
+            field=models.PositiveIntegerField(
+                default=1,
+                help_text="Fornecedores enviados em cada requisição em lote. 1 envia um fornecedor por requisição.",
+                verbose_name="Fornecedores por Requisição",
+            ),
+        ),
+    ]
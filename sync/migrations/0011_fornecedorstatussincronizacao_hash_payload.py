@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0010_fiscautapiconfig_tamanho_lote_envio"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fornecedorstatussincronizacao",
+            name="hash_payload",
+            field=models.CharField(
+                blank=True,
+                max_length=64,
+                null=True,
+                verbose_name="Hash do Último Payload Sincronizado",
+            ),
+        ),
+    ]
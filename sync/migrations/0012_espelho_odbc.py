@@ -0,0 +1,140 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0011_fornecedorstatussincronizacao_hash_payload"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EspelhoEstado",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("entidade", models.CharField(max_length=30, verbose_name="Entidade")),
+                (
+                    "codi_emp",
+                    models.IntegerField(verbose_name="Código da Empresa ODBC"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("EM_ANDAMENTO", "Em Andamento"),
+                            ("CONCLUIDO", "Concluído"),
+                            ("ERRO", "Erro"),
+                        ],
+                        default="EM_ANDAMENTO",
+                        max_length=20,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "registros",
+                    models.PositiveIntegerField(default=0, verbose_name="Registros"),
+                ),
+                (
+                    "inseridos",
+                    models.PositiveIntegerField(default=0, verbose_name="Inseridos"),
+                ),
+                (
+                    "atualizados",
+                    models.PositiveIntegerField(default=0, verbose_name="Atualizados"),
+                ),
+                (
+                    "removidos",
+                    models.PositiveIntegerField(default=0, verbose_name="Removidos"),
+                ),
+                (
+                    "ultima_atualizacao",
+                    models.DateTimeField(
+                        blank=True,
+                        null=True,
+                        verbose_name="Última Atualização Bem-Sucedida",
+                    ),
+                ),
+                (
+                    "mensagem",
+                    models.TextField(blank=True, null=True, verbose_name="Mensagem"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Atualizado em"),
+                ),
+            ],
+            options={
+                "verbose_name": "Estado do Espelho ODBC",
+                "verbose_name_plural": "Estados do Espelho ODBC",
+                "ordering": ["codi_emp", "entidade"],
+                "unique_together": {("entidade", "codi_emp")},
+            },
+        ),
+        migrations.CreateModel(
+            name="EspelhoRegistro",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("entidade", models.CharField(max_length=30, verbose_name="Entidade")),
+                (
+                    "codi_emp",
+                    models.IntegerField(verbose_name="Código da Empresa ODBC"),
+                ),
+                (
+                    "chave",
+                    models.CharField(max_length=50, verbose_name="Chave na Origem"),
+                ),
+                ("chave_numerica", models.BigIntegerField(blank=True, null=True)),
+                (
+                    "nome",
+                    models.CharField(
+                        blank=True, default="", max_length=255, verbose_name="Nome"
+                    ),
+                ),
+                (
+                    "documento",
+                    models.CharField(
+                        blank=True, default="", max_length=100, verbose_name="Documento"
+                    ),
+                ),
+                ("dados", models.JSONField(verbose_name="Dados da Linha")),
+                (
+                    "hash_linha",
+                    models.CharField(max_length=64, verbose_name="Hash da Linha"),
+                ),
+                ("atualizado_em", models.DateTimeField(verbose_name="Atualizado em")),
+            ],
+            options={
+                "verbose_name": "Registro do Espelho ODBC",
+                "verbose_name_plural": "Registros do Espelho ODBC",
+                "indexes": [
+                    models.Index(
+                        fields=["entidade", "codi_emp", "chave_numerica", "chave"],
+                        name="sync_espelh_entidad_1a6064_idx",
+                    ),
+                    models.Index(
+                        fields=["entidade", "codi_emp", "documento"],
+                        name="sync_espelh_entidad_79cbd3_idx",
+                    ),
+                ],
+                "unique_together": {("entidade", "codi_emp", "chave")},
+            },
+        ),
+    ]
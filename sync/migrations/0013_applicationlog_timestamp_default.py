@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-17 02:52
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0012_espelho_odbc"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="applicationlog",
+            name="timestamp",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                editable=False,
+                help_text="Data e hora do log.",
+            ),
+        ),
+    ]
@@ -0,0 +1,88 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# Índice de texto completo (SQLite FTS5) sobre message, module e func_name dos
+# logs. A tabela virtual usa o próprio sync_applicationlog como conteúdo e é
+# mantida pelos gatilhos abaixo, o que cobre também os bulk_create do
+# BufferedDatabaseLogHandler e as exclusões em lote da retenção.
+#
+# Atenção: se uma migração futura recriar sync_applicationlog (o SQLite faz
+# isso em quase todo AlterField), os gatilhos somem junto com a tabela antiga
+# e precisam ser recriados. Sem eles, a busca volta ao filtro icontains
+# (ver sync.services.log_busca_service).
+
+CRIAR = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS sync_applicationlog_fts USING fts5(
+        message, module, func_name,
+        content='sync_applicationlog', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sync_applicationlog_fts_ai
+    AFTER INSERT ON sync_applicationlog BEGIN
+        INSERT INTO sync_applicationlog_fts(rowid, message, module, func_name)
+        VALUES (new.id, new.message, new.module, new.func_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sync_applicationlog_fts_ad
+    AFTER DELETE ON sync_applicationlog BEGIN
+        INSERT INTO sync_applicationlog_fts(sync_applicationlog_fts, rowid, message, module, func_name)
+        VALUES ('delete', old.id, old.message, old.module, old.func_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS sync_applicationlog_fts_au
+    AFTER UPDATE ON sync_applicationlog BEGIN
+        INSERT INTO sync_applicationlog_fts(sync_applicationlog_fts, rowid, message, module, func_name)
+        VALUES ('delete', old.id, old.message, old.module, old.func_name);
+        INSERT INTO sync_applicationlog_fts(rowid, message, module, func_name)
+        VALUES (new.id, new.message, new.module, new.func_name);
+    END
+    """,
+    # Indexa os logs que já existem
+    "INSERT INTO sync_applicationlog_fts(sync_applicationlog_fts) VALUES ('rebuild')",
+]
+
+REMOVER = [
+    "DROP TRIGGER IF EXISTS sync_applicationlog_fts_ai",
+    "DROP TRIGGER IF EXISTS sync_applicationlog_fts_ad",
+    "DROP TRIGGER IF EXISTS sync_applicationlog_fts_au",
+    "DROP TABLE IF EXISTS sync_applicationlog_fts",
+]
+
+
+def criar_indice(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    try:
+        schema_editor.execute(CRIAR[0])
+    except OperationalError:
+        # SQLite sem FTS5 (ou sem remove_diacritics): a busca usa icontains
+        return
+    for sql in CRIAR[1:]:
+        schema_editor.execute(sql)
+
+
+def remover_indice(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in REMOVER:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0013_applicationlog_timestamp_default"),
+    ]
+
+    operations = [
+        # hints: com o banco de logs separado (sync.db_routers), o índice é
+        # criado no mesmo banco que a tabela
+        migrations.RunPython(
+            criar_indice, remover_indice, hints={"model_name": "applicationlog"}
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.1 on 2026-10-17 03:00
+
+import datetime
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+
+
+def preencher_resumo(apps, schema_editor):
+    """Resume os logs já gravados (uma única agregação, só nesta migração)."""
+    ApplicationLog = apps.get_model("sync", "ApplicationLog")
+    ApplicationLogResumo = apps.get_model("sync", "ApplicationLogResumo")
+    banco = schema_editor.connection.alias
+
+    linhas = (
+        ApplicationLog.objects.using(banco)
+        .annotate(periodo=TruncHour("timestamp", tzinfo=datetime.timezone.utc))
+        .values("periodo", "level", "module")
+        .annotate(quantidade=Count("id"))
+        .order_by()
+    )
+    ApplicationLogResumo.objects.using(banco).bulk_create(
+        (ApplicationLogResumo(**linha) for linha in linhas.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0014_applicationlog_fts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApplicationLogResumo",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "periodo",
+                    models.DateTimeField(help_text="Início da hora (UTC) agregada."),
+                ),
+                (
+                    "level",
+                    models.CharField(
+                        choices=[
+                            ("DEBUG", "Debug"),
+                            ("INFO", "Info"),
+                            ("WARNING", "Warning"),
+                            ("ERROR", "Error"),
+                            ("CRITICAL", "Critical"),
+                        ],
+                        help_text="Nível do log.",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "module",
+                    models.CharField(
+                        help_text="Módulo onde o log foi gerado.", max_length=255
+                    ),
+                ),
+                (
+                    "quantidade",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Logs do nível e módulo na hora."
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Resumo de Logs",
+                "verbose_name_plural": "Resumos de Logs",
+                "ordering": ["-periodo"],
+                "unique_together": {("periodo", "level", "module")},
+            },
+        ),
+        migrations.RunPython(
+            preencher_resumo,
+            migrations.RunPython.noop,
+            hints={"model_name": "applicationlogresumo"},
+        ),
+    ]
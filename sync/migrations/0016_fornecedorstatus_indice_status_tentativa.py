@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-17 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sync", "0015_applicationlogresumo"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="fornecedorstatussincronizacao",
+            index=models.Index(
+                fields=["status_sincronizacao", "ultima_tentativa_sinc"],
+                name="sync_fornec_status__e76445_idx",
+            ),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from django.utils import timezone
+import hashlib
 import json
 import uuid
 
@@ -116,6 +117,21 @@ class FiscautApiConfig(models.Model):
         default=True,
         help_text="Marcar como configuração ativa.",
     )
+    requisicoes_por_segundo = models.FloatField(
+        default=1.0,
+        verbose_name="Requisições por Segundo",
+        help_text="Taxa máxima de envios à API somando todos os workers. 0 desativa o limite.",
+    )
+    rajada_maxima = models.PositiveIntegerField(
+        default=1,
+        verbose_name="Rajada Máxima",
+        help_text="Quantidade de requisições que podem ser feitas de uma vez após um período ocioso.",
+    )
+    tamanho_lote_envio = models.PositiveIntegerField(
+        default=1,
+        verbose_name="Fornecedores por Requisição",
+        help_text="Fornecedores enviados em cada requisição em lote. 1 envia um fornecedor por requisição.",
+    )
     last_updated = models.DateTimeField(
         auto_now=True, verbose_name="Última Atualização"
     )
@@ -204,6 +220,14 @@ class FornecedorStatusSincronizacao(models.Model):
         blank=True,
         help_text="ID do fornecedor na API Fiscaut após sincronização bem-sucedida.",
     )
+    # Hash do último payload enviado com sucesso: permite detectar na extração
+    # fornecedores já sincronizados cujos dados mudaram no ODBC.
+    hash_payload = models.CharField(
+        _("Hash do Último Payload Sincronizado"),
+        max_length=64,
+        null=True,
+        blank=True,
+    )
 
     class Meta:
         verbose_name = _("Status de Sincronização de Fornecedor")
@@ -213,6 +237,8 @@ class FornecedorStatusSincronizacao(models.Model):
         indexes = [
             models.Index(fields=["codi_emp_odbc", "codi_for_odbc"]),
             models.Index(fields=["status_sincronizacao"]),
+            # Contagens por status em uma janela de tempo (métricas do dashboard)
+            models.Index(fields=["status_sincronizacao", "ultima_tentativa_sinc"]),
         ]
 
     def __str__(self):
@@ -226,22 +252,15 @@ class FornecedorStatusSincronizacao(models.Model):
         sucesso,
         detalhes_resposta=None,
         fiscaut_id=None,
+        hash_payload=None,
     ):
         from django.utils import timezone
 
         # print(f"DEBUG_MODEL_REG_SINC: Entrando em registrar_sincronizacao. Empresa: {codi_emp_odbc}, Forn: {codi_for_odbc}, Sucesso: {sucesso}")
 
-        status_sinc = STATUS_SINCRONIZADO if sucesso else STATUS_ERRO
+        status_sinc = cls.STATUS_SINCRONIZADO if sucesso else cls.STATUS_ERRO
 
-        detalhes_str = None
-        if detalhes_resposta is not None:
-            if isinstance(detalhes_resposta, (dict, list)):
-                try:
-                    detalhes_str = json.dumps(detalhes_resposta)
-                except TypeError:
-                    detalhes_str = str(detalhes_resposta)
-            else:
-                detalhes_str = str(detalhes_resposta)
+        detalhes_str = cls._serializar_detalhes(detalhes_resposta)
 
         # print(f"DEBUG_MODEL_REG_SINC: Detalhes serializados: {detalhes_str[:500] if detalhes_str else 'N/A'}")
 
@@ -251,6 +270,9 @@ class FornecedorStatusSincronizacao(models.Model):
             "detalhes_ultima_resposta": detalhes_str,
             "fiscaut_id": fiscaut_id,
         }
+        # Em caso de erro o hash do último envio bem-sucedido é mantido
+        if sucesso:
+            defaults_dict["hash_payload"] = hash_payload
 
         obj, created = cls.objects.update_or_create(
             codi_emp_odbc=codi_emp_odbc,
@@ -260,6 +282,100 @@ class FornecedorStatusSincronizacao(models.Model):
         # print(f"DEBUG_MODEL_REG_SINC: Resultado do update_or_create. Objeto ID: {obj.id if obj else 'N/A'}, Criado: {created}, Status Salvo: {obj.status_sincronizacao if obj else 'N/A'}")
         return obj
 
+    @classmethod
+    def registrar_sincronizacoes_em_lote(cls, codi_emp_odbc, registros):
+        """
+        Registra o resultado de várias sincronizações da mesma empresa com um
+        único upsert (INSERT ... ON CONFLICT DO UPDATE).
+
+        Args:
+            codi_emp_odbc: Código da empresa no sistema ODBC.
+            registros: Dicionários com codi_for_odbc, sucesso, detalhes_resposta
+                e, opcionalmente, fiscaut_id e hash_payload. Se um fornecedor
+                aparecer mais de uma vez, vale o último registro.
+
+        Returns:
+            Quantidade de fornecedores registrados.
+        """
+        agora = timezone.now()
+        por_fornecedor = {}
+        for registro in registros:
+            codi_for_odbc = str(registro["codi_for_odbc"])
+            sucesso = bool(registro.get("sucesso"))
+            por_fornecedor[codi_for_odbc] = cls(
+                codi_emp_odbc=codi_emp_odbc,
+                codi_for_odbc=codi_for_odbc,
+                status_sincronizacao=(
+                    cls.STATUS_SINCRONIZADO if sucesso else cls.STATUS_ERRO
+                ),
+                ultima_tentativa_sinc=agora,
+                detalhes_ultima_resposta=cls._serializar_detalhes(
+                    registro.get("detalhes_resposta")
+                ),
+                fiscaut_id=registro.get("fiscaut_id"),
+                hash_payload=registro.get("hash_payload") if sucesso else None,
+            )
+
+        if not por_fornecedor:
+            return 0
+
+        campos = [
+            "status_sincronizacao",
+            "ultima_tentativa_sinc",
+            "detalhes_ultima_resposta",
+            "fiscaut_id",
+        ]
+        sucessos = [
+            obj
+            for obj in por_fornecedor.values()
+            if obj.status_sincronizacao == cls.STATUS_SINCRONIZADO
+        ]
+        erros = [
+            obj
+            for obj in por_fornecedor.values()
+            if obj.status_sincronizacao != cls.STATUS_SINCRONIZADO
+        ]
+        # Dois upserts: nos erros o hash do último envio bem-sucedido é mantido
+        for objs, update_fields in (
+            (sucessos, campos + ["hash_payload"]),
+            (erros, campos),
+        ):
+            if objs:
+                cls.objects.bulk_create(
+                    objs,
+                    update_conflicts=True,
+                    unique_fields=["codi_emp_odbc", "codi_for_odbc"],
+                    update_fields=update_fields,
+                    batch_size=500,
+                )
+        return len(por_fornecedor)
+
+    @staticmethod
+    def calcular_hash_payload(payload):
+        """
+        SHA-256 de um payload de fornecedor, estável entre execuções: chaves
+        ordenadas e valores convertidos para texto sem espaços nas pontas.
+        """
+        normalizado = {
+            chave: "" if valor is None else str(valor).strip()
+            for chave, valor in payload.items()
+        }
+        conteudo = json.dumps(
+            normalizado, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        )
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _serializar_detalhes(detalhes_resposta):
+        if detalhes_resposta is None:
+            return None
+        if isinstance(detalhes_resposta, (dict, list)):
+            try:
+                return json.dumps(detalhes_resposta)
+            except TypeError:
+                return str(detalhes_resposta)
+        return str(detalhes_resposta)
+
 
 class ApplicationLog(models.Model):
     LEVEL_CHOICES = [
@@ -270,7 +386,11 @@ class ApplicationLog(models.Model):
         ("CRITICAL", "Critical"),
     ]
 
-    timestamp = models.DateTimeField(auto_now_add=True, help_text="Data e hora do log.")
+    # default (e não auto_now_add) para que logs gravados em lote mantenham o
+    # momento em que foram emitidos, e não o da gravação
+    timestamp = models.DateTimeField(
+        default=timezone.now, editable=False, help_text="Data e hora do log."
+    )
     level = models.CharField(
         max_length=10, choices=LEVEL_CHOICES, help_text="Nível do log."
     )
@@ -301,3 +421,160 @@ class ApplicationLog(models.Model):
             models.Index(fields=["module"]),
             models.Index(fields=["timestamp"]),
         ]
+
+
+class ApplicationLogResumo(models.Model):
+    """
+    Contagem de logs por hora, nível e módulo, atualizada a cada gravação de
+    logs (LoggingService). Os gráficos do dashboard e a análise de logs leem
+    daqui em vez de agregar ApplicationLog, e o resumo sobrevive à limpeza
+    dos logs antigos (retenção própria em LOG_RESUMO_RETENCAO_DIAS).
+    """
+
+    periodo = models.DateTimeField(help_text="Início da hora (UTC) agregada.")
+    level = models.CharField(
+        max_length=10, choices=ApplicationLog.LEVEL_CHOICES, help_text="Nível do log."
+    )
+    module = models.CharField(max_length=255, help_text="Módulo onde o log foi gerado.")
+    quantidade = models.PositiveIntegerField(
+        default=0, help_text="Logs do nível e módulo na hora."
+    )
+
+    def __str__(self):
+        return f"{self.periodo:%Y-%m-%d %H}h [{self.level}] {self.module}: {self.quantidade}"
+
+    class Meta:
+        verbose_name = "Resumo de Logs"
+        verbose_name_plural = "Resumos de Logs"
+        ordering = ["-periodo"]
+        # Também serve de índice para as consultas por intervalo de periodo
+        unique_together = ("periodo", "level", "module")
+
+
+class SincronizacaoLoteJob(models.Model):
+    """
+    Acompanha uma sincronização em lote de fornecedores de uma empresa.
+
+    A extração via ODBC e o enfileiramento das tarefas rodam em segundo plano
+    (tasks.executar_sincronizacao_lote_task); a view só cria o job e devolve o id.
+    """
+
+    STATUS_PENDENTE = "PENDENTE"
+    STATUS_EM_ANDAMENTO = "EM_ANDAMENTO"
+    STATUS_CONCLUIDO = "CONCLUIDO"
+    STATUS_ERRO = "ERRO"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDENTE, "Pendente"),
+        (STATUS_EM_ANDAMENTO, "Em Andamento"),
+        (STATUS_CONCLUIDO, "Concluído"),
+        (STATUS_ERRO, "Erro"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    codi_emp = models.IntegerField(_("Código da Empresa ODBC"), db_index=True)
+    cnpj_empresa = models.CharField(_("CNPJ da Empresa"), max_length=20)
+    status = models.CharField(
+        _("Status"), max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDENTE
+    )
+    fornecedores_lidos = models.PositiveIntegerField(_("Fornecedores Lidos"), default=0)
+    fornecedores_ignorados = models.PositiveIntegerField(
+        _("Fornecedores Ignorados"),
+        default=0,
+        help_text="Fornecedores sem código, CNPJ ou nome.",
+    )
+    fornecedores_enfileirados = models.PositiveIntegerField(
+        _("Fornecedores Enfileirados"), default=0
+    )
+    tarefas_enfileiradas = models.PositiveIntegerField(
+        _("Tarefas Enfileiradas"),
+        default=0,
+        help_text="Cada tarefa sincroniza um grupo de fornecedores.",
+    )
+    mensagem = models.TextField(_("Mensagem"), null=True, blank=True)
+    created_at = models.DateTimeField(_("Criado em"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Atualizado em"), auto_now=True)
+    finished_at = models.DateTimeField(_("Finalizado em"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Job de Sincronização em Lote")
+        verbose_name_plural = _("Jobs de Sincronização em Lote")
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Lote {self.id} - Empresa {self.codi_emp}: {self.get_status_display()}"
+
+
+class EspelhoRegistro(models.Model):
+    """
+    Cópia local de uma linha das tabelas bethadba (geempre, effornece,
+    efclientes, ctcontas, efacumuladores) de uma empresa habilitada.
+
+    Mantida por services.espelho_service, que compara hash_linha para aplicar
+    só inserções, alterações e exclusões a cada atualização.
+    """
+
+    entidade = models.CharField(_("Entidade"), max_length=30)
+    codi_emp = models.IntegerField(_("Código da Empresa ODBC"))
+    chave = models.CharField(_("Chave na Origem"), max_length=50)
+    # Cópia numérica da chave (quando inteira) para ordenar como o ODBC
+    chave_numerica = models.BigIntegerField(null=True, blank=True)
+    nome = models.CharField(_("Nome"), max_length=255, blank=True, default="")
+    documento = models.CharField(_("Documento"), max_length=100, blank=True, default="")
+    dados = models.JSONField(_("Dados da Linha"))
+    hash_linha = models.CharField(_("Hash da Linha"), max_length=64)
+    atualizado_em = models.DateTimeField(_("Atualizado em"))
+
+    class Meta:
+        verbose_name = _("Registro do Espelho ODBC")
+        verbose_name_plural = _("Registros do Espelho ODBC")
+        unique_together = ("entidade", "codi_emp", "chave")
+        indexes = [
+            models.Index(fields=["entidade", "codi_emp", "chave_numerica", "chave"]),
+            models.Index(fields=["entidade", "codi_emp", "documento"]),
+        ]
+
+    def __str__(self):
+        return f"Espelho {self.entidade} - Empresa {self.codi_emp} - {self.chave}"
+
+
+class EspelhoEstado(models.Model):
+    """
+    Situação do espelho de uma entidade de uma empresa: quando foi atualizado
+    por último e o que mudou. As listagens só usam o espelho se a última
+    atualização bem-sucedida for recente (ESPELHO_ODBC_IDADE_MAXIMA).
+    """
+
+    STATUS_EM_ANDAMENTO = "EM_ANDAMENTO"
+    STATUS_CONCLUIDO = "CONCLUIDO"
+    STATUS_ERRO = "ERRO"
+
+    STATUS_CHOICES = [
+        (STATUS_EM_ANDAMENTO, "Em Andamento"),
+        (STATUS_CONCLUIDO, "Concluído"),
+        (STATUS_ERRO, "Erro"),
+    ]
+
+    entidade = models.CharField(_("Entidade"), max_length=30)
+    codi_emp = models.IntegerField(_("Código da Empresa ODBC"))
+    status = models.CharField(
+        _("Status"), max_length=20, choices=STATUS_CHOICES, default=STATUS_EM_ANDAMENTO
+    )
+    registros = models.PositiveIntegerField(_("Registros"), default=0)
+    inseridos = models.PositiveIntegerField(_("Inseridos"), default=0)
+    atualizados = models.PositiveIntegerField(_("Atualizados"), default=0)
+    removidos = models.PositiveIntegerField(_("Removidos"), default=0)
+    ultima_atualizacao = models.DateTimeField(
+        _("Última Atualização Bem-Sucedida"), null=True, blank=True
+    )
+    mensagem = models.TextField(_("Mensagem"), null=True, blank=True)
+    updated_at = models.DateTimeField(_("Atualizado em"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Estado do Espelho ODBC")
+        verbose_name_plural = _("Estados do Espelho ODBC")
+        unique_together = ("entidade", "codi_emp")
+        ordering = ["codi_emp", "entidade"]
+
+    def __str__(self):
+        return f"Espelho {self.entidade} - Empresa {self.codi_emp}: {self.get_status_display()}"
@@ -0,0 +1,202 @@
+"""
+Métricas do dashboard calculadas a partir dos dados de sincronização.
+
+Todas as métricas saem de uma única consulta agregada (subconsultas escalares
+sobre FornecedorStatusSincronizacao, EmpresaSincronizacao e a fila do
+django-background-tasks, cada uma servida por um índice) e ficam no cache do
+Django por DASHBOARD_METRICAS_TTL segundos: atualizar o dashboard custa uma
+leitura do cache, qualquer que seja o tamanho da tabela de status. Com a fila
+de tarefas em um banco separado (sync.db_routers), a parte da fila vira uma
+segunda consulta nesse banco.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardMetricasService:
+    """
+    Calcula e mantém em cache as métricas exibidas no dashboard.
+    """
+
+    CHAVE_CACHE = "dashboard:metricas"
+
+    @property
+    def ttl(self) -> int:
+        return getattr(settings, "DASHBOARD_METRICAS_TTL", 30)
+
+    def obter(self) -> Dict[str, Any]:
+        """Métricas do cache ou, se expiradas, recalculadas."""
+        if self.ttl > 0:
+            try:
+                metricas = cache.get(self.CHAVE_CACHE)
+            except Exception as e:
+                logger.warning(f"Métricas do dashboard: cache indisponível ({e}).")
+                metricas = None
+            if metricas is not None:
+                return metricas
+
+        metricas = self.calcular()
+        if self.ttl > 0:
+            try:
+                cache.set(self.CHAVE_CACHE, metricas, self.ttl)
+            except Exception as e:
+                logger.warning(f"Métricas do dashboard: Falha ao guardar no cache: {e}")
+        return metricas
+
+    def calcular(self) -> Dict[str, Any]:
+        """Executa a consulta agregada e deriva as taxas."""
+        from background_task.models import Task
+
+        from ..models import FornecedorStatusSincronizacao
+
+        agora = timezone.now()
+        alias = router.db_for_read(FornecedorStatusSincronizacao) or "default"
+        alias_fila = router.db_for_read(Task) or "default"
+
+        partes = self._partes_status(alias, agora) + self._partes_empresas(alias)
+        if alias_fila == alias:
+            partes += self._partes_fila(alias, agora)
+            valores = self._executar(alias, partes)
+        else:
+            valores = self._executar(alias, partes)
+            valores.update(
+                self._executar(alias_fila, self._partes_fila(alias_fila, agora))
+            )
+
+        sincronizados = valores["sincronizados"]
+        erros = valores["com_erro"]
+        sincronizados_24h = valores["sincronizados_24h"]
+        erros_24h = valores["erros_24h"]
+        valores.update(
+            {
+                "nao_sincronizados": valores["fornecedores_total"]
+                - sincronizados
+                - erros
+                - valores["em_andamento"],
+                "taxa_erro": self._percentual(erros, sincronizados + erros),
+                "taxa_sucesso": self._percentual(sincronizados, sincronizados + erros),
+                "taxa_erro_24h": self._percentual(
+                    erros_24h, sincronizados_24h + erros_24h
+                ),
+                "vazao_hora": valores["sincronizados_1h"],
+                "vazao_media_24h": round(sincronizados_24h / 24, 1),
+                "ultima_tentativa": self._datahora(valores["ultima_tentativa"]),
+                "calculado_em": agora,
+            }
+        )
+        return valores
+
+    def invalidar(self) -> None:
+        cache.delete(self.CHAVE_CACHE)
+
+    # ------------------------------------------------------------------ #
+    # Partes da consulta: (nome, subconsulta escalar, parâmetros)
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _partes_status(alias: str, agora: datetime) -> List[Tuple[str, str, list]]:
+        from ..models import FornecedorStatusSincronizacao as Status
+
+        ops = connections[alias].ops
+        tabela = ops.quote_name(Status._meta.db_table)
+        desde_1h = ops.adapt_datetimefield_value(agora - timedelta(hours=1))
+        desde_24h = ops.adapt_datetimefield_value(agora - timedelta(hours=24))
+        por_status = f"SELECT COUNT(*) FROM {tabela} WHERE status_sincronizacao = %s"
+        # status + janela de tempo: faixa do índice (status, ultima_tentativa_sinc)
+        por_janela = f"{por_status} AND ultima_tentativa_sinc >= %s"
+        return [
+            ("fornecedores_total", f"SELECT COUNT(*) FROM {tabela}", []),
+            ("sincronizados", por_status, [Status.STATUS_SINCRONIZADO]),
+            ("com_erro", por_status, [Status.STATUS_ERRO]),
+            ("em_andamento", por_status, [Status.STATUS_EM_ANDAMENTO]),
+            ("sincronizados_1h", por_janela, [Status.STATUS_SINCRONIZADO, desde_1h]),
+            ("sincronizados_24h", por_janela, [Status.STATUS_SINCRONIZADO, desde_24h]),
+            ("erros_24h", por_janela, [Status.STATUS_ERRO, desde_24h]),
+            (
+                "ultima_tentativa",
+                f"SELECT MAX(ultima_tentativa_sinc) FROM {tabela}",
+                [],
+            ),
+        ]
+
+    @staticmethod
+    def _partes_empresas(alias: str) -> List[Tuple[str, str, list]]:
+        from ..models import EmpresaSincronizacao
+
+        tabela = connections[alias].ops.quote_name(EmpresaSincronizacao._meta.db_table)
+        return [
+            ("empresas_total", f"SELECT COUNT(*) FROM {tabela}", []),
+            (
+                "empresas_habilitadas",
+                f"SELECT COUNT(*) FROM {tabela} WHERE habilitada_sincronizacao = %s",
+                [True],
+            ),
+        ]
+
+    @staticmethod
+    def _partes_fila(alias: str, agora: datetime) -> List[Tuple[str, str, list]]:
+        from background_task.models import Task
+
+        ops = connections[alias].ops
+        tabela = ops.quote_name(Task._meta.db_table)
+        return [
+            ("fila_total", f"SELECT COUNT(*) FROM {tabela}", []),
+            (
+                "fila_pendentes",
+                f"SELECT COUNT(*) FROM {tabela} WHERE run_at <= %s "
+                f"AND failed_at IS NULL AND locked_by IS NULL",
+                [ops.adapt_datetimefield_value(agora)],
+            ),
+            (
+                "fila_em_execucao",
+                f"SELECT COUNT(*) FROM {tabela} WHERE locked_by IS NOT NULL",
+                [],
+            ),
+            (
+                "fila_falhas",
+                f"SELECT COUNT(*) FROM {tabela} WHERE failed_at IS NOT NULL",
+                [],
+            ),
+        ]
+
+    # ------------------------------------------------------------------ #
+    # Auxiliares
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _executar(alias: str, partes: List[Tuple[str, str, list]]) -> Dict[str, Any]:
+        sql = "SELECT " + ", ".join(f"({subconsulta})" for _, subconsulta, _ in partes)
+        parametros = [p for _, _, params in partes for p in params]
+        with connections[alias].cursor() as cursor:
+            cursor.execute(sql, parametros)
+            linha = cursor.fetchone()
+        return {nome: valor for (nome, _, _), valor in zip(partes, linha)}
+
+    @staticmethod
+    def _percentual(parte: int, total: int) -> Optional[float]:
+        if not total:
+            return None
+        return round(parte * 100 / total, 1)
+
+    @staticmethod
+    def _datahora(valor: Any) -> Optional[datetime]:
+        # O SQLite devolve texto nas consultas cruas; outros bancos, datetime
+        if valor is None or isinstance(valor, datetime):
+            return valor
+        momento = parse_datetime(str(valor))
+        if momento is not None and settings.USE_TZ and timezone.is_naive(momento):
+            momento = momento.replace(tzinfo=dt_timezone.utc)
+        return momento
+
+
+# Instância padrão do serviço
+dashboard_metricas_service = DashboardMetricasService()
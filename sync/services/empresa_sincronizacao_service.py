@@ -2,6 +2,8 @@ import logging
 from typing import Dict, List, Optional, Any, Tuple
 from sync.models import EmpresaSincronizacao
 from .odbc_connection import ODBCConnectionManager  # Para interagir com list_empresas
+from .espelho_service import ENTIDADE_EMPRESAS, espelho_service
+from .listagem_cache import listagem_cache
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +37,19 @@ class EmpresaSincronizacaoService:
             f"Sincronização para empresa {codi_emp} {'habilitada' if habilitar else 'desabilitada'}. "
             f"Registro {'criado' if created else 'atualizado'}."
         )
+
+        # O espelho local só é mantido para empresas habilitadas
+        try:
+            if habilitar:
+                from sync.tasks import atualizar_espelho_task
+
+                atualizar_espelho_task(codi_emp=codi_emp)
+            else:
+                espelho_service.remover_empresa(codi_emp)
+        except Exception as e:
+            logger.error(
+                f"Erro ao {'agendar' if habilitar else 'descartar'} o espelho ODBC da empresa {codi_emp}: {e}"
+            )
         return empresa_sinc, created
 
     def get_status_sincronizacao_empresas(
@@ -98,11 +113,17 @@ class EmpresaSincronizacaoService:
                 }
 
         # Chamar o ODBC manager, passando a lista de codi_emps se o filtro estiver ativo
-        empresas_odbc_result = self.odbc_manager.list_empresas(
-            filters=filters,
-            page_number=page_number,
-            page_size=page_size,
-            codi_emp_in_list=codi_emps_para_filtrar_odbc,  # Passa a lista aqui
+        parametros = {
+            "filters": filters,
+            "page_number": page_number,
+            "page_size": page_size,
+            "codi_emp_in_list": codi_emps_para_filtrar_odbc,  # Passa a lista aqui
+        }
+        empresas_odbc_result = listagem_cache.obter(
+            ENTIDADE_EMPRESAS,
+            None,
+            parametros,
+            lambda: self.odbc_manager.list_empresas(**parametros),
         )
 
         if not empresas_odbc_result.get("success"):
@@ -156,8 +177,8 @@ class EmpresaSincronizacaoService:
         """
         logger.debug(f"Buscando detalhes para a empresa com codi_emp: {codi_emp}")
 
-        # 1. Buscar dados básicos da empresa no ODBC
-        empresa_odbc_data = self.odbc_manager.get_empresa_by_codi_emp(codi_emp)
+        # 1. Buscar dados básicos da empresa (espelho local, se em dia, ou ODBC)
+        empresa_odbc_data = espelho_service.get_empresa(codi_emp)
 
         if not empresa_odbc_data:
             logger.info(
@@ -0,0 +1,605 @@
+"""
+Espelho local das tabelas bethadba usadas pelo conector.
+
+Para cada empresa com sincronização habilitada, copia geempre, effornece,
+efclientes, ctcontas e efacumuladores para EspelhoRegistro. A atualização é
+incremental: cada linha lida via ODBC tem seu hash comparado com o do espelho
+e só inserções, alterações e exclusões são gravadas. As listagens da UI usam o
+espelho enquanto a última atualização for mais recente que
+ESPELHO_ODBC_IDADE_MAXIMA e, fora disso, consultam o ODBC como antes.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from sync.models import EmpresaSincronizacao, EspelhoEstado, EspelhoRegistro
+from .listagem_cache import listagem_cache
+from .odbc_connection import ODBCConnectionManager, odbc_manager
+
+logger = logging.getLogger(__name__)
+
+ENTIDADE_EMPRESAS = "empresas"
+
+# Método list_* do ODBCConnectionManager usado quando o espelho não está em dia
+METODOS_LISTAGEM_ODBC = {
+    "fornecedores": "list_fornecedores_empresa",
+    "clientes": "list_clientes_empresa",
+    "planos_de_contas": "list_plano_de_contas_empresa",
+    "acumuladores": "list_acumuladores_empresa",
+}
+
+
+class EspelhoService:
+    """
+    Atualiza e consulta o espelho local das tabelas ODBC.
+    """
+
+    # Quantidade máxima de chaves por cláusula IN (limite de variáveis do SQLite)
+    TAMANHO_MAXIMO_IN = 900
+
+    CAMPOS_ATUALIZADOS = [
+        "chave_numerica",
+        "nome",
+        "documento",
+        "dados",
+        "hash_linha",
+        "atualizado_em",
+    ]
+
+    def __init__(
+        self,
+        odbc_manager: Optional[ODBCConnectionManager] = None,
+        tamanho_lote: Optional[int] = None,
+        idade_maxima: Optional[int] = None,
+    ):
+        self._odbc_manager = odbc_manager
+        self._tamanho_lote = tamanho_lote
+        self._idade_maxima = idade_maxima
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Listagens na fila ou rodando no executor, pelos argumentos de listar()
+        self._em_andamento: Dict[str, Future] = {}
+        self._lock_em_andamento = threading.Lock()
+
+    @property
+    def manager(self) -> ODBCConnectionManager:
+        return self._odbc_manager or odbc_manager
+
+    @property
+    def tamanho_lote(self) -> int:
+        return self._tamanho_lote or getattr(settings, "ESPELHO_ODBC_TAMANHO_LOTE", 500)
+
+    @property
+    def idade_maxima(self) -> int:
+        if self._idade_maxima is not None:
+            return self._idade_maxima
+        return getattr(settings, "ESPELHO_ODBC_IDADE_MAXIMA", 3600)
+
+    @property
+    def entidades(self) -> Dict[str, Dict[str, str]]:
+        """
+        Entidades espelhadas: tabela de origem, colunas e os campos usados
+        como chave, nome e documento (os mesmos dos filtros da UI).
+        """
+        entidades = {
+            ENTIDADE_EMPRESAS: {
+                "source_table_name": "bethadba.geempre",
+                "fields_to_select_str": "codi_emp, cgce_emp, razao_emp",
+                "campo_chave": "codi_emp",
+                "campo_nome": "razao_emp",
+                "campo_documento": "cgce_emp",
+            }
+        }
+        for entidade, source in ODBCConnectionManager.ENTITY_SOURCES.items():
+            entidades[entidade] = {
+                **source,
+                "campo_chave": source["default_order_by_field"],
+                "campo_nome": source["name_field_db"],
+                "campo_documento": source["cgce_field_db"],
+            }
+        return entidades
+
+    # ------------------------------------------------------------------ #
+    # Atualização
+    # ------------------------------------------------------------------ #
+    def atualizar_todas(
+        self, entidades: Optional[Iterable[str]] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Atualiza o espelho de todas as empresas habilitadas e descarta o das
+        empresas que deixaram de estar habilitadas.
+
+        Returns:
+            Mapa codi_emp -> resultado de atualizar_empresa.
+        """
+        habilitadas = list(
+            EmpresaSincronizacao.objects.filter(
+                habilitada_sincronizacao=True
+            ).values_list("codi_emp", flat=True)
+        )
+
+        desabilitadas = (
+            EspelhoEstado.objects.exclude(codi_emp__in=habilitadas)
+            .values_list("codi_emp", flat=True)
+            .distinct()
+        )
+        for codi_emp in list(desabilitadas):
+            self.remover_empresa(codi_emp)
+
+        return {
+            codi_emp: self.atualizar_empresa(codi_emp, entidades)
+            for codi_emp in habilitadas
+        }
+
+    def atualizar_empresa(
+        self, codi_emp: int, entidades: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Atualiza as entidades (todas, se omitidas) de uma empresa. Uma falha
+        em uma entidade é registrada no seu EspelhoEstado e não impede as demais.
+
+        Returns:
+            Mapa entidade -> contagens (ver atualizar_entidade) ou {"erro": ...}.
+        """
+        resultados: Dict[str, Any] = {}
+        for entidade in entidades or self.entidades:
+            try:
+                resultados[entidade] = self.atualizar_entidade(entidade, codi_emp)
+            except Exception as e:
+                resultados[entidade] = {"erro": str(e)}
+        return resultados
+
+    def atualizar_entidade(self, entidade: str, codi_emp: int) -> Dict[str, int]:
+        """
+        Lê a entidade da empresa via ODBC e aplica ao espelho apenas as
+        diferenças (comparando o hash de cada linha).
+
+        Returns:
+            Dicionário com registros, inseridos, atualizados e removidos.
+
+        Raises:
+            ValueError: Se a entidade não for conhecida.
+            Exception: Erros de leitura ODBC, depois de registrados no estado.
+        """
+        config = self._config_entidade(entidade)
+        EspelhoEstado.objects.update_or_create(
+            entidade=entidade,
+            codi_emp=codi_emp,
+            defaults={"status": EspelhoEstado.STATUS_EM_ANDAMENTO, "mensagem": None},
+        )
+        registros_espelho = EspelhoRegistro.objects.filter(
+            entidade=entidade, codi_emp=codi_emp
+        )
+        hashes = dict(registros_espelho.values_list("chave", "hash_linha"))
+
+        agora = timezone.now()
+        vistas = set()
+        inseridos = 0
+        atualizados = 0
+        try:
+            for lote in self._ler_origem(entidade, codi_emp, config):
+                gravar = []
+                for linha in lote:
+                    registro = self._montar_registro(
+                        entidade, codi_emp, config, linha, agora
+                    )
+                    if registro is None or registro.chave in vistas:
+                        continue
+                    vistas.add(registro.chave)
+
+                    hash_anterior = hashes.get(registro.chave)
+                    if hash_anterior == registro.hash_linha:
+                        continue
+                    if hash_anterior is None:
+                        inseridos += 1
+                    else:
+                        atualizados += 1
+                    gravar.append(registro)
+
+                if gravar:
+                    # Upsert: tolera outra atualização concorrente da mesma empresa
+                    with transaction.atomic():
+                        EspelhoRegistro.objects.bulk_create(
+                            gravar,
+                            update_conflicts=True,
+                            unique_fields=["entidade", "codi_emp", "chave"],
+                            update_fields=self.CAMPOS_ATUALIZADOS,
+                            batch_size=500,
+                        )
+
+            removidas = [chave for chave in hashes if chave not in vistas]
+            for inicio in range(0, len(removidas), self.TAMANHO_MAXIMO_IN):
+                registros_espelho.filter(
+                    chave__in=removidas[inicio : inicio + self.TAMANHO_MAXIMO_IN]
+                ).delete()
+        except Exception as e:
+            logger.error(
+                f"Espelho: Erro ao atualizar {entidade} da empresa {codi_emp}: {e}",
+                exc_info=True,
+            )
+            EspelhoEstado.objects.filter(entidade=entidade, codi_emp=codi_emp).update(
+                status=EspelhoEstado.STATUS_ERRO,
+                mensagem=str(e),
+                updated_at=timezone.now(),
+            )
+            raise
+
+        if inseridos or atualizados or removidas:
+            if entidade == ENTIDADE_EMPRESAS:
+                listagem_cache.invalidar([ENTIDADE_EMPRESAS])
+            else:
+                listagem_cache.invalidar([entidade], codi_emp)
+
+        resultado = {
+            "registros": len(vistas),
+            "inseridos": inseridos,
+            "atualizados": atualizados,
+            "removidos": len(removidas),
+        }
+        EspelhoEstado.objects.filter(entidade=entidade, codi_emp=codi_emp).update(
+            status=EspelhoEstado.STATUS_CONCLUIDO,
+            ultima_atualizacao=timezone.now(),
+            mensagem=None,
+            updated_at=timezone.now(),
+            **resultado,
+        )
+        logger.info(
+            f"Espelho: {entidade} da empresa {codi_emp} atualizado "
+            f"({len(vistas)} registros, {inseridos} inseridos, {atualizados} atualizados, "
+            f"{len(removidas)} removidos)."
+        )
+        return resultado
+
+    def remover_empresa(self, codi_emp: int) -> int:
+        """Apaga o espelho de uma empresa. Retorna a quantidade de registros apagados."""
+        removidos, _ = EspelhoRegistro.objects.filter(codi_emp=codi_emp).delete()
+        EspelhoEstado.objects.filter(codi_emp=codi_emp).delete()
+        listagem_cache.invalidar_empresa(codi_emp)
+        logger.info(
+            f"Espelho: {removidos} registros da empresa {codi_emp} descartados."
+        )
+        return removidos
+
+    # ------------------------------------------------------------------ #
+    # Consulta
+    # ------------------------------------------------------------------ #
+    def esta_atualizado(self, entidade: str, codi_emp: int) -> bool:
+        """True se o espelho da entidade foi atualizado dentro da idade máxima."""
+        if self.idade_maxima <= 0:
+            return False
+        limite = timezone.now() - timedelta(seconds=self.idade_maxima)
+        return EspelhoEstado.objects.filter(
+            entidade=entidade, codi_emp=codi_emp, ultima_atualizacao__gte=limite
+        ).exists()
+
+    def listar(
+        self,
+        entidade: str,
+        codi_emp: int,
+        filters: Optional[Dict[str, Any]] = None,
+        page_number: int = 1,
+        page_size: int = 50,
+        keyset: bool = False,
+        page_cursor: Optional[str] = None,
+        exact_count: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Lista uma entidade da empresa com a mesma estrutura de retorno de
+        ODBCConnectionManager.list_*_empresa, mais a chave "origem"
+        ("espelho" ou "odbc"). Usa o espelho se estiver em dia; senão consulta
+        o ODBC (com cache das páginas, ver listagem_cache). exact_count só
+        vale para o ODBC: no espelho a contagem é local e sempre feita.
+        """
+        if entidade not in METODOS_LISTAGEM_ODBC:
+            raise ValueError(f"Entidade sem listagem por empresa: {entidade!r}.")
+
+        if self.esta_atualizado(entidade, codi_emp):
+            try:
+                return self._listar_espelho(
+                    entidade,
+                    codi_emp,
+                    filters,
+                    page_number,
+                    page_size,
+                    keyset,
+                    page_cursor,
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Espelho: Falha ao listar {entidade} da empresa {codi_emp} no espelho "
+                    f"({e}). Consultando o ODBC."
+                )
+
+        listar_odbc = getattr(self.manager, METODOS_LISTAGEM_ODBC[entidade])
+        parametros = {
+            "codi_emp": codi_emp,
+            "filters": filters,
+            "page_number": page_number,
+            "page_size": page_size,
+            "keyset": keyset,
+            "page_cursor": page_cursor,
+            "exact_count": exact_count,
+        }
+        resultado = listagem_cache.obter(
+            entidade, codi_emp, parametros, lambda: listar_odbc(**parametros)
+        )
+        resultado["origem"] = "odbc"
+        return resultado
+
+    def listar_em_paralelo(
+        self, consultas: Dict[str, Dict[str, Any]], prazo: Optional[float] = None
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Executa várias chamadas a listar() ao mesmo tempo, com um prazo comum.
+
+        Args:
+            consultas: nome -> argumentos de listar() (incluindo "entidade").
+            prazo: segundos de espera pelo conjunto (padrão:
+                LISTAGEM_PARALELA_PRAZO).
+
+        Returns:
+            nome -> resultado de listar(), ou None para as consultas que não
+            terminaram no prazo. As que já começaram continuam rodando e o
+            resultado fica no cache de listagens para a próxima requisição; as
+            que ainda estavam na fila são canceladas, para que um ODBC lento
+            não acumule trabalho atrasado à frente das requisições novas. Uma
+            listagem igual a outra em andamento reaproveita a mesma execução.
+        """
+        if prazo is None:
+            prazo = getattr(settings, "LISTAGEM_PARALELA_PRAZO", 8)
+        executor = self._get_executor()
+        futuros = {
+            nome: self._submeter(executor, argumentos)
+            for nome, argumentos in consultas.items()
+        }
+        wait(futuros.values(), timeout=prazo)
+
+        resultados = {}
+        for nome, futuro in futuros.items():
+            if not futuro.done() or futuro.cancelled():
+                cancelada = futuro.cancel()
+                logger.warning(
+                    f"Espelho: Listagem '{nome}' não terminou em {prazo}s"
+                    f"{' (cancelada na fila)' if cancelada else ''}; "
+                    f"exibindo aviso de carregamento."
+                )
+                resultados[nome] = None
+                continue
+            try:
+                resultados[nome] = futuro.result()
+            except Exception as e:
+                logger.error(f"Espelho: Erro na listagem '{nome}': {e}", exc_info=True)
+                resultados[nome] = {
+                    "success": False,
+                    "data": [],
+                    "total_records": 0,
+                    "error": str(e),
+                }
+        return resultados
+
+    def get_empresa(self, codi_emp: int) -> Optional[Dict[str, Any]]:
+        """
+        Como ODBCConnectionManager.get_empresa_by_codi_emp, mas lendo do
+        espelho quando ele está em dia.
+        """
+        if self.esta_atualizado(ENTIDADE_EMPRESAS, codi_emp):
+            registro = EspelhoRegistro.objects.filter(
+                entidade=ENTIDADE_EMPRESAS, codi_emp=codi_emp, chave=str(codi_emp)
+            ).first()
+            if registro is not None:
+                return {
+                    campo: self._valor_coluna(registro.dados, campo)
+                    for campo in ("codi_emp", "cgce_emp", "razao_emp")
+                }
+        return self.manager.get_empresa_by_codi_emp(codi_emp)
+
+    def _listar_espelho(
+        self,
+        entidade: str,
+        codi_emp: int,
+        filters: Optional[Dict[str, Any]],
+        page_number: int,
+        page_size: int,
+        keyset: bool,
+        page_cursor: Optional[str],
+    ) -> Dict[str, Any]:
+        config = self._config_entidade(entidade)
+        queryset = EspelhoRegistro.objects.filter(entidade=entidade, codi_emp=codi_emp)
+        if filters:
+            if filters.get(config["id_field_filter_name"]):
+                queryset = queryset.filter(
+                    chave=str(filters[config["id_field_filter_name"]]).strip()
+                )
+            if filters.get(config["name_field_filter_name"]):
+                queryset = queryset.filter(
+                    nome__icontains=filters[config["name_field_filter_name"]]
+                )
+            if filters.get(config["cgce_field_filter_name"]):
+                queryset = queryset.filter(
+                    documento=str(filters[config["cgce_field_filter_name"]]).strip()
+                )
+
+        total_records = queryset.count()
+        response = {
+            "success": True,
+            "data": [],
+            "total_records": total_records,
+            "current_page": page_number,
+            "page_size": page_size,
+            "total_pages": (total_records + page_size - 1) // page_size,
+            "next_cursor": None,
+            "has_next": False,
+            "error": None,
+            "origem": "espelho",
+        }
+        if not total_records:
+            return response
+
+        queryset = queryset.order_by("chave_numerica", "chave")
+        if keyset:
+            if page_cursor:
+                # Mesmo formato de cursor do ODBC: a última chave da página
+                ultima_chave = ODBCConnectionManager._decode_page_cursor(page_cursor)
+                if isinstance(ultima_chave, int):
+                    queryset = queryset.filter(chave_numerica__gt=ultima_chave)
+                else:
+                    queryset = queryset.filter(chave__gt=str(ultima_chave))
+            linhas = list(queryset.values_list("dados", flat=True)[: page_size + 1])
+            if len(linhas) > page_size:
+                linhas = linhas[:page_size]
+                response["next_cursor"] = ODBCConnectionManager._encode_page_cursor(
+                    self._valor_coluna(linhas[-1], config["campo_chave"])
+                )
+                response["has_next"] = True
+        else:
+            inicio = (page_number - 1) * page_size
+            linhas = list(
+                queryset.values_list("dados", flat=True)[inicio : inicio + page_size]
+            )
+            response["has_next"] = inicio + page_size < total_records
+        response["data"] = linhas
+        return response
+
+    # ------------------------------------------------------------------ #
+    # Auxiliares
+    # ------------------------------------------------------------------ #
+    def _listar_em_thread(self, argumentos: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return self.listar(**argumentos)
+        finally:
+            # A thread do executor não passa pelo ciclo de requisição do Django
+            close_old_connections()
+
+    def _submeter(
+        self, executor: ThreadPoolExecutor, argumentos: Dict[str, Any]
+    ) -> Future:
+        chave = json.dumps(argumentos, sort_keys=True, default=str)
+        with self._lock_em_andamento:
+            futuro = self._em_andamento.get(chave)
+            if futuro is not None:
+                return futuro
+            futuro = executor.submit(self._listar_em_thread, argumentos)
+            self._em_andamento[chave] = futuro
+        # Fora da trava: se o futuro já terminou, o callback roda nesta thread
+        futuro.add_done_callback(partial(self._liberar, chave))
+        return futuro
+
+    def _liberar(self, chave: str, futuro: Future) -> None:
+        with self._lock_em_andamento:
+            if self._em_andamento.get(chave) is futuro:
+                del self._em_andamento[chave]
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Um executor por processo, compartilhado entre as requisições: limita
+        # quantas conexões ODBC as listagens podem ocupar ao mesmo tempo.
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "LISTAGEM_PARALELA_THREADS", 4),
+                    thread_name_prefix="espelho-listagem",
+                )
+            return self._executor
+
+    def _config_entidade(self, entidade: str) -> Dict[str, str]:
+        config = self.entidades.get(entidade)
+        if config is None:
+            raise ValueError(
+                f"Entidade do espelho desconhecida: {entidade!r}. "
+                f"Use uma de: {', '.join(self.entidades)}."
+            )
+        return config
+
+    def _ler_origem(
+        self, entidade: str, codi_emp: int, config: Dict[str, str]
+    ) -> Iterator[List[Dict[str, Any]]]:
+        if entidade == ENTIDADE_EMPRESAS:
+            query = (
+                f"SELECT {config['fields_to_select_str']} FROM {config['source_table_name']} "
+                f"WHERE {config['campo_chave']} = ?"
+            )
+            return self.manager.iter_query(
+                query, (codi_emp,), batch_size=self.tamanho_lote
+            )
+        return self.manager.iter_entity(
+            entidade, codi_emp, batch_size=self.tamanho_lote
+        )
+
+    def _montar_registro(
+        self,
+        entidade: str,
+        codi_emp: int,
+        config: Dict[str, str],
+        linha: Dict[str, Any],
+        agora: datetime,
+    ) -> Optional[EspelhoRegistro]:
+        dados = {coluna: self._valor_json(valor) for coluna, valor in linha.items()}
+        valor_chave = self._valor_coluna(dados, config["campo_chave"])
+        if valor_chave is None or str(valor_chave).strip() == "":
+            return None
+        chave = str(valor_chave).strip()
+
+        conteudo = json.dumps(
+            dados, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        )
+        return EspelhoRegistro(
+            entidade=entidade,
+            codi_emp=codi_emp,
+            chave=chave,
+            chave_numerica=self._chave_numerica(valor_chave),
+            nome=str(self._valor_coluna(dados, config["campo_nome"]) or "")[:255],
+            documento=str(
+                self._valor_coluna(dados, config["campo_documento"]) or ""
+            ).strip()[:100],
+            dados=dados,
+            hash_linha=hashlib.sha256(conteudo.encode("utf-8")).hexdigest(),
+            atualizado_em=agora,
+        )
+
+    @staticmethod
+    def _valor_coluna(linha: Dict[str, Any], coluna: str) -> Any:
+        """Valor de uma coluna sem diferenciar maiúsculas (ex.: CODI_ACU)."""
+        if coluna in linha:
+            return linha[coluna]
+        coluna = coluna.lower()
+        return next(
+            (valor for nome, valor in linha.items() if nome.lower() == coluna), None
+        )
+
+    @staticmethod
+    def _valor_json(valor: Any) -> Any:
+        """Converte um valor lido do ODBC para um tipo serializável em JSON."""
+        if valor is None or isinstance(valor, (bool, int, float, str)):
+            return valor
+        if isinstance(valor, Decimal):
+            return int(valor) if valor == valor.to_integral() else str(valor)
+        if isinstance(valor, (datetime, date)):
+            return valor.isoformat()
+        if isinstance(valor, (bytes, bytearray)):
+            return valor.hex()
+        return str(valor)
+
+    @staticmethod
+    def _chave_numerica(valor: Any) -> Optional[int]:
+        if isinstance(valor, bool):
+            return None
+        if isinstance(valor, int):
+            return valor
+        texto = str(valor).strip()
+        if texto.isdigit():
+            return int(texto)
+        return None
+
+
+# Instância única para views, tarefas e comandos
+espelho_service = EspelhoService()
@@ -4,9 +4,13 @@ Serviço para gerenciar a configuração e comunicação com a API Fiscaut.
 
 import requests
 import logging
-from typing import Dict, Any, Optional, Tuple
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from sync.models import FiscautApiConfig, FornecedorStatusSincronizacao
 from django.conf import settings
+from .fiscaut_http import build_fiscaut_session, fiscaut_sessions
+from .fiscaut_retry import PoliticaRetentativa
+from .rate_limiter import fiscaut_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +24,7 @@ class FiscautApiService:
         # Opcional: Carregar config aqui se for usada em múltiplos métodos
         # e para evitar múltiplas buscas no DB.
         self.config = self._get_db_config()
+        self.retentativas = PoliticaRetentativa()
 
     def _get_db_config(self):
         try:
@@ -105,14 +110,23 @@ class FiscautApiService:
             }
 
         test_endpoint = f"{target_url.rstrip('/')}/up"
-        headers = {
-            "Authorization": f"Bearer {target_key}",
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
+
+        # Credenciais da configuração salva usam a sessão compartilhada;
+        # credenciais ainda não salvas usam uma sessão avulsa.
+        current_config = self.get_config()
+        usa_sessao_compartilhada = bool(
+            current_config
+            and current_config.api_url == target_url
+            and current_config.api_key == target_key
+        )
+        http = (
+            fiscaut_sessions.get_session(target_url, target_key)
+            if usa_sessao_compartilhada
+            else build_fiscaut_session(target_key)
+        )
 
         try:
-            response = requests.get(test_endpoint, headers=headers, timeout=15)
+            response = http.get(test_endpoint, timeout=15)
 
             if response.status_code == 200:
                 try:
@@ -156,6 +170,9 @@ class FiscautApiService:
                 "success": False,
                 "message": f"Ocorreu um erro inesperado durante o teste: {e}",
             }
+        finally:
+            if not usa_sessao_compartilhada:
+                http.close()
 
     def sincronizar_fornecedor(
         self,
@@ -180,158 +197,541 @@ class FiscautApiService:
         Returns:
             Um dicionário com o status da operação e dados/mensagens.
         """
+        endpoint, http, erro = self._preparar_envio_fornecedor()
+        if erro:
+            # Não registraremos tentativa aqui, pois é uma falha de pré-condição do sistema
+            return erro
+
+        payload = {
+            "cnpj_empresa": cnpj_empresa,
+            "nome_fornecedor": nome_fornecedor,
+            "cnpj_fornecedor": cnpj_fornecedor,
+            "conta_contabil_fornecedor": conta_contabil_fornecedor,
+        }
+
+        response_dict_to_return, sinc_sucesso_api, detalhes_para_registro = (
+            self._enviar_fornecedor(http, endpoint, payload)
+        )
+
+        try:
+            FornecedorStatusSincronizacao.registrar_sincronizacao(
+                codi_emp_odbc=codi_emp_odbc,
+                codi_for_odbc=codi_for_odbc,
+                sucesso=sinc_sucesso_api,
+                detalhes_resposta=detalhes_para_registro,
+                hash_payload=FornecedorStatusSincronizacao.calcular_hash_payload(
+                    payload
+                ),
+            )
+        except Exception as e_reg:
+            logger.error(
+                f"CRÍTICA: Exceção ao chamar registrar_sincronizacao no service: {e_reg}",
+                exc_info=True,
+            )  # Mantido como erro crítico
+
+        return response_dict_to_return
+
+    def sincronizar_fornecedores_lote(
+        self,
+        cnpj_empresa: str,
+        codi_emp_odbc: int,
+        fornecedores: List[Dict[str, str]],
+    ) -> Dict[str, Any]:
+        """
+        Envia vários fornecedores da mesma empresa para a API Fiscaut pela
+        sessão HTTP compartilhada e registra todos os status com uma única
+        escrita em lote ao final.
+
+        Com tamanho_lote_envio > 1 na configuração, os fornecedores são enviados
+        em arrays desse tamanho; se o servidor recusar um lote, o restante é
+        enviado um a um.
+
+        Args:
+            cnpj_empresa: CNPJ da empresa à qual os fornecedores pertencem.
+            codi_emp_odbc: Código da empresa no sistema ODBC.
+            fornecedores: Dicionários com codi_for_odbc, nome_fornecedor,
+                cnpj_fornecedor e conta_contabil_fornecedor.
+
+        Returns:
+            Dicionário com success, message, sucessos, falhas e a lista
+            "resultados" (codi_for_odbc, success, message) por fornecedor.
+        """
+        endpoint, http, erro = self._preparar_envio_fornecedor()
+        if erro:
+            return {**erro, "sucessos": 0, "falhas": 0, "resultados": []}
+
+        tamanho_bloco = max(1, self.get_config().tamanho_lote_envio or 1)
+        envio_em_bloco = tamanho_bloco > 1
+
+        resultados = []
+        registros = []
+        try:
+            for inicio in range(0, len(fornecedores), tamanho_bloco):
+                bloco = fornecedores[inicio : inicio + tamanho_bloco]
+                payloads = [
+                    self.montar_payload_fornecedor(cnpj_empresa, fornecedor)
+                    for fornecedor in bloco
+                ]
+
+                respostas = None
+                if envio_em_bloco and len(bloco) > 1:
+                    respostas = self._enviar_fornecedores_em_bloco(
+                        http, endpoint, payloads
+                    )
+                    if respostas is None:
+                        # Servidor recusou o lote: envia um a um daqui em diante
+                        envio_em_bloco = False
+                if respostas is None:
+                    respostas = [
+                        self._enviar_fornecedor(http, endpoint, payload)
+                        for payload in payloads
+                    ]
+
+                for fornecedor, payload, (resultado, sucesso, detalhes) in zip(
+                    bloco, payloads, respostas
+                ):
+                    registros.append(
+                        {
+                            "codi_for_odbc": fornecedor["codi_for_odbc"],
+                            "sucesso": sucesso,
+                            "detalhes_resposta": detalhes,
+                            "hash_payload": FornecedorStatusSincronizacao.calcular_hash_payload(
+                                payload
+                            ),
+                        }
+                    )
+                    resultados.append(
+                        {
+                            "codi_for_odbc": fornecedor["codi_for_odbc"],
+                            "success": sucesso,
+                            "message": resultado.get("message"),
+                        }
+                    )
+        finally:
+            # Registra o que já foi enviado mesmo se o laço for interrompido
+            try:
+                FornecedorStatusSincronizacao.registrar_sincronizacoes_em_lote(
+                    codi_emp_odbc=codi_emp_odbc, registros=registros
+                )
+            except Exception as e_reg:
+                logger.error(
+                    f"CRÍTICA: Exceção ao registrar em lote o status de {len(registros)} "
+                    f"fornecedores da empresa {codi_emp_odbc}: {e_reg}",
+                    exc_info=True,
+                )
+
+        sucessos = sum(1 for r in resultados if r["success"])
+        falhas = len(resultados) - sucessos
+        return {
+            "success": True,
+            "message": f"{sucessos} de {len(resultados)} fornecedores sincronizados com sucesso.",
+            "sucessos": sucessos,
+            "falhas": falhas,
+            "resultados": resultados,
+        }
+
+    def _preparar_envio_fornecedor(
+        self,
+    ) -> Tuple[Optional[str], Optional[requests.Session], Optional[Dict[str, Any]]]:
+        """
+        Monta o endpoint do envio de fornecedores e obtém a sessão HTTP
+        compartilhada (com os cabeçalhos de autenticação) da configuração ativa.
+
+        Returns:
+            (endpoint, sessão, None) ou (None, None, dicionário de erro) se a
+            configuração da API estiver ausente ou incompleta.
+        """
         current_config = self.get_config()
         if not current_config:
-            # Não registraremos tentativa aqui, pois é uma falha de pré-condição do sistema
-            return {
-                "success": False,
-                "message": "Configuração da API Fiscaut não encontrada. Por favor, configure-a primeiro.",
-            }
+            return (
+                None,
+                None,
+                {
+                    "success": False,
+                    "message": "Configuração da API Fiscaut não encontrada. Por favor, configure-a primeiro.",
+                },
+            )
 
         target_url = current_config.api_url
         target_key = current_config.api_key
 
         if not target_url or not target_key:
-            return {
-                "success": False,
-                "message": "URL da API ou Chave da API não configuradas.",
-            }
+            return (
+                None,
+                None,
+                {
+                    "success": False,
+                    "message": "URL da API ou Chave da API não configuradas.",
+                },
+            )
 
         endpoint = f"{target_url.rstrip('/')}/contabil/fornecedores"
+        return endpoint, fiscaut_sessions.get_session(target_url, target_key), None
 
-        payload = {
+    @staticmethod
+    def montar_payload_fornecedor(
+        cnpj_empresa: str, fornecedor: Dict[str, str]
+    ) -> Dict[str, str]:
+        return {
             "cnpj_empresa": cnpj_empresa,
-            "nome_fornecedor": nome_fornecedor,
-            "cnpj_fornecedor": cnpj_fornecedor,
-            "conta_contabil_fornecedor": conta_contabil_fornecedor,
+            "nome_fornecedor": fornecedor["nome_fornecedor"],
+            "cnpj_fornecedor": fornecedor["cnpj_fornecedor"],
+            "conta_contabil_fornecedor": fornecedor["conta_contabil_fornecedor"],
         }
 
-        headers = {
-            "Authorization": f"Bearer {target_key}",
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
+    def _enviar_fornecedores_em_bloco(
+        self,
+        http: requests.Session,
+        endpoint: str,
+        payloads: List[Dict[str, Any]],
+    ) -> Optional[List[Tuple[Dict[str, Any], bool, Any]]]:
+        """
+        Envia vários fornecedores em uma única requisição (array JSON) e
+        interpreta o resultado de cada item.
 
-        # logger.info(f"DEBUG_SINC_FORN: Iniciando sincronização para Empresa ODBC {codi_emp_odbc}, Forn ODBC {codi_for_odbc}.")
-        # logger.debug(f"DEBUG_SINC_FORN: Payload para API Fiscaut: {payload}")
+        A resposta deve trazer uma lista de resultados na mesma ordem do envio,
+        seja como corpo da resposta ou nas chaves "resultados", "results" ou
+        "data". Cada item é um objeto com "status" (bool) e, opcionalmente,
+        "message" e "cnpj_fornecedor" (usado para conferir a ordem).
 
-        response_dict_to_return = {}
-        sinc_sucesso_api = False
-        detalhes_para_registro = None
+        Returns:
+            Uma tupla (resposta, sucesso, detalhes) por payload, como em
+            _enviar_fornecedor, ou None se o servidor recusou o lote ou a
+            resposta não pôde ser associada aos itens. Nesse caso o chamador
+            deve reenviar os itens individualmente. Falhas transitórias são
+            repetidas para o lote inteiro; esgotadas as tentativas, todos os
+            itens voltam com falha (sem reenvio individual).
+        """
+        tentativa = 1
+        while True:
+            if not self._aguardar_limite_taxa():
+                mensagem = "Limite de requisições da API Fiscaut: tempo de espera por uma vaga esgotado."
+                return [
+                    ({"success": False, "message": mensagem}, False, mensagem)
+                ] * len(payloads)
+
+            try:
+                response = http.post(endpoint, json=payloads, timeout=60)
+            except (
+                requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+            ) as e:
+                espera = self.retentativas.espera_apos_falha_de_conexao(tentativa)
+                if espera is None:
+                    # Reenviar item a item só multiplicaria a carga sobre uma
+                    # API que já está instável: todos ficam com ERRO.
+                    logger.warning(
+                        f"Lote de {len(payloads)} fornecedores não enviado à API Fiscaut "
+                        f"após {tentativa} tentativas: {e}."
+                    )
+                    return [
+                        self.resultado_falha_conexao(
+                            e, isinstance(e, requests.exceptions.Timeout)
+                        )
+                    ] * len(payloads)
+                logger.warning(
+                    f"Falha transitória ao enviar lote de {len(payloads)} fornecedores "
+                    f"(tentativa {tentativa}): {e}. Nova tentativa em {espera:.1f}s."
+                )
+            except requests.exceptions.RequestException as e:
+                logger.warning(
+                    f"Erro ao enviar lote de {len(payloads)} fornecedores para a API Fiscaut: {e}. "
+                    "Reenviando individualmente."
+                )
+                return None
+            else:
+                espera = self.retentativas.espera_apos_status(
+                    response.status_code, response.headers.get("Retry-After"), tentativa
+                )
+                if espera is None:
+                    break
+                logger.warning(
+                    f"API Fiscaut respondeu HTTP {response.status_code} ao lote de "
+                    f"{len(payloads)} fornecedores (tentativa {tentativa}). "
+                    f"Nova tentativa em {espera:.1f}s."
+                )
+
+            time.sleep(espera)
+            tentativa += 1
+
+        if response.status_code in self.retentativas.STATUS_RETENTAVEIS:
+            # Tentativas esgotadas: mesmo motivo acima para não reenviar item a item
+            return [self.interpretar_resposta_fornecedor(response)] * len(payloads)
+
+        if response.status_code not in (200, 201, 207):
+            logger.warning(
+                f"API Fiscaut recusou o lote de {len(payloads)} fornecedores "
+                f"(HTTP {response.status_code}). Reenviando individualmente."
+            )
+            return None
 
         try:
-            response = requests.post(
-                endpoint, headers=headers, json=payload, timeout=30
+            response_data = response.json()
+        except ValueError:
+            logger.warning(
+                "Resposta da API Fiscaut ao lote de fornecedores não é JSON. Reenviando individualmente."
             )
-            detalhes_para_registro = response.text
+            return None
 
-            if response.status_code == 200 or response.status_code == 201:
-                try:
-                    response_data = response.json()
-                    detalhes_para_registro = response_data
-                    # logger.info(f"DEBUG_SINC_FORN: Resposta API Fiscaut ({response.status_code}): {response_data}")
-
-                    if (
-                        isinstance(response_data, dict)
-                        and response_data.get("status") is True
-                    ):
-                        sinc_sucesso_api = True
-                        response_dict_to_return = {
-                            "success": True,
-                            "message": response_data.get(
-                                "message",
-                                "Dados do fornecedor processados com sucesso pela API Fiscaut.",
-                            ),
-                            "details": response_data,
-                            "status_code": response.status_code,
-                        }
-                    else:
-                        sinc_sucesso_api = False
-                        # logger.warning(f"DEBUG_SINC_FORN: API Fiscaut indicou falha lógica. Sucesso API: {sinc_sucesso_api}. Detalhes: {response_data}")
-                        response_dict_to_return = {
-                            "success": False,
-                            "message": response_data.get(
-                                "message",
-                                "API Fiscaut indicou uma falha na sincronização (lógica interna da API).",
-                            ),
-                            "details": response_data,
-                            "status_code": response.status_code,
-                        }
-                except ValueError:
-                    sinc_sucesso_api = False
-                    # logger.warning(f"DEBUG_SINC_FORN: Resposta API Fiscaut ({response.status_code}) não é JSON: {response.text[:200]}. Sucesso API: {sinc_sucesso_api}")
-                    response_dict_to_return = {
-                        "success": False,
-                        "message": f"Fornecedor enviado, mas a resposta da API não foi JSON (Status: {response.status_code}).",
-                        "details": response.text,
+        itens = response_data
+        if isinstance(response_data, dict):
+            itens = next(
+                (
+                    response_data[chave]
+                    for chave in ("resultados", "results", "data")
+                    if isinstance(response_data.get(chave), list)
+                ),
+                None,
+            )
+        if not isinstance(itens, list) or len(itens) != len(payloads):
+            logger.warning(
+                f"Resposta da API Fiscaut ao lote de {len(payloads)} fornecedores não traz "
+                "um resultado por item. Reenviando individualmente."
+            )
+            return None
+
+        respostas = []
+        for payload, item in zip(payloads, itens):
+            if not isinstance(item, dict):
+                return None
+            cnpj_item = item.get("cnpj_fornecedor")
+            if cnpj_item is not None and str(cnpj_item) != str(
+                payload["cnpj_fornecedor"]
+            ):
+                logger.warning(
+                    "Resultados do lote da API Fiscaut fora de ordem. Reenviando individualmente."
+                )
+                return None
+
+            sucesso = item.get("status") is True
+            mensagem = item.get(
+                "message",
+                (
+                    "Dados do fornecedor processados com sucesso pela API Fiscaut."
+                    if sucesso
+                    else "API Fiscaut indicou uma falha na sincronização (lógica interna da API)."
+                ),
+            )
+            respostas.append(
+                (
+                    {
+                        "success": sucesso,
+                        "message": mensagem,
+                        "details": item,
                         "status_code": response.status_code,
-                    }
-            else:
-                sinc_sucesso_api = False
-                # logger.warning(f"DEBUG_SINC_FORN: Erro HTTP {response.status_code} da API Fiscaut. Sucesso API: {sinc_sucesso_api}. Detalhes: {response.text[:200]}")
-                error_message = f"Falha ao enviar dados do fornecedor para API Fiscaut (HTTP {response.status_code})."
-                try:
-                    error_details_json = response.json()
-                    detalhes_para_registro = error_details_json
-                    error_message_api = error_details_json.get(
-                        "message", "Erro não especificado pela API."
-                    )
-                    details_api = error_details_json.get("errors", error_details_json)
-                    # logger.warning(f"{error_message} Detalhes da API: {details_api}") # Log original, não DEBUG_SINC_FORN
+                    },
+                    sucesso,
+                    item,
+                )
+            )
+        return respostas
+
+    def interpretar_resposta_fornecedor(
+        self, response
+    ) -> Tuple[Dict[str, Any], bool, Any]:
+        """
+        Interpreta a resposta da API ao envio de um fornecedor. Aceita tanto
+        requests.Response quanto httpx.Response (mesma interface usada aqui).
+
+        Returns:
+            (dicionário de resposta, sucesso na API, detalhes para registro)
+        """
+        response_dict_to_return = {}
+        sinc_sucesso_api = False
+        detalhes_para_registro = response.text
+
+        if response.status_code == 200 or response.status_code == 201:
+            try:
+                response_data = response.json()
+                detalhes_para_registro = response_data
+                # logger.info(f"DEBUG_SINC_FORN: Resposta API Fiscaut ({response.status_code}): {response_data}")
+
+                if (
+                    isinstance(response_data, dict)
+                    and response_data.get("status") is True
+                ):
+                    sinc_sucesso_api = True
                     response_dict_to_return = {
-                        "success": False,
-                        "message": f"API Fiscaut retornou erro {response.status_code}: {error_message_api}",
-                        "details": details_api,
+                        "success": True,
+                        "message": response_data.get(
+                            "message",
+                            "Dados do fornecedor processados com sucesso pela API Fiscaut.",
+                        ),
+                        "details": response_data,
                         "status_code": response.status_code,
                     }
-                except ValueError:
-                    # logger.warning(f"{error_message} Resposta: {response.text[:200]}") # Log original, não DEBUG_SINC_FORN
+                else:
+                    sinc_sucesso_api = False
+                    # logger.warning(f"DEBUG_SINC_FORN: API Fiscaut indicou falha lógica. Sucesso API: {sinc_sucesso_api}. Detalhes: {response_data}")
                     response_dict_to_return = {
                         "success": False,
-                        "message": error_message,
-                        "details": response.text,
+                        "message": response_data.get(
+                            "message",
+                            "API Fiscaut indicou uma falha na sincronização (lógica interna da API).",
+                        ),
+                        "details": response_data,
                         "status_code": response.status_code,
                     }
-
-        except requests.exceptions.Timeout:
-            sinc_sucesso_api = False
-            # logger.error(f"DEBUG_SINC_FORN: Timeout ao chamar API Fiscaut: {endpoint}. Sucesso API: {sinc_sucesso_api}")
-            detalhes_para_registro = "Timeout na requisição"
-            response_dict_to_return = {
-                "success": False,
-                "message": "Tempo limite excedido ao tentar enviar dados para a API Fiscaut.",
-            }
-        except requests.exceptions.RequestException as e:
+            except ValueError:
+                sinc_sucesso_api = False
+                # logger.warning(f"DEBUG_SINC_FORN: Resposta API Fiscaut ({response.status_code}) não é JSON: {response.text[:200]}. Sucesso API: {sinc_sucesso_api}")
+                response_dict_to_return = {
+                    "success": False,
+                    "message": f"Fornecedor enviado, mas a resposta da API não foi JSON (Status: {response.status_code}).",
+                    "details": response.text,
+                    "status_code": response.status_code,
+                }
+        else:
             sinc_sucesso_api = False
-            # logger.error(f"DEBUG_SINC_FORN: Erro de requisição API Fiscaut: {e}. Sucesso API: {sinc_sucesso_api}")
-            detalhes_para_registro = str(e)
-            response_dict_to_return = {
-                "success": False,
-                "message": f"Erro ao conectar à API Fiscaut para enviar dados: {e}",
-            }
+            # logger.warning(f"DEBUG_SINC_FORN: Erro HTTP {response.status_code} da API Fiscaut. Sucesso API: {sinc_sucesso_api}. Detalhes: {response.text[:200]}")
+            error_message = f"Falha ao enviar dados do fornecedor para API Fiscaut (HTTP {response.status_code})."
+            try:
+                error_details_json = response.json()
+                detalhes_para_registro = error_details_json
+                error_message_api = error_details_json.get(
+                    "message", "Erro não especificado pela API."
+                )
+                details_api = error_details_json.get("errors", error_details_json)
+                # logger.warning(f"{error_message} Detalhes da API: {details_api}") # Log original, não DEBUG_SINC_FORN
+                response_dict_to_return = {
+                    "success": False,
+                    "message": f"API Fiscaut retornou erro {response.status_code}: {error_message_api}",
+                    "details": details_api,
+                    "status_code": response.status_code,
+                }
+            except ValueError:
+                # logger.warning(f"{error_message} Resposta: {response.text[:200]}") # Log original, não DEBUG_SINC_FORN
+                response_dict_to_return = {
+                    "success": False,
+                    "message": error_message,
+                    "details": response.text,
+                    "status_code": response.status_code,
+                }
+
+        return response_dict_to_return, sinc_sucesso_api, detalhes_para_registro
+
+    def parametros_limite_taxa(self) -> Optional[Dict[str, Any]]:
+        """
+        Argumentos de fiscaut_rate_limiter.acquire para a configuração ativa
+        (None se não houver configuração).
+        """
+        current_config = self.get_config()
+        if not current_config:
+            return None
+        return {
+            "chave": f"fiscaut:{current_config.pk}",
+            "taxa": current_config.requisicoes_por_segundo,
+            "capacidade": current_config.rajada_maxima,
+            "timeout": getattr(settings, "FISCAUT_RATE_LIMIT_MAX_WAIT", 300),
+        }
+
+    def _aguardar_limite_taxa(self) -> bool:
+        """
+        Aguarda uma vaga no limitador de taxa compartilhado pelos processos,
+        conforme requisicoes_por_segundo / rajada_maxima da configuração ativa.
+
+        Returns:
+            False se a espera exceder FISCAUT_RATE_LIMIT_MAX_WAIT segundos.
+        """
+        parametros = self.parametros_limite_taxa()
+        if parametros is None:
+            return True
+        try:
+            return fiscaut_rate_limiter.acquire(**parametros)
         except Exception as e:
-            sinc_sucesso_api = False
-            # logger.error(f"DEBUG_SINC_FORN: Erro inesperado durante chamada API Fiscaut: {e}", exc_info=True)
-            detalhes_para_registro = str(e)
-            response_dict_to_return = {
-                "success": False,
-                "message": f"Ocorreu um erro inesperado ao enviar dados do fornecedor: {e}",
-            }
-        finally:
-            # logger.info(f"DEBUG_SINC_FORN: Antes de registrar_sincronizacao. Empresa ODBC: {codi_emp_odbc}, Forn ODBC: {codi_for_odbc}, Sucesso API: {sinc_sucesso_api}")
-            # logger.debug(f"DEBUG_SINC_FORN: Detalhes para registro: {detalhes_para_registro}")
+            # Falha no arquivo do limitador não deve interromper a sincronização
+            logger.warning(
+                f"Limitador de taxa da API Fiscaut indisponível ({e}). Enviando sem limite."
+            )
+            return True
+
+    def _enviar_fornecedor(
+        self, http: requests.Session, endpoint: str, payload: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], bool, Any]:
+        """
+        Faz o POST de um fornecedor e interpreta a resposta, sem registrar status.
+
+        Timeouts, erros de conexão e HTTP 429/502/503/504 são repetidos
+        conforme a política de retentativas (ver fiscaut_retry); demais
+        respostas de erro são devolvidas na primeira tentativa.
+
+        Args:
+            http: Sessão HTTP com os cabeçalhos da API (ver fiscaut_http).
+
+        Returns:
+            (dicionário de resposta, sucesso na API, detalhes para registro)
+        """
+        tentativa = 1
+        while True:
+            if not self._aguardar_limite_taxa():
+                mensagem = "Limite de requisições da API Fiscaut: tempo de espera por uma vaga esgotado."
+                return (
+                    {"success": False, "message": mensagem},
+                    False,
+                    mensagem,
+                )
+
             try:
-                status_obj = FornecedorStatusSincronizacao.registrar_sincronizacao(
-                    codi_emp_odbc=codi_emp_odbc,
-                    codi_for_odbc=codi_for_odbc,
-                    sucesso=sinc_sucesso_api,
-                    detalhes_resposta=detalhes_para_registro,
+                response = http.post(endpoint, json=payload, timeout=30)
+            except (
+                requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+            ) as e:
+                espera = self.retentativas.espera_apos_falha_de_conexao(tentativa)
+                if espera is None:
+                    return self.resultado_falha_conexao(
+                        e, isinstance(e, requests.exceptions.Timeout)
+                    )
+                logger.warning(
+                    f"Falha transitória ao enviar fornecedor para a API Fiscaut "
+                    f"(tentativa {tentativa}): {e}. Nova tentativa em {espera:.1f}s."
+                )
+            except requests.exceptions.RequestException as e:
+                return self.resultado_falha_conexao(e, timeout=False)
+            except Exception as e:
+                return (
+                    {
+                        "success": False,
+                        "message": f"Ocorreu um erro inesperado ao enviar dados do fornecedor: {e}",
+                    },
+                    False,
+                    str(e),
+                )
+            else:
+                espera = self.retentativas.espera_apos_status(
+                    response.status_code, response.headers.get("Retry-After"), tentativa
+                )
+                if espera is None:
+                    return self.interpretar_resposta_fornecedor(response)
+                logger.warning(
+                    f"API Fiscaut respondeu HTTP {response.status_code} ao envio de fornecedor "
+                    f"(tentativa {tentativa}). Nova tentativa em {espera:.1f}s."
                 )
-                # logger.info(f"DEBUG_SINC_FORN: Resultado de registrar_sincronizacao. Objeto: {status_obj}, Status salvo: {status_obj.status_sincronizacao if status_obj else 'N/A'}")
-            except Exception as e_reg:
-                logger.error(
-                    f"CRÍTICA: Exceção ao chamar registrar_sincronizacao no service: {e_reg}",
-                    exc_info=True,
-                )  # Mantido como erro crítico
 
-        return response_dict_to_return
+            time.sleep(espera)
+            tentativa += 1
+
+    @staticmethod
+    def resultado_falha_conexao(
+        erro: Exception, timeout: bool
+    ) -> Tuple[Dict[str, Any], bool, Any]:
+        """Resultado de um envio que não obteve resposta da API."""
+        if timeout:
+            return (
+                {
+                    "success": False,
+                    "message": "Tempo limite excedido ao tentar enviar dados para a API Fiscaut.",
+                },
+                False,
+                "Timeout na requisição",
+            )
+        return (
+            {
+                "success": False,
+                "message": f"Erro ao conectar à API Fiscaut para enviar dados: {erro}",
+            },
+            False,
+            str(erro),
+        )
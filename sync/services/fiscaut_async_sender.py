@@ -0,0 +1,279 @@
+"""
+Envio concorrente de fornecedores para a API Fiscaut com asyncio.
+
+Alternativa a FiscautApiService.sincronizar_fornecedores_lote para o envio
+individual: em vez de uma requisição por vez, mantém até `max_em_andamento`
+requisições simultâneas (httpx.AsyncClient + asyncio.Semaphore) em um único
+event loop, sem threads por requisição. Os resultados vão para uma fila
+consumida por um único escritor, que grava FornecedorStatusSincronizacao em
+lotes (registrar_sincronizacoes_em_lote).
+
+Requer o pacote opcional `httpx`.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from sync.models import FornecedorStatusSincronizacao
+from .fiscaut_api_service import FiscautApiService
+from .rate_limiter import fiscaut_rate_limiter
+
+try:
+    import httpx
+except ImportError:  # Dependência opcional
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+# Sinaliza ao escritor que não há mais resultados
+_FIM_DA_FILA = object()
+
+
+class FiscautAsyncSender:
+    """
+    Sincroniza fornecedores com requisições concorrentes limitadas.
+    """
+
+    def __init__(
+        self,
+        api_service: Optional[FiscautApiService] = None,
+        max_em_andamento: Optional[int] = None,
+        tamanho_lote_escrita: Optional[int] = None,
+    ):
+        self.api_service = api_service or FiscautApiService()
+        self.max_em_andamento = max(
+            1,
+            max_em_andamento or getattr(settings, "FISCAUT_ASYNC_MAX_EM_ANDAMENTO", 20),
+        )
+        self.tamanho_lote_escrita = max(
+            1,
+            tamanho_lote_escrita
+            or getattr(settings, "FISCAUT_ASYNC_TAMANHO_LOTE_ESCRITA", 100),
+        )
+
+    @staticmethod
+    def disponivel() -> bool:
+        """True se o cliente HTTP assíncrono (httpx) estiver instalado."""
+        return httpx is not None
+
+    def sincronizar_fornecedores(
+        self,
+        cnpj_empresa: str,
+        codi_emp_odbc: int,
+        fornecedores: List[Dict[str, str]],
+    ) -> Dict[str, Any]:
+        """
+        Envia os fornecedores concorrentemente e registra os status em lotes.
+
+        Mesma entrada e mesmo formato de retorno de
+        FiscautApiService.sincronizar_fornecedores_lote. Deve ser chamado fora
+        de um event loop (ex.: em uma tarefa de background).
+        """
+        if httpx is None:
+            return {
+                "success": False,
+                "message": "Envio assíncrono indisponível: o pacote 'httpx' não está instalado.",
+                "sucessos": 0,
+                "falhas": 0,
+                "resultados": [],
+            }
+
+        # Tudo que usa o ORM é resolvido antes de entrar no event loop
+        current_config = self.api_service.get_config()
+        if (
+            not current_config
+            or not current_config.api_url
+            or not current_config.api_key
+        ):
+            return {
+                "success": False,
+                "message": "Configuração da API Fiscaut não encontrada ou incompleta.",
+                "sucessos": 0,
+                "falhas": 0,
+                "resultados": [],
+            }
+        endpoint = f"{current_config.api_url.rstrip('/')}/contabil/fornecedores"
+        headers = {
+            "Authorization": f"Bearer {current_config.api_key}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
+        limite_taxa = self.api_service.parametros_limite_taxa()
+
+        resultados = asyncio.run(
+            self._executar(
+                cnpj_empresa,
+                codi_emp_odbc,
+                fornecedores,
+                endpoint,
+                headers,
+                limite_taxa,
+            )
+        )
+
+        sucessos = sum(1 for r in resultados if r["success"])
+        return {
+            "success": True,
+            "message": f"{sucessos} de {len(resultados)} fornecedores sincronizados com sucesso.",
+            "sucessos": sucessos,
+            "falhas": len(resultados) - sucessos,
+            "resultados": resultados,
+        }
+
+    # ------------------------------------------------------------------ #
+    # Event loop
+    # ------------------------------------------------------------------ #
+    async def _executar(
+        self,
+        cnpj_empresa: str,
+        codi_emp_odbc: int,
+        fornecedores: List[Dict[str, str]],
+        endpoint: str,
+        headers: Dict[str, str],
+        limite_taxa: Optional[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        semaforo = asyncio.Semaphore(self.max_em_andamento)
+        fila: asyncio.Queue = asyncio.Queue()
+        resultados: List[Dict[str, Any]] = []
+        escritor = asyncio.create_task(self._escritor(fila, codi_emp_odbc))
+
+        limites = httpx.Limits(
+            max_connections=self.max_em_andamento,
+            max_keepalive_connections=self.max_em_andamento,
+        )
+
+        async def enviar(fornecedor: Dict[str, str]) -> None:
+            payload = self.api_service.montar_payload_fornecedor(
+                cnpj_empresa, fornecedor
+            )
+            async with semaforo:
+                resultado, sucesso, detalhes = await self._enviar(
+                    client, endpoint, payload, limite_taxa
+                )
+            await fila.put(
+                {
+                    "codi_for_odbc": fornecedor["codi_for_odbc"],
+                    "sucesso": sucesso,
+                    "detalhes_resposta": detalhes,
+                    "hash_payload": FornecedorStatusSincronizacao.calcular_hash_payload(
+                        payload
+                    ),
+                }
+            )
+            resultados.append(
+                {
+                    "codi_for_odbc": fornecedor["codi_for_odbc"],
+                    "success": sucesso,
+                    "message": resultado.get("message"),
+                }
+            )
+
+        try:
+            async with httpx.AsyncClient(
+                headers=headers, limits=limites, timeout=30
+            ) as client:
+                await asyncio.gather(*(enviar(f) for f in fornecedores))
+        finally:
+            # O escritor grava o que já chegou mesmo se o envio for interrompido
+            await fila.put(_FIM_DA_FILA)
+            await escritor
+        return resultados
+
+    async def _enviar(
+        self,
+        client,
+        endpoint: str,
+        payload: Dict[str, Any],
+        limite_taxa: Optional[Dict[str, Any]],
+    ) -> Tuple[Dict[str, Any], bool, Any]:
+        retentativas = self.api_service.retentativas
+        tentativa = 1
+        while True:
+            if limite_taxa is not None:
+                try:
+                    liberado = await fiscaut_rate_limiter.acquire_async(**limite_taxa)
+                except Exception as e:
+                    logger.warning(
+                        f"Limitador de taxa da API Fiscaut indisponível ({e}). Enviando sem limite."
+                    )
+                    liberado = True
+                if not liberado:
+                    mensagem = "Limite de requisições da API Fiscaut: tempo de espera por uma vaga esgotado."
+                    return {"success": False, "message": mensagem}, False, mensagem
+
+            try:
+                response = await client.post(endpoint, json=payload)
+            except (
+                httpx.TimeoutException,
+                httpx.NetworkError,
+                httpx.RemoteProtocolError,
+            ) as e:
+                espera = retentativas.espera_apos_falha_de_conexao(tentativa)
+                if espera is None:
+                    return self.api_service.resultado_falha_conexao(
+                        e, isinstance(e, httpx.TimeoutException)
+                    )
+                logger.warning(
+                    f"Falha transitória ao enviar fornecedor para a API Fiscaut "
+                    f"(tentativa {tentativa}): {e}. Nova tentativa em {espera:.1f}s."
+                )
+            except httpx.HTTPError as e:
+                return self.api_service.resultado_falha_conexao(e, timeout=False)
+            except Exception as e:
+                return (
+                    {
+                        "success": False,
+                        "message": f"Ocorreu um erro inesperado ao enviar dados do fornecedor: {e}",
+                    },
+                    False,
+                    str(e),
+                )
+            else:
+                espera = retentativas.espera_apos_status(
+                    response.status_code, response.headers.get("Retry-After"), tentativa
+                )
+                if espera is None:
+                    return self.api_service.interpretar_resposta_fornecedor(response)
+                logger.warning(
+                    f"API Fiscaut respondeu HTTP {response.status_code} ao envio de fornecedor "
+                    f"(tentativa {tentativa}). Nova tentativa em {espera:.1f}s."
+                )
+
+            # A vaga do semáforo continua ocupada durante a espera: sob 429/503
+            # isso reduz a concorrência em vez de manter a API pressionada.
+            await asyncio.sleep(espera)
+            tentativa += 1
+
+    async def _escritor(self, fila: asyncio.Queue, codi_emp_odbc: int) -> None:
+        """Único consumidor da fila: grava os status em lotes."""
+        registrar = sync_to_async(
+            FornecedorStatusSincronizacao.registrar_sincronizacoes_em_lote,
+            thread_sensitive=True,
+        )
+        pendentes: List[Dict[str, Any]] = []
+
+        async def gravar() -> None:
+            try:
+                await registrar(codi_emp_odbc=codi_emp_odbc, registros=pendentes)
+            except Exception as e_reg:
+                logger.error(
+                    f"CRÍTICA: Exceção ao registrar em lote o status de {len(pendentes)} "
+                    f"fornecedores da empresa {codi_emp_odbc}: {e_reg}",
+                    exc_info=True,
+                )
+            pendentes.clear()
+
+        while True:
+            item = await fila.get()
+            if item is _FIM_DA_FILA:
+                break
+            pendentes.append(item)
+            if len(pendentes) >= self.tamanho_lote_escrita:
+                await gravar()
+
+        if pendentes:
+            await gravar()
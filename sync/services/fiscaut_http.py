@@ -0,0 +1,89 @@
+"""
+Sessão HTTP persistente para a API Fiscaut.
+
+Uma única requests.Session por processo, com keep-alive e pool de conexões,
+evita um novo handshake TCP/TLS a cada fornecedor enviado. A sessão é
+recriada quando a URL ou a chave da configuração mudam e após um fork.
+"""
+
+import logging
+import os
+import threading
+from typing import Optional, Tuple
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+def build_fiscaut_session(api_key: str) -> requests.Session:
+    """
+    Cria uma requests.Session com os cabeçalhos padrão da API Fiscaut e
+    adaptadores HTTP/HTTPS dimensionados por FISCAUT_HTTP_POOL_MAXSIZE.
+    """
+    pool_maxsize = getattr(settings, "FISCAUT_HTTP_POOL_MAXSIZE", 10)
+    session = requests.Session()
+    session.headers.update(
+        {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class FiscautSessionRegistry:
+    """
+    Mantém a sessão compartilhada do processo para a configuração ativa.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self._key: Optional[Tuple[str, str]] = None
+        self._pid = os.getpid()
+
+    def get_session(self, api_url: str, api_key: str) -> requests.Session:
+        """
+        Retorna a sessão para (api_url, api_key), recriando-a se a
+        configuração mudou desde a última chamada.
+        """
+        key = (api_url, api_key)
+        with self._lock:
+            if self._pid != os.getpid():
+                # Processo filho: as conexões herdadas pertencem ao pai
+                self._session = None
+                self._key = None
+                self._pid = os.getpid()
+
+            if self._session is not None and self._key == key:
+                return self._session
+
+            old_session = self._session
+            session = build_fiscaut_session(api_key)
+            self._session = session
+            self._key = key
+
+        if old_session is not None:
+            logger.info("Configuração da API Fiscaut alterada. Sessão HTTP recriada.")
+            old_session.close()
+        return session
+
+    def close(self) -> None:
+        """Fecha a sessão atual; a próxima chamada cria uma nova."""
+        with self._lock:
+            session = self._session
+            self._session = None
+            self._key = None
+        if session is not None:
+            session.close()
+
+
+# Instância única do processo
+fiscaut_sessions = FiscautSessionRegistry()
@@ -0,0 +1,114 @@
+"""
+Política de novas tentativas para as chamadas à API Fiscaut.
+
+Separa falhas transitórias (timeout, conexão recusada/reiniciada, HTTP 429,
+502, 503 e 504) das permanentes (demais respostas 4xx, como erros de
+validação). As transitórias são repetidas com backoff exponencial limitado e
+jitter, respeitando o cabeçalho Retry-After; as permanentes são devolvidas na
+hora para serem registradas como ERRO.
+
+O envio de fornecedores é um upsert por (cnpj_empresa, cnpj_fornecedor) na
+API, então repetir um POST cujo resultado se perdeu (ex.: timeout de leitura)
+não duplica dados.
+"""
+
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PoliticaRetentativa:
+    """
+    Decide se uma chamada deve ser repetida e quanto esperar antes disso.
+
+    - tentativas_maximas: total de tentativas, incluindo a primeira
+    - espera_base: segundos da primeira espera (dobra a cada tentativa)
+    - espera_maxima: teto de cada espera; um Retry-After acima dele encerra
+      as tentativas em vez de bloquear o worker
+    """
+
+    STATUS_RETENTAVEIS = frozenset({429, 502, 503, 504})
+
+    def __init__(
+        self,
+        tentativas_maximas: Optional[int] = None,
+        espera_base: Optional[float] = None,
+        espera_maxima: Optional[float] = None,
+    ):
+        if tentativas_maximas is None:
+            tentativas_maximas = getattr(settings, "FISCAUT_RETRY_TENTATIVAS", 4)
+        if espera_base is None:
+            espera_base = getattr(settings, "FISCAUT_RETRY_ESPERA_BASE", 1.0)
+        if espera_maxima is None:
+            espera_maxima = getattr(settings, "FISCAUT_RETRY_ESPERA_MAXIMA", 30.0)
+        self.tentativas_maximas = max(1, int(tentativas_maximas))
+        self.espera_base = max(0.0, float(espera_base))
+        self.espera_maxima = max(self.espera_base, float(espera_maxima))
+
+    def espera_apos_status(
+        self, status_code: int, retry_after: Optional[str], tentativa: int
+    ) -> Optional[float]:
+        """
+        Segundos a aguardar antes de repetir uma chamada que recebeu
+        `status_code` na tentativa `tentativa` (1 = primeira), ou None se a
+        resposta deve ser usada como está (sucesso, erro permanente ou
+        tentativas esgotadas).
+        """
+        if status_code not in self.STATUS_RETENTAVEIS:
+            return None
+        if tentativa >= self.tentativas_maximas:
+            return None
+
+        espera = self._backoff(tentativa)
+        segundos_servidor = self.interpretar_retry_after(retry_after)
+        if segundos_servidor is not None:
+            if segundos_servidor > self.espera_maxima:
+                logger.warning(
+                    f"API Fiscaut pediu {segundos_servidor:.0f}s de espera (Retry-After), "
+                    f"acima do máximo de {self.espera_maxima:.0f}s. Desistindo desta chamada."
+                )
+                return None
+            # Um pouco de jitter evita que todos os workers voltem juntos
+            espera = segundos_servidor + random.uniform(0, self.espera_base)
+        return espera
+
+    def espera_apos_falha_de_conexao(self, tentativa: int) -> Optional[float]:
+        """
+        Segundos a aguardar após um timeout ou erro de conexão na tentativa
+        `tentativa`, ou None se as tentativas se esgotaram.
+        """
+        if tentativa >= self.tentativas_maximas:
+            return None
+        return self._backoff(tentativa)
+
+    def _backoff(self, tentativa: int) -> float:
+        # Backoff exponencial com "full jitter": uniforme entre 0 e o teto
+        teto = min(self.espera_maxima, self.espera_base * (2 ** (tentativa - 1)))
+        return random.uniform(0, teto)
+
+    @staticmethod
+    def interpretar_retry_after(valor: Optional[str]) -> Optional[float]:
+        """
+        Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos
+        a partir de agora. Retorna None se ausente ou inválido.
+        """
+        if not valor:
+            return None
+        valor = valor.strip()
+        try:
+            return max(0.0, float(valor))
+        except ValueError:
+            pass
+        try:
+            data = parsedate_to_datetime(valor)
+        except (TypeError, ValueError, IndexError):
+            return None
+        if data is None:
+            return None
+        return max(0.0, data.timestamp() - time.time())
@@ -0,0 +1,172 @@
+"""
+Verificação de elegibilidade de fornecedores para sincronização com a API Fiscaut.
+
+Um fornecedor é elegível quando não tem registro em FornecedorStatusSincronizacao
+ou quando o status registrado é NAO_SINCRONIZADO ou ERRO. Informado o CNPJ da
+empresa, um fornecedor SINCRONIZADO também é elegível se o hash do payload atual
+diferir do último enviado com sucesso (nome, CNPJ ou conta alterados no ODBC).
+O status é carregado em conjunto (uma consulta values_list por empresa ou por
+lote de códigos) em vez de um .get() por fornecedor.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sync.models import FornecedorStatusSincronizacao
+from .fiscaut_api_service import FiscautApiService
+
+logger = logging.getLogger(__name__)
+
+
+class FornecedorElegibilidadeService:
+    """
+    Serviço para decidir, em lote, quais fornecedores devem ser sincronizados.
+    """
+
+    STATUS_ELEGIVEIS = frozenset(
+        {
+            FornecedorStatusSincronizacao.STATUS_NAO_SINCRONIZADO,
+            FornecedorStatusSincronizacao.STATUS_ERRO,
+        }
+    )
+
+    # Quantidade máxima de códigos por cláusula IN, abaixo do limite de
+    # variáveis do SQLite mesmo em versões antigas (999).
+    TAMANHO_MAXIMO_IN = 900
+
+    def carregar_status(
+        self, codi_emp: int, codi_fors: Optional[Iterable[str]] = None
+    ) -> Dict[str, str]:
+        """
+        Retorna o mapa codi_for_odbc -> status_sincronizacao da empresa.
+
+        Args:
+            codi_emp: Código da empresa no sistema ODBC.
+            codi_fors: Restringe a consulta a estes códigos de fornecedor. Se
+                omitido, carrega o status de todos os fornecedores da empresa.
+        """
+        return dict(
+            self._carregar(
+                codi_emp, codi_fors, ("codi_for_odbc", "status_sincronizacao")
+            )
+        )
+
+    def carregar_estado(
+        self, codi_emp: int, codi_fors: Optional[Iterable[str]] = None
+    ) -> Dict[str, Tuple[str, Optional[str]]]:
+        """
+        Como carregar_status, mas com o hash do último payload sincronizado:
+        codi_for_odbc -> (status_sincronizacao, hash_payload).
+        """
+        return {
+            codi_for: (status, hash_payload)
+            for codi_for, status, hash_payload in self._carregar(
+                codi_emp,
+                codi_fors,
+                ("codi_for_odbc", "status_sincronizacao", "hash_payload"),
+            )
+        }
+
+    def _carregar(
+        self, codi_emp: int, codi_fors: Optional[Iterable[str]], campos: Tuple[str, ...]
+    ) -> List[tuple]:
+        queryset = FornecedorStatusSincronizacao.objects.filter(codi_emp_odbc=codi_emp)
+        if codi_fors is None:
+            return list(queryset.values_list(*campos))
+
+        codigos = list(dict.fromkeys(str(codigo) for codigo in codi_fors))
+        linhas: List[tuple] = []
+        for inicio in range(0, len(codigos), self.TAMANHO_MAXIMO_IN):
+            trecho = codigos[inicio : inicio + self.TAMANHO_MAXIMO_IN]
+            linhas.extend(
+                queryset.filter(codi_for_odbc__in=trecho).values_list(*campos)
+            )
+        return linhas
+
+    def is_elegivel(self, status_sincronizacao: Optional[str]) -> bool:
+        """True se o status (None = sem registro) permite sincronizar."""
+        return (
+            status_sincronizacao is None
+            or status_sincronizacao in self.STATUS_ELEGIVEIS
+        )
+
+    def precisa_sincronizar(
+        self, estado: Optional[Tuple[str, Optional[str]]], hash_atual: str
+    ) -> bool:
+        """
+        True se o fornecedor é elegível pelo status ou se está SINCRONIZADO
+        com um payload diferente do atual. Registros sincronizados antes da
+        existência do hash (hash_payload vazio) são enviados uma vez para
+        gravá-lo.
+        """
+        if estado is None:
+            return True
+        status, hash_registrado = estado
+        if self.is_elegivel(status):
+            return True
+        return (
+            status == FornecedorStatusSincronizacao.STATUS_SINCRONIZADO
+            and hash_registrado != hash_atual
+        )
+
+    def filtrar_elegiveis(
+        self,
+        codi_emp: int,
+        fornecedores: List[Dict[str, Any]],
+        campo_codigo: str = "codi_for_odbc",
+        status_map: Optional[Dict[str, str]] = None,
+        cnpj_empresa: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Retorna, na ordem original, os fornecedores elegíveis para sincronização.
+
+        Args:
+            codi_emp: Código da empresa no sistema ODBC.
+            fornecedores: Dicionários com o código do fornecedor em campo_codigo.
+            campo_codigo: Chave do código do fornecedor nos dicionários.
+            status_map: Mapa já carregado com carregar_status(codi_emp) para a
+                empresa inteira. Se omitido, o status dos fornecedores recebidos
+                é carregado com uma única consulta. Ignorado com cnpj_empresa.
+            cnpj_empresa: Se informado, os fornecedores devem estar no formato
+                de FiscautApiService.montar_payload_fornecedor e os SINCRONIZADO
+                cujo payload mudou desde o último envio também são elegíveis.
+        """
+        if not fornecedores:
+            return []
+
+        if cnpj_empresa is not None:
+            estado_map = self.carregar_estado(
+                codi_emp, (str(f[campo_codigo]) for f in fornecedores)
+            )
+            elegiveis = [
+                fornecedor
+                for fornecedor in fornecedores
+                if self.precisa_sincronizar(
+                    estado_map.get(str(fornecedor[campo_codigo])),
+                    FornecedorStatusSincronizacao.calcular_hash_payload(
+                        FiscautApiService.montar_payload_fornecedor(
+                            cnpj_empresa, fornecedor
+                        )
+                    ),
+                )
+            ]
+        else:
+            if status_map is None:
+                status_map = self.carregar_status(
+                    codi_emp, (str(f[campo_codigo]) for f in fornecedores)
+                )
+            elegiveis = [
+                fornecedor
+                for fornecedor in fornecedores
+                if self.is_elegivel(status_map.get(str(fornecedor[campo_codigo])))
+            ]
+
+        logger.debug(
+            f"Elegibilidade: {len(elegiveis)} de {len(fornecedores)} fornecedores "
+            f"da empresa {codi_emp} elegíveis para sincronização."
+        )
+        return elegiveis
+
+
+# Instância única para uso nas views, tarefas e agendadores
+fornecedor_elegibilidade_service = FornecedorElegibilidadeService()
@@ -0,0 +1,218 @@
+"""
+Cache das páginas de listagem lidas via ODBC (empresas e as abas da empresa).
+
+Cada resultado bem-sucedido é guardado no cache do Django, serializado com
+pickle e comprimido com zlib, sob uma chave que combina a entidade, a empresa,
+os parâmetros da chamada e a configuração ODBC ativa. Política:
+
+- até LISTAGEM_CACHE_TTL segundos: a página é servida direto do cache;
+- depois disso, por mais LISTAGEM_CACHE_STALE segundos: a página antiga é
+  servida na hora e uma thread em segundo plano refaz a consulta
+  (stale-while-revalidate); só uma renovação por chave roda de cada vez;
+- depois disso: a consulta é feita na requisição, como sem cache.
+
+A invalidação usa um número de versão por escopo (entidade + empresa) que
+entra na chave: o espelho e os jobs de sincronização chamam invalidar() quando
+os dados mudam, e as entradas antigas deixam de ser encontradas e expiram
+sozinhas.
+
+Esses jobs rodam no process_tasks, fora dos processos web: o cache do Django
+precisa ser compartilhado entre os processos (CACHE_BACKEND "arquivo" ou
+"banco" em settings). Com um cache por processo ("memoria"), as versões
+novas ficam só no worker e o web continua servindo as páginas antigas até
+LISTAGEM_CACHE_TTL + LISTAGEM_CACHE_STALE segundos.
+"""
+
+import hashlib
+import json
+import logging
+import pickle
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from .odbc_config_registry import odbc_config_registry
+
+logger = logging.getLogger(__name__)
+
+ENTIDADES_POR_EMPRESA = ("fornecedores", "clientes", "planos_de_contas", "acumuladores")
+
+
+class ListagemCache:
+    """
+    Cache de resultados das listagens com renovação em segundo plano.
+    """
+
+    PREFIXO = "listagem"
+    # Tempo máximo que uma renovação segura a trava da chave
+    TRAVA_RENOVACAO = 60
+
+    def __init__(
+        self,
+        ttl: Optional[int] = None,
+        stale: Optional[int] = None,
+        max_renovacoes: int = 2,
+    ):
+        self._ttl = ttl
+        self._stale = stale
+        self._max_renovacoes = max_renovacoes
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self) -> int:
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, "LISTAGEM_CACHE_TTL", 60)
+
+    @property
+    def stale(self) -> int:
+        if self._stale is not None:
+            return self._stale
+        return getattr(settings, "LISTAGEM_CACHE_STALE", 300)
+
+    def obter(
+        self,
+        entidade: str,
+        codi_emp: Optional[int],
+        parametros: Dict[str, Any],
+        carregar: Callable[[], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Retorna o resultado de carregar() para a entidade/empresa/parâmetros,
+        usando o cache conforme a política do módulo. Resultados sem
+        "success" nunca são guardados.
+        """
+        if self.ttl <= 0:
+            return carregar()
+        try:
+            chave = self._chave(entidade, codi_emp, parametros)
+            entrada = cache.get(chave)
+        except Exception as e:
+            logger.warning(
+                f"Cache de listagem: indisponível para {entidade} ({e}). Consultando direto."
+            )
+            return carregar()
+
+        if entrada is not None:
+            criado_em, dados = entrada
+            idade = time.time() - criado_em
+            resultado = self._desserializar(dados)
+            if idade >= self.ttl:
+                self._agendar_renovacao(chave, carregar)
+            logger.debug(
+                f"Cache de listagem: {entidade} (empresa {codi_emp}) servido do cache "
+                f"({idade:.0f}s{', renovando' if idade >= self.ttl else ''})."
+            )
+            return resultado
+
+        resultado = carregar()
+        self._guardar(chave, resultado)
+        return resultado
+
+    def invalidar(
+        self, entidades: Iterable[str], codi_emp: Optional[int] = None
+    ) -> None:
+        """Descarta as listagens em cache das entidades da empresa (ou globais)."""
+        for entidade in entidades:
+            chave_versao = self._chave_versao(entidade, codi_emp)
+            try:
+                cache.set(chave_versao, self._nova_versao(), None)
+            except Exception as e:
+                logger.warning(
+                    f"Cache de listagem: Falha ao invalidar {entidade} da empresa {codi_emp}: {e}"
+                )
+                continue
+            logger.debug(
+                f"Cache de listagem: {entidade} da empresa {codi_emp} invalidado."
+            )
+
+    def invalidar_empresa(self, codi_emp: int) -> None:
+        """Descarta todas as abas da empresa em cache."""
+        self.invalidar(ENTIDADES_POR_EMPRESA, codi_emp)
+
+    # ------------------------------------------------------------------ #
+    # Auxiliares
+    # ------------------------------------------------------------------ #
+    def _guardar(self, chave: str, resultado: Dict[str, Any]) -> None:
+        if not resultado.get("success"):
+            return
+        try:
+            cache.set(
+                chave,
+                (time.time(), self._serializar(resultado)),
+                self.ttl + max(0, self.stale),
+            )
+        except Exception as e:
+            logger.warning(f"Cache de listagem: Falha ao guardar {chave}: {e}")
+
+    def _agendar_renovacao(
+        self, chave: str, carregar: Callable[[], Dict[str, Any]]
+    ) -> None:
+        # cache.add só grava se a trava não existir: evita renovações duplicadas
+        if not cache.add(f"{chave}:renovando", 1, self.TRAVA_RENOVACAO):
+            return
+        self._get_executor().submit(self._renovar, chave, carregar)
+
+    def _renovar(self, chave: str, carregar: Callable[[], Dict[str, Any]]) -> None:
+        try:
+            self._guardar(chave, carregar())
+        except Exception as e:
+            logger.warning(f"Cache de listagem: Falha ao renovar {chave}: {e}")
+        finally:
+            cache.delete(f"{chave}:renovando")
+            # A thread do executor não passa pelo ciclo de requisição do Django
+            close_old_connections()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_renovacoes,
+                    thread_name_prefix="listagem-cache",
+                )
+            return self._executor
+
+    def _chave(
+        self, entidade: str, codi_emp: Optional[int], parametros: Dict[str, Any]
+    ) -> str:
+        chave_versao = self._chave_versao(entidade, codi_emp)
+        versao = cache.get(chave_versao)
+        if versao is None:
+            cache.add(chave_versao, self._nova_versao(), None)
+            versao = cache.get(chave_versao)
+        bruto = json.dumps(
+            [parametros, odbc_config_registry.get_config()],
+            sort_keys=True,
+            default=str,
+            separators=(",", ":"),
+        )
+        resumo = hashlib.sha1(bruto.encode("utf-8")).hexdigest()
+        return f"{self.PREFIXO}:{entidade}:{codi_emp}:{versao}:{resumo}"
+
+    def _chave_versao(self, entidade: str, codi_emp: Optional[int]) -> str:
+        return f"{self.PREFIXO}:versao:{entidade}:{codi_emp}"
+
+    @staticmethod
+    def _nova_versao() -> int:
+        # Baseada no relógio, e não um contador: se a chave de versão for
+        # descartada pelo cache, uma versão antiga nunca é reutilizada.
+        return time.time_ns()
+
+    @staticmethod
+    def _serializar(resultado: Dict[str, Any]) -> bytes:
+        return zlib.compress(pickle.dumps(resultado, pickle.HIGHEST_PROTOCOL))
+
+    @staticmethod
+    def _desserializar(dados: bytes) -> Dict[str, Any]:
+        return pickle.loads(zlib.decompress(dados))
+
+
+# Instância padrão do serviço
+listagem_cache = ListagemCache()
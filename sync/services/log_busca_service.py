@@ -0,0 +1,115 @@
+"""
+Busca nos logs do banco (ApplicationLog) pelo índice de texto completo.
+
+A migração 0014 cria, no SQLite, a tabela virtual FTS5 sync_applicationlog_fts
+sobre message, module e func_name, mantida por gatilhos. Os filtros de texto
+da tela de logs viram uma única consulta MATCH nesse índice em vez de um
+LIKE '%...%' por coluna, que percorre a tabela inteira a cada página.
+
+A busca é por palavras: cada termo vira uma frase em que a última palavra
+pode estar incompleta ("falha con" encontra "Falha conexão ODBC"), sem
+diferenciar maiúsculas nem acentos. Sem o índice (outro banco, SQLite sem
+FTS5 ou gatilhos ausentes), ou para termos sem letras/números, o filtro
+volta a ser icontains.
+"""
+
+import logging
+import re
+import threading
+from typing import Dict, Optional
+
+from django.db import connections, router
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+TABELA_FTS = "sync_applicationlog_fts"
+GATILHOS_FTS = (
+    "sync_applicationlog_fts_ai",
+    "sync_applicationlog_fts_ad",
+    "sync_applicationlog_fts_au",
+)
+COLUNAS_FTS = ("message", "module", "func_name")
+
+
+class LogBuscaService:
+    """
+    Aplica os filtros de texto dos logs usando o índice FTS5 quando disponível.
+    """
+
+    def __init__(self):
+        self._disponivel: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    def filtrar(self, queryset, **termos: Optional[str]):
+        """
+        Filtra o queryset de ApplicationLog pelos termos informados por coluna
+        (message, module, func_name). Termos vazios são ignorados.
+        """
+        usar_indice = self.indice_disponivel(queryset.db)
+        expressoes = []
+        for coluna, termo in termos.items():
+            if coluna not in COLUNAS_FTS:
+                raise ValueError(f"Coluna sem busca de texto: {coluna}")
+            if not termo:
+                continue
+            expressao = self._expressao(coluna, termo) if usar_indice else None
+            if expressao:
+                expressoes.append(expressao)
+            else:
+                queryset = queryset.filter(**{f"{coluna}__icontains": termo})
+
+        if expressoes:
+            queryset = queryset.filter(
+                pk__in=RawSQL(
+                    f'SELECT rowid FROM "{TABELA_FTS}" WHERE "{TABELA_FTS}" MATCH %s',
+                    [" AND ".join(expressoes)],
+                )
+            )
+        return queryset
+
+    def indice_disponivel(self, alias: Optional[str] = None) -> bool:
+        """Indica se o banco dos logs tem o índice FTS5 e seus gatilhos."""
+        from ..models import ApplicationLog
+
+        alias = alias or router.db_for_read(ApplicationLog) or "default"
+        with self._lock:
+            if alias in self._disponivel:
+                return self._disponivel[alias]
+
+        conexao = connections[alias]
+        disponivel = False
+        if conexao.vendor == "sqlite":
+            try:
+                with conexao.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+                        [TABELA_FTS, *GATILHOS_FTS],
+                    )
+                    encontrados = {linha[0] for linha in cursor.fetchall()}
+            except Exception as e:
+                logger.warning(f"Busca de logs: Falha ao verificar o índice FTS5: {e}")
+                return False
+            disponivel = encontrados == {TABELA_FTS, *GATILHOS_FTS}
+            if TABELA_FTS in encontrados and not disponivel:
+                logger.warning(
+                    "Busca de logs: índice FTS5 sem os gatilhos de atualização "
+                    "(tabela de logs recriada?). Usando busca por icontains."
+                )
+
+        with self._lock:
+            self._disponivel[alias] = disponivel
+        return disponivel
+
+    @staticmethod
+    def _expressao(coluna: str, termo: str) -> Optional[str]:
+        # Só letras e números: o tokenizador unicode61 trata o resto como
+        # separador, e assim nenhum caractere da sintaxe do FTS5 chega à consulta
+        palavras = re.findall(r"[^\W_]+", termo)
+        if not palavras:
+            return None
+        return f'{coluna} : "{" ".join(palavras)}"*'
+
+
+# Instância padrão do serviço
+log_busca_service = LogBuscaService()
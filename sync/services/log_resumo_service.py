@@ -0,0 +1,225 @@
+"""
+Resumo dos logs por hora, nível e módulo (ApplicationLogResumo).
+
+O LoggingService chama registrar() na mesma transação em que grava os logs:
+cada lote vira poucas linhas de "upsert" (quantidade = quantidade + n) em vez
+de uma linha por log. O dashboard e a análise de logs leem séries e totais
+daqui, então um gráfico de semanas custa algumas centenas de linhas do resumo
+em vez de uma varredura de ApplicationLog.
+"""
+
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDay
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+NIVEIS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+
+class LogResumoService:
+    """
+    Manutenção incremental e consultas do resumo de logs.
+    """
+
+    @property
+    def retencao_dias(self) -> int:
+        return getattr(settings, "LOG_RESUMO_RETENCAO_DIAS", 365)
+
+    def registrar(self, logs: Iterable[Any]) -> int:
+        """
+        Soma os logs (objetos ou dicts com timestamp, level e module) ao resumo.
+        Falhas não interrompem a gravação dos logs: o resumo é atualizado em
+        um savepoint próprio e o erro só é registrado.
+
+        Returns:
+            Quantidade de linhas do resumo atualizadas (0 em caso de falha).
+        """
+        contagem = self.contar(logs)
+        try:
+            return self.somar(contagem)
+        except Exception as e:
+            logger.error(
+                f"Resumo de logs: Falha ao atualizar {len(contagem)} linhas: {e}"
+            )
+            return 0
+
+    def contar(self, logs: Iterable[Any]) -> Counter:
+        """Quantidade de logs por (início da hora em UTC, level, module)."""
+        return Counter(self._chave(log) for log in logs)
+
+    def somar(self, contagem: Mapping[tuple, int]) -> int:
+        """
+        Soma as quantidades {(periodo, level, module): n} ao resumo, em um
+        savepoint próprio.
+
+        Returns:
+            Quantidade de linhas do resumo atualizadas.
+
+        Raises:
+            django.db.Error: Se o "upsert" falhar.
+        """
+        from ..models import ApplicationLogResumo
+
+        if not contagem:
+            return 0
+
+        conexao = connections[router.db_for_write(ApplicationLogResumo)]
+        tabela = conexao.ops.quote_name(ApplicationLogResumo._meta.db_table)
+        sql = (
+            f"INSERT INTO {tabela} (periodo, level, module, quantidade) "
+            f"VALUES (%s, %s, %s, %s) "
+            f"ON CONFLICT (periodo, level, module) "
+            f"DO UPDATE SET quantidade = {tabela}.quantidade + excluded.quantidade"
+        )
+        parametros = [
+            (conexao.ops.adapt_datetimefield_value(periodo), level, module, quantidade)
+            for (periodo, level, module), quantidade in contagem.items()
+        ]
+        with transaction.atomic(using=conexao.alias):
+            with conexao.cursor() as cursor:
+                cursor.executemany(sql, parametros)
+        return len(parametros)
+
+    def serie(
+        self,
+        inicio: datetime,
+        fim: datetime,
+        por_dia: bool = False,
+        modulo: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Contagem por período (hora ou dia local) e nível entre inicio e fim,
+        com os períodos sem logs preenchidos com zero.
+
+        Returns:
+            Lista ordenada de {"periodo": datetime|date, "niveis": {nivel: n},
+            "total": n}.
+        """
+        consulta = self._filtrar(inicio, fim, modulo)
+        if por_dia:
+            linhas = (
+                consulta.annotate(dia=TruncDay("periodo"))
+                .values("dia", "level")
+                .annotate(quantidade=Sum("quantidade"))
+                .order_by()
+            )
+            valores = {(l["dia"].date(), l["level"]): l["quantidade"] for l in linhas}
+            periodos = self._dias(inicio, fim)
+        else:
+            linhas = (
+                consulta.values("periodo", "level")
+                .annotate(quantidade=Sum("quantidade"))
+                .order_by()
+            )
+            valores = {(l["periodo"], l["level"]): l["quantidade"] for l in linhas}
+            periodos = self._horas(inicio, fim)
+
+        serie = []
+        for periodo in periodos:
+            niveis = {nivel: valores.get((periodo, nivel), 0) for nivel in NIVEIS}
+            serie.append(
+                {"periodo": periodo, "niveis": niveis, "total": sum(niveis.values())}
+            )
+        return serie
+
+    def totais(
+        self, inicio: datetime, fim: datetime, modulo: Optional[str] = None
+    ) -> Dict[str, int]:
+        """Quantidade de logs por nível entre inicio e fim."""
+        linhas = (
+            self._filtrar(inicio, fim, modulo)
+            .values("level")
+            .annotate(quantidade=Sum("quantidade"))
+            .order_by()
+        )
+        totais = {nivel: 0 for nivel in NIVEIS}
+        totais.update({l["level"]: l["quantidade"] for l in linhas})
+        return totais
+
+    def modulos(
+        self,
+        inicio: datetime,
+        fim: datetime,
+        niveis: Sequence[str] = ("ERROR", "CRITICAL"),
+        limite: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """Módulos com mais logs dos níveis informados entre inicio e fim."""
+        return list(
+            self._filtrar(inicio, fim)
+            .filter(level__in=niveis)
+            .values("module")
+            .annotate(quantidade=Sum("quantidade"))
+            .order_by("-quantidade", "module")[:limite]
+        )
+
+    def purgar(self, dias: Optional[int] = None) -> int:
+        """Apaga o resumo anterior a `dias` (padrão: LOG_RESUMO_RETENCAO_DIAS; 0 = manter)."""
+        from ..models import ApplicationLogResumo
+
+        dias = self.retencao_dias if dias is None else dias
+        if not dias or dias <= 0:
+            return 0
+        limite = timezone.now() - timedelta(days=dias)
+        return ApplicationLogResumo.objects.filter(periodo__lt=limite).delete()[0]
+
+    # ------------------------------------------------------------------ #
+    # Auxiliares
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _chave(log: Any) -> tuple:
+        if isinstance(log, dict):
+            momento, level, module = (
+                log.get("timestamp"),
+                log["level"],
+                log["module"],
+            )
+        else:
+            momento, level, module = log.timestamp, log.level, log.module
+        momento = (momento or timezone.now()).astimezone(dt_timezone.utc)
+        return (momento.replace(minute=0, second=0, microsecond=0), level, module)
+
+    @staticmethod
+    def _filtrar(inicio: datetime, fim: datetime, modulo: Optional[str] = None):
+        from ..models import ApplicationLogResumo
+
+        consulta = ApplicationLogResumo.objects.filter(
+            periodo__gte=inicio, periodo__lt=fim
+        )
+        if modulo:
+            consulta = consulta.filter(module__icontains=modulo)
+        return consulta
+
+    @staticmethod
+    def _horas(inicio: datetime, fim: datetime) -> List[datetime]:
+        hora = inicio.astimezone(dt_timezone.utc).replace(
+            minute=0, second=0, microsecond=0
+        )
+        horas = []
+        while hora < fim:
+            if hora >= inicio:
+                horas.append(hora)
+            hora += timedelta(hours=1)
+        return horas
+
+    @staticmethod
+    def _dias(inicio: datetime, fim: datetime) -> List[date]:
+        dia = timezone.localtime(inicio).date()
+        ultimo = timezone.localtime(fim - timedelta(microseconds=1)).date()
+        dias = []
+        while dia <= ultimo:
+            dias.append(dia)
+            dia += timedelta(days=1)
+        return dias
+
+
+# Instância padrão do serviço
+log_resumo_service = LogResumoService()
@@ -0,0 +1,168 @@
+"""
+Retenção dos logs gravados no banco (ApplicationLog).
+
+Cada nível é mantido por um número de dias (LOG_RETENCAO_DIAS). A limpeza
+apaga em lotes de chaves primárias, cada lote em sua própria transação curta,
+para que o banco nunca fique travado por muito tempo e os demais processos
+(gravação de logs, sincronização) continuem escrevendo entre um lote e outro.
+Ao final, as estatísticas da tabela são atualizadas (ANALYZE) e, se o arquivo
+tiver espaço livre suficiente, ele é compactado (VACUUM).
+"""
+
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import connections, router
+from django.utils import timezone
+
+from .log_resumo_service import log_resumo_service
+
+logger = logging.getLogger(__name__)
+
+
+class LogRetencaoService:
+    """
+    Limpeza dos logs antigos conforme a política de retenção por nível.
+    """
+
+    def __init__(self, pausa_entre_lotes: float = 0.05):
+        # Pausa entre os lotes: dá a vez aos outros escritores do SQLite
+        self.pausa_entre_lotes = pausa_entre_lotes
+
+    @property
+    def politica(self) -> Dict[str, int]:
+        return getattr(
+            settings,
+            "LOG_RETENCAO_DIAS",
+            {"DEBUG": 2, "INFO": 14, "WARNING": 30, "ERROR": 90, "CRITICAL": 180},
+        )
+
+    @property
+    def tamanho_lote(self) -> int:
+        return max(1, getattr(settings, "LOG_RETENCAO_LOTE", 5000))
+
+    def purgar(
+        self,
+        politica: Optional[Dict[str, int]] = None,
+        lote: Optional[int] = None,
+        compactar: bool = True,
+        simular: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Apaga os logs mais antigos que a retenção do seu nível.
+
+        Args:
+            politica: dias por nível (padrão: LOG_RETENCAO_DIAS); 0 ou nível
+                ausente = manter sempre.
+            lote: registros apagados por transação (padrão: LOG_RETENCAO_LOTE).
+            compactar: executa ANALYZE/VACUUM ao final.
+            simular: só conta os registros que seriam apagados.
+
+        Returns:
+            Quantidade de logs apagados (ou que seriam apagados) por nível.
+        """
+        from ..models import ApplicationLog
+
+        politica = self.politica if politica is None else politica
+        agora = timezone.now()
+        resultado: Dict[str, int] = {}
+
+        for nivel, dias in politica.items():
+            if not dias or dias <= 0:
+                continue
+            antigos = ApplicationLog.objects.filter(
+                level=nivel.upper(), timestamp__lt=agora - timedelta(days=dias)
+            )
+            if simular:
+                resultado[nivel.upper()] = antigos.count()
+            else:
+                resultado[nivel.upper()] = self._apagar_em_lotes(antigos, lote)
+
+        total = sum(resultado.values())
+        if simular:
+            return resultado
+        # O resumo por hora tem retenção própria (bem maior que a dos logs)
+        resumo_apagado = log_resumo_service.purgar()
+        logger.info(
+            f"Retenção de logs: {total} registro(s) apagado(s) "
+            f"({', '.join(f'{n}: {q}' for n, q in resultado.items()) or 'nenhum nível com retenção'}); "
+            f"{resumo_apagado} linha(s) antiga(s) do resumo apagada(s)."
+        )
+        if compactar:
+            self.compactar()
+        return resultado
+
+    def apagar_todos(self, lote: Optional[int] = None, compactar: bool = False) -> int:
+        """Apaga todos os logs, em lotes. Retorna a quantidade apagada."""
+        from ..models import ApplicationLog
+
+        total = self._apagar_em_lotes(ApplicationLog.objects.all(), lote)
+        if compactar:
+            self.compactar()
+        return total
+
+    def compactar(self, vacuum_minimo: Optional[float] = None) -> bool:
+        """
+        Atualiza as estatísticas da tabela de logs (ANALYZE) e compacta o
+        arquivo (VACUUM) se a fração de páginas livres atingir vacuum_minimo
+        (padrão: LOG_RETENCAO_VACUUM_MINIMO). O VACUUM reescreve o arquivo
+        inteiro e bloqueia as escritas enquanto roda, por isso só é feito
+        quando compensa. Retorna True se o VACUUM foi executado.
+        """
+        from ..models import ApplicationLog
+
+        if vacuum_minimo is None:
+            vacuum_minimo = getattr(settings, "LOG_RETENCAO_VACUUM_MINIMO", 0.25)
+        conexao = connections[router.db_for_write(ApplicationLog)]
+        if conexao.vendor != "sqlite":
+            return False
+
+        try:
+            with conexao.cursor() as cursor:
+                cursor.execute(f'ANALYZE "{ApplicationLog._meta.db_table}"')
+                cursor.execute("PRAGMA page_count")
+                paginas = cursor.fetchone()[0]
+                cursor.execute("PRAGMA freelist_count")
+                livres = cursor.fetchone()[0]
+                if not paginas or livres / paginas < vacuum_minimo:
+                    logger.debug(
+                        f"Retenção de logs: VACUUM dispensado ({livres}/{paginas} páginas livres)."
+                    )
+                    return False
+                inicio = time.monotonic()
+                # VACUUM não roda dentro de transação; o Django usa autocommit
+                cursor.execute("VACUUM")
+        except Exception as e:
+            logger.warning(f"Retenção de logs: Falha ao compactar o banco de logs: {e}")
+            return False
+
+        logger.info(
+            f"Retenção de logs: VACUUM liberou {livres} de {paginas} páginas "
+            f"em {time.monotonic() - inicio:.1f}s."
+        )
+        return True
+
+    # ------------------------------------------------------------------ #
+    # Auxiliares
+    # ------------------------------------------------------------------ #
+    def _apagar_em_lotes(self, queryset, lote: Optional[int] = None) -> int:
+        lote = lote or self.tamanho_lote
+        apagados = 0
+        while True:
+            ids = list(queryset.order_by("pk").values_list("pk", flat=True)[:lote])
+            if not ids:
+                return apagados
+            # Modelo sem relações nem sinais: o Django apaga com um único
+            # DELETE ... WHERE id IN (...), sem carregar os objetos
+            apagados += queryset.model.objects.filter(pk__in=ids).delete()[0]
+            if len(ids) < lote:
+                return apagados
+            if self.pausa_entre_lotes:
+                time.sleep(self.pausa_entre_lotes)
+
+
+# Instância padrão do serviço
+log_retencao_service = LogRetencaoService()
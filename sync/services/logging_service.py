@@ -1,5 +1,11 @@
 import logging
 import traceback as tb_module  # Para evitar conflito com o parâmetro traceback
+from datetime import datetime
+from typing import Any, Dict, List
+
+from django.db import router, transaction
+
+from .log_resumo_service import log_resumo_service
 
 
 class LoggingService:
@@ -12,6 +18,7 @@ class LoggingService:
         func_name: str = None,
         line_no: int = None,
         traceback: str = None,
+        timestamp: datetime = None,
     ):
         """
         Cria uma entrada de log no banco de dados utilizando o modelo ApplicationLog.
@@ -23,32 +30,24 @@ class LoggingService:
             func_name (str, optional): Nome da função.
             line_no (int, optional): Número da linha.
             traceback (str, optional): Traceback formatado, se houver erro.
+            timestamp (datetime, optional): Momento do evento (padrão: agora).
         """
         from ..models import ApplicationLog
 
         try:
-            # Validação básica do nível para garantir que está entre os choices do modelo
-            # Isso pode ser expandido ou melhorado conforme necessidade
-            valid_levels = [choice[0] for choice in ApplicationLog.LEVEL_CHOICES]
-            if level.upper() not in valid_levels:
-                # Logar um aviso sobre nível inválido, mas registrar com um nível padrão ou falhar
-                logging.warning(
-                    f"Nível de log inválido '{level}' fornecido para LoggingService. Usando ERROR como padrão."
+            with transaction.atomic(using=router.db_for_write(ApplicationLog)):
+                log = ApplicationLog.objects.create(
+                    **self._montar_campos(
+                        level=level,
+                        message=message,
+                        module=module,
+                        func_name=func_name,
+                        line_no=line_no,
+                        traceback=traceback,
+                        timestamp=timestamp,
+                    )
                 )
-                # Ou poderia simplesmente não registrar, ou levantar um erro
-                # Por ora, vamos apenas ajustar para um nível válido conhecido se possível, ou ERROR.
-                db_level = "ERROR"  # Default para um nível conhecido se o fornecido for inválido
-            else:
-                db_level = level.upper()
-
-            ApplicationLog.objects.create(
-                level=db_level,
-                message=message,
-                module=module,
-                func_name=func_name,
-                line_no=line_no,
-                traceback=traceback,
-            )
+                log_resumo_service.registrar([log])
         except Exception as e:
             # Se houver um erro ao tentar registrar o log no banco de dados,
             # precisamos logar isso de alguma forma (ex: no logger padrão do Django)
@@ -80,6 +79,72 @@ class LoggingService:
 
             logger.error(error_details)
 
+    def log_em_lote(self, registros: List[Dict[str, Any]]) -> int:
+        """
+        Grava vários logs com um único bulk_create. Cada registro tem as
+        mesmas chaves dos argumentos de log().
+
+        Returns:
+            Quantidade de logs gravados (0 se a gravação falhar).
+        """
+        from ..models import ApplicationLog
+
+        if not registros:
+            return 0
+        try:
+            logs = [ApplicationLog(**self._montar_campos(**r)) for r in registros]
+            # Logs e resumo (ApplicationLogResumo) na mesma transação
+            with transaction.atomic(using=router.db_for_write(ApplicationLog)):
+                ApplicationLog.objects.bulk_create(logs, batch_size=500)
+                log_resumo_service.registrar(logs)
+            return len(registros)
+        except Exception as e:
+            logging.getLogger(__name__).error(
+                f"Falha ao registrar {len(registros)} logs no banco de dados. "
+                f"Erro original: {e}\n{tb_module.format_exc()}"
+            )
+            return 0
+
+    @staticmethod
+    def _montar_campos(
+        level: str,
+        message: str,
+        module: str,
+        func_name: str = None,
+        line_no: int = None,
+        traceback: str = None,
+        timestamp: datetime = None,
+    ) -> Dict[str, Any]:
+        from ..models import ApplicationLog
+
+        # Validação básica do nível para garantir que está entre os choices do modelo
+        # Isso pode ser expandido ou melhorado conforme necessidade
+        valid_levels = [choice[0] for choice in ApplicationLog.LEVEL_CHOICES]
+        if level.upper() not in valid_levels:
+            # Logar um aviso sobre nível inválido, mas registrar com um nível padrão ou falhar
+            logging.warning(
+                f"Nível de log inválido '{level}' fornecido para LoggingService. Usando ERROR como padrão."
+            )
+            # Ou poderia simplesmente não registrar, ou levantar um erro
+            # Por ora, vamos apenas ajustar para um nível válido conhecido se possível, ou ERROR.
+            db_level = (
+                "ERROR"  # Default para um nível conhecido se o fornecido for inválido
+            )
+        else:
+            db_level = level.upper()
+
+        campos = {
+            "level": db_level,
+            "message": message,
+            "module": module,
+            "func_name": func_name,
+            "line_no": line_no,
+            "traceback": traceback,
+        }
+        if timestamp is not None:
+            campos["timestamp"] = timestamp
+        return campos
+
 
 # Instância única do serviço para ser usada em outros lugares (opcional, mas comum)
 logging_service = LoggingService()
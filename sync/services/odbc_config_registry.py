@@ -0,0 +1,175 @@
+"""
+Registro em memória da configuração ODBC ativa.
+
+Evita consultar o SQLite (ODBCConfiguration.get_active_config) a cada
+consulta ODBC. O cache é invalidado:
+- no próprio processo, pelos sinais post_save/post_delete de ODBCConfiguration;
+- nos demais processos (web e workers), por um arquivo de carimbo de versão
+  que é reescrito após o commit de cada alteração e comparado antes de usar
+  o cache.
+"""
+
+import logging
+import os
+import threading
+import uuid
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def format_connection_string(config: Dict[str, str]) -> str:
+    """
+    Monta a string de conexão ODBC no formato DRIVER={...};DSN=...;UID=...;PWD=...
+
+    Raises:
+        ValueError: Se o DSN estiver ausente.
+    """
+    dsn = config.get("dsn")
+    uid = config.get("uid")
+    pwd = config.get("pwd")  # A senha pode ser uma string vazia
+    driver = config.get("driver")
+
+    if not dsn:
+        raise ValueError(
+            "DSN (Nome da Fonte de Dados) é obrigatório na configuração ODBC."
+        )
+
+    parts = []
+    if driver:
+        # Adicionar chaves {} é uma prática comum para nomes de driver que podem conter espaços.
+        parts.append(f"DRIVER={{{driver}}}")
+
+    parts.append(f"DSN={dsn}")
+
+    # UID e PWD são opcionais na string de conexão dependendo do DSN/Driver.
+    # Se estiverem presentes no config (mesmo que string vazia para PWD), devem ser incluídos.
+    if uid is not None:
+        parts.append(f"UID={uid}")
+    if pwd is not None:
+        parts.append(f"PWD={pwd}")
+
+    return ";".join(parts)
+
+
+class ODBCConfigRegistry:
+    """
+    Memoiza a configuração ODBC ativa e a string de conexão correspondente.
+    """
+
+    def __init__(self, stamp_path: Optional[str] = None):
+        self._stamp_path = stamp_path
+        self._lock = threading.Lock()
+        # (versão do carimbo, config, string de conexão); None = precisa carregar
+        self._entry: Optional[Tuple[Optional[str], Dict[str, str], Optional[str]]] = (
+            None
+        )
+
+    @property
+    def stamp_path(self) -> str:
+        if self._stamp_path is None:
+            self._stamp_path = str(
+                getattr(
+                    settings,
+                    "ODBC_CONFIG_STAMP_FILE",
+                    os.path.join(settings.BASE_DIR, "odbc_config.stamp"),
+                )
+            )
+        return self._stamp_path
+
+    def get_config(self) -> Dict[str, str]:
+        """
+        Retorna uma cópia da configuração ativa ({} se não houver).
+
+        Raises:
+            Exception: Erros do ORM ao carregar a configuração são repassados.
+        """
+        return dict(self._get_entry()[1])
+
+    def get_connection_string(self) -> str:
+        """
+        Retorna a string de conexão da configuração ativa.
+
+        Raises:
+            ValueError: Se não houver configuração ativa ou se ela não tiver DSN.
+        """
+        _, config, conn_string = self._get_entry()
+        if not config:
+            raise ValueError("Não há configuração de conexão ODBC salva ou ativa.")
+        if conn_string is None:
+            # Configuração sem DSN: repete a validação para levantar o erro correto
+            return format_connection_string(config)
+        return conn_string
+
+    def invalidate(self, bump_version: bool = True) -> None:
+        """
+        Descarta o cache deste processo e, com bump_version=True, grava um
+        novo carimbo para que os outros processos também recarreguem.
+        """
+        with self._lock:
+            self._entry = None
+        if bump_version:
+            self._write_stamp()
+
+    # ------------------------------------------------------------------ #
+    # Auxiliares
+    # ------------------------------------------------------------------ #
+    def _get_entry(self) -> Tuple[Optional[str], Dict[str, str], Optional[str]]:
+        version = self._read_stamp()
+        entry = self._entry
+        if entry is not None and entry[0] == version:
+            return entry
+
+        with self._lock:
+            entry = self._entry
+            if entry is not None and entry[0] == version:
+                return entry
+            entry = (version,) + self._load()
+            self._entry = entry
+            logger.debug(f"Configuração ODBC ativa recarregada (versão: {version}).")
+            return entry
+
+    def _load(self) -> Tuple[Dict[str, str], Optional[str]]:
+        from sync.models import ODBCConfiguration
+
+        config_obj = ODBCConfiguration.get_active_config()
+        if not config_obj:
+            logger.info("Nenhuma configuração ODBC ativa encontrada")
+            return {}, None
+
+        config = {
+            "dsn": config_obj.dsn,
+            "uid": config_obj.uid,
+            "pwd": config_obj.pwd,
+            "driver": config_obj.driver,
+        }
+        try:
+            conn_string = format_connection_string(config)
+        except ValueError:
+            conn_string = None
+        return config, conn_string
+
+    def _read_stamp(self) -> Optional[str]:
+        try:
+            with open(self.stamp_path, "r", encoding="ascii") as stamp_file:
+                return stamp_file.read().strip() or None
+        except OSError:
+            return None
+
+    def _write_stamp(self) -> None:
+        tmp_path = f"{self.stamp_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="ascii") as stamp_file:
+                stamp_file.write(uuid.uuid4().hex)
+            os.replace(tmp_path, self.stamp_path)
+        except OSError as e:
+            logger.warning(
+                f"Não foi possível gravar o carimbo de versão da configuração ODBC ({self.stamp_path}): {e}. "
+                "Outros processos podem continuar usando a configuração anterior."
+            )
+
+
+# Instância única do processo
+odbc_config_registry = ODBCConfigRegistry()
@@ -4,14 +4,34 @@ Serviço para gerenciar conexões ODBC no Fiscaut Connector.
 
 import os
 import json
+import base64
+import hashlib
 import logging
-from typing import Dict, List, Tuple, Any, Optional
+import threading
+from decimal import Decimal
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple, Any, Optional
 import pyodbc
 from django.conf import settings
+from django.core.cache import cache
 from sync.models import ODBCConfiguration
+from .odbc_config_registry import format_connection_string, odbc_config_registry
+from .odbc_pool import ODBCConnectionPool
 
 logger = logging.getLogger(__name__)
 
+# Pool de conexões compartilhado por todas as instâncias do gerenciador no processo.
+# É recriado quando a string de conexão ativa muda ou após um fork.
+_connection_pool: Optional[ODBCConnectionPool] = None
+_connection_pool_lock = threading.Lock()
+
+# Strings de conexão cujo servidor recusou COUNT(*) OVER(): nesses casos a
+# listagem paginada volta a usar uma consulta de contagem separada.
+_window_count_unsupported: set = set()
+
+# Coluna auxiliar com o total de registros na consulta combinada
+WINDOW_TOTAL_COLUMN = "total_registros_janela"
+
 
 class ODBCConnectionManager:
     """
@@ -22,8 +42,59 @@ class ODBCConnectionManager:
     - Testar conexões
     - Estabelecer conexões com bancos de dados ODBC
     - Executar consultas e comandos SQL
+    - Ler grandes volumes em lotes (iter_query / iter_entity)
     """
 
+    # Tabelas por empresa (codi_emp) do Domínio e como listá-las/filtrá-las.
+    # Usado pelos métodos list_*_empresa e por iter_entity.
+    ENTITY_SOURCES: Dict[str, Dict[str, str]] = {
+        "fornecedores": {
+            "source_table_name": "bethadba.effornece",
+            "fields_to_select_str": "codi_for, cgce_for, nome_for, codi_cta",
+            "default_order_by_field": "codi_for",
+            "id_field_filter_name": "f_codi_for",
+            "name_field_filter_name": "f_nome_for",
+            "name_field_db": "nome_for",
+            "cgce_field_filter_name": "f_cgce_for",
+            "cgce_field_db": "cgce_for",
+            "log_entity_name": "fornecedores",
+        },
+        "clientes": {
+            "source_table_name": "bethadba.efclientes",
+            "fields_to_select_str": "codi_cli, cgce_cli, nome_cli, codi_cta",
+            "default_order_by_field": "codi_cli",
+            "id_field_filter_name": "f_codi_cli",
+            "name_field_filter_name": "f_nome_cli",
+            "name_field_db": "nome_cli",
+            "cgce_field_filter_name": "f_cgce_cli",
+            "cgce_field_db": "cgce_cli",
+            "log_entity_name": "clientes",
+        },
+        "planos_de_contas": {
+            "source_table_name": "bethadba.ctcontas",
+            "fields_to_select_str": "codi_cta, clas_cta, nome_cta, tipo_cta",
+            "default_order_by_field": "codi_cta",
+            "id_field_filter_name": "f_codi_cta",
+            "name_field_filter_name": "f_nome_cta",
+            "name_field_db": "nome_cta",
+            # Usando clas_cta como terceiro campo de filtro, similar ao cgce_for/cgce_cli
+            "cgce_field_filter_name": "f_clas_cta",
+            "cgce_field_db": "clas_cta",
+            "log_entity_name": "planos_de_contas",
+        },
+        "acumuladores": {
+            "source_table_name": "bethadba.efacumuladores",
+            "fields_to_select_str": "CODI_ACU, NOME_ACU, DESCRICAO_ACU",
+            "default_order_by_field": "CODI_ACU",
+            "id_field_filter_name": "f_codi_acu",
+            "name_field_filter_name": "f_nome_acu",
+            "name_field_db": "NOME_ACU",
+            "cgce_field_filter_name": "f_descricao_acu",
+            "cgce_field_db": "DESCRICAO_ACU",
+            "log_entity_name": "acumuladores",
+        },
+    }
+
     def __init__(self):
         """Inicializa o gerenciador de conexões ODBC."""
         self.DEFAULT_TIMEOUT = 10  # Timeout padrão para conexões em segundos
@@ -86,6 +157,8 @@ class ODBCConnectionManager:
                     f"Nova configuração ODBC criada com sucesso para DSN: {dsn}"
                 )
 
+            # Conexões abertas com a configuração anterior não devem mais ser reutilizadas
+            self.reset_pool()
             return True
 
         except Exception as e:
@@ -136,33 +209,9 @@ class ODBCConnectionManager:
             Dict contendo as configurações de conexão ou dict vazio se não existir
         """
         try:
-            # Verificar se o modelo está disponível antes de prosseguir
-            try:
-                from django.apps import apps
-
-                if not apps.get_model("sync", "ODBCConfiguration"):
-                    logger.error(
-                        "Modelo 'ODBCConfiguration' não está registrado ou não existe"
-                    )
-                    return {}
-            except Exception as model_check_error:
-                logger.error(
-                    f"Erro ao verificar disponibilidade do modelo: {str(model_check_error)}"
-                )
-                return {}
-
-            config = ODBCConfiguration.get_active_config()
-
-            if config:
-                return {
-                    "dsn": config.dsn,
-                    "uid": config.uid,
-                    "pwd": config.pwd,
-                    "driver": config.driver,
-                }
-            else:
-                logger.info("Nenhuma configuração ODBC ativa encontrada")
-                return {}
+            # Servido do cache em memória; o SQLite só é consultado quando a
+            # configuração muda (ver odbc_config_registry).
+            return odbc_config_registry.get_config()
 
         except Exception as e:
             import traceback
@@ -198,37 +247,9 @@ class ODBCConnectionManager:
             ValueError: Se DSN estiver ausente ou a configuração não puder ser carregada.
         """
         if config is None:
-            config = self.get_connection_config()
-            if not config:
-                raise ValueError("Não há configuração de conexão ODBC salva ou ativa.")
-
-        dsn = config.get("dsn")
-        uid = config.get("uid")
-        pwd = config.get("pwd")  # A senha pode ser uma string vazia
-        driver = config.get("driver")
-
-        if not dsn:
-            raise ValueError(
-                "DSN (Nome da Fonte de Dados) é obrigatório na configuração ODBC."
-            )
-
-        parts = []
-        if driver:
-            # Adicionar chaves {} é uma prática comum para nomes de driver que podem conter espaços.
-            parts.append(f"DRIVER={{{driver}}}")
-
-        parts.append(f"DSN={dsn}")
+            return odbc_config_registry.get_connection_string()
 
-        # UID e PWD são opcionais na string de conexão dependendo do DSN/Driver.
-        # Se estiverem presentes no config (mesmo que string vazia para PWD), devem ser incluídos.
-        if (
-            uid is not None
-        ):  # uid pode ser uma string vazia ou um valor. Se None, não incluir.
-            parts.append(f"UID={uid}")
-        if pwd is not None:  # pwd pode ser uma string vazia. Se None, não incluir.
-            parts.append(f"PWD={pwd}")
-
-        return ";".join(parts)
+        return format_connection_string(config)
 
     def connect(self, config: Dict[str, str] = None) -> pyodbc.Connection:
         """
@@ -246,6 +267,62 @@ class ODBCConnectionManager:
         conn_string = self.build_connection_string(config)
         return pyodbc.connect(conn_string)
 
+    def _get_pool(self) -> ODBCConnectionPool:
+        """
+        Retorna o pool de conexões do processo para a configuração ativa,
+        criando-o (ou recriando-o) se a string de conexão mudou.
+
+        Raises:
+            ValueError: Se não houver configuração ODBC ativa.
+        """
+        global _connection_pool
+
+        conn_string = self.build_connection_string()
+        with _connection_pool_lock:
+            pool = _connection_pool
+            if pool is not None and (
+                pool.connection_string != conn_string or pool.pid != os.getpid()
+            ):
+                # Conexões herdadas de outro processo (fork) não podem ser fechadas daqui
+                if pool.pid == os.getpid():
+                    pool.close()
+                logger.info("Configuração ODBC alterada. Recriando pool de conexões.")
+                pool = None
+
+            if pool is None:
+                pool = ODBCConnectionPool(
+                    conn_string,
+                    max_size=getattr(settings, "ODBC_POOL_MAX_SIZE", 5),
+                    max_idle_time=getattr(settings, "ODBC_POOL_MAX_IDLE_TIME", 300),
+                    max_lifetime=getattr(settings, "ODBC_POOL_MAX_LIFETIME", 1800),
+                    wait_timeout=getattr(settings, "ODBC_POOL_WAIT_TIMEOUT", 10),
+                    connect_timeout=self.DEFAULT_TIMEOUT,
+                )
+                _connection_pool = pool
+        return pool
+
+    def reset_pool(self) -> None:
+        """Fecha o pool de conexões atual. O próximo uso cria um novo com a configuração ativa."""
+        global _connection_pool
+
+        with _connection_pool_lock:
+            pool = _connection_pool
+            _connection_pool = None
+        if pool is not None and pool.pid == os.getpid():
+            pool.close()
+
+    @contextmanager
+    def pooled_connection(self) -> Iterator[pyodbc.Connection]:
+        """
+        Fornece uma conexão do pool para a configuração ativa e a devolve ao final.
+
+        Raises:
+            ValueError: Se não houver configuração ODBC ativa.
+            pyodbc.Error: Se não for possível obter uma conexão.
+        """
+        with self._get_pool().connection() as connection:
+            yield connection
+
     def test_connection(
         self, config_data: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
@@ -441,29 +518,28 @@ class ODBCConnectionManager:
             - str: Mensagem de erro (None se sucesso)
         """
         try:
-            connection = self.connect()
-            cursor = connection.cursor()
+            with self.pooled_connection() as connection:
+                cursor = connection.cursor()
 
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
 
-            # Verificar se a consulta retorna resultados
-            if cursor.description:
-                # Converter resultado para lista de dicionários
-                columns = [column[0] for column in cursor.description]
-                results = []
+                # Verificar se a consulta retorna resultados
+                if cursor.description:
+                    # Converter resultado para lista de dicionários
+                    columns = [column[0] for column in cursor.description]
+                    results = []
 
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-            else:
-                # Consulta sem resultados (ex: INSERT, UPDATE)
-                results = []
+                    for row in cursor.fetchall():
+                        results.append(dict(zip(columns, row)))
+                else:
+                    # Consulta sem resultados (ex: INSERT, UPDATE)
+                    results = []
 
-            connection.commit()
-            cursor.close()
-            connection.close()
+                connection.commit()
+                cursor.close()
 
             return True, results, None
 
@@ -489,20 +565,19 @@ class ODBCConnectionManager:
             - str: Mensagem de erro (None se sucesso)
         """
         try:
-            connection = self.connect()
-            cursor = connection.cursor()
+            with self.pooled_connection() as connection:
+                cursor = connection.cursor()
 
-            if params:
-                cursor.execute(command, params)
-            else:
-                cursor.execute(command)
+                if params:
+                    cursor.execute(command, params)
+                else:
+                    cursor.execute(command)
 
-            # Obter número de linhas afetadas
-            row_count = cursor.rowcount
+                # Obter número de linhas afetadas
+                row_count = cursor.rowcount
 
-            connection.commit()
-            cursor.close()
-            connection.close()
+                connection.commit()
+                cursor.close()
 
             return True, row_count, None
 
@@ -522,19 +597,16 @@ class ODBCConnectionManager:
             Dicionário com os dados da empresa ou None se não encontrada.
         """
         try:
-            connection = self.connect()
-            cursor = connection.cursor()
-
             query = """
             SELECT codi_emp, cgce_emp, razao_emp
             FROM bethadba.geempre
             WHERE codi_emp = ?
             """
-            cursor.execute(query, codi_emp)
-            empresa = cursor.fetchone()
-
-            cursor.close()
-            connection.close()
+            with self.pooled_connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(query, codi_emp)
+                empresa = cursor.fetchone()
+                cursor.close()
 
             if empresa:
                 return {
@@ -563,13 +635,26 @@ class ODBCConnectionManager:
         cgce_field_filter_name: str,
         cgce_field_db: str,
         log_entity_name: str,  # ex: "fornecedores", "clientes"
+        keyset: bool = False,
+        page_cursor: Optional[str] = None,
+        exact_count: bool = True,
     ) -> Dict[str, Any]:
         """
         Método genérico para listar dados de uma fonte, com estrutura de retorno padronizada.
+
+        Com keyset=True a página é buscada por chave (`WHERE chave > ?`) a partir de
+        page_cursor (None = primeira página), em vez de `START AT`, e a resposta traz
+        `next_cursor` para a página seguinte (None na última). Nesse modo page_number
+        serve apenas para preencher current_page.
+
+        Com exact_count=False a contagem é dispensada: total_records e total_pages
+        vêm como None (salvo se o total já estiver em cache) e `has_next` indica se
+        existe próxima página.
         """
         logger.info(
             f"_list_data_source chamada para {log_entity_name}, codi_emp: {codi_emp}, "
-            f"filters: {filters}, page: {page_number}, size: {page_size}"
+            f"filters: {filters}, page: {page_number}, size: {page_size}, keyset: {keyset}, "
+            f"exact_count: {exact_count}"
         )
 
         response = {
@@ -579,68 +664,50 @@ class ODBCConnectionManager:
             "current_page": page_number,
             "page_size": page_size,
             "total_pages": 0,
+            "next_cursor": None,
+            "has_next": False,
             "error": None,
         }
 
+        pool = None
         cnxn = None
         try:
-            conn_str = self.build_connection_string()
-            cnxn = pyodbc.connect(conn_str, timeout=self.DEFAULT_TIMEOUT)
+            pool = self._get_pool()
+            cnxn = pool.acquire()
             cursor = cnxn.cursor()
 
-            primary_filter_condition = "codi_emp = ?"
-            params_where = [codi_emp]
-            where_clauses_list = []
-
-            if filters:
-                if filters.get(id_field_filter_name):
-                    where_clauses_list.append(f"{default_order_by_field} = ?")
-                    params_where.append(filters.get(id_field_filter_name))
-                if filters.get(name_field_filter_name):
-                    where_clauses_list.append(f"UPPER({name_field_db}) LIKE ?")
-                    params_where.append(
-                        f"%{filters.get(name_field_filter_name).upper()}%"
-                    )
-                if filters.get(cgce_field_filter_name):
-                    where_clauses_list.append(f"{cgce_field_db} = ?")
-                    params_where.append(filters.get(cgce_field_filter_name))
-
-            where_sql_additional = ""
-            if where_clauses_list:
-                where_sql_additional = " AND " + " AND ".join(where_clauses_list)
-
-            final_query_count = f"SELECT COUNT(*) FROM {source_table_name} WHERE {primary_filter_condition}{where_sql_additional}"
-            logger.debug(
-                f"Query de contagem {log_entity_name}: {final_query_count}, Params: {params_where}"
+            where_sql, params_where = self._build_where_clause(
+                codi_emp=codi_emp,
+                filters=filters,
+                default_order_by_field=default_order_by_field,
+                id_field_filter_name=id_field_filter_name,
+                name_field_filter_name=name_field_filter_name,
+                name_field_db=name_field_db,
+                cgce_field_filter_name=cgce_field_filter_name,
+                cgce_field_db=cgce_field_db,
             )
-            cursor.execute(final_query_count, *params_where)
-            count_result = cursor.fetchone()
-            if count_result:
-                response["total_records"] = count_result[0]
-
-            if response["total_records"] > 0:
-                response["total_pages"] = (
-                    response["total_records"] + page_size - 1
-                ) // page_size
-
-                start_at = ((page_number - 1) * page_size) + 1
-                order_by_sql = f" ORDER BY {default_order_by_field} ASC"
-
-                paginated_query_select = (
-                    f"SELECT TOP {page_size} START AT {start_at} {fields_to_select_str} "
-                    f"FROM {source_table_name} WHERE {primary_filter_condition}{where_sql_additional}{order_by_sql}"
-                )
-                logger.debug(
-                    f"Query de seleção {log_entity_name} (paginada): {paginated_query_select}, Params: {params_where}"
-                )
-                cursor.execute(paginated_query_select, *params_where)
 
-                rows = cursor.fetchall()
-                columns = [column[0] for column in cursor.description]
-                response["data"] = [dict(zip(columns, row)) for row in rows]
-                response["success"] = True
-            else:
-                response["success"] = True
+            total_records, data, next_cursor, has_next = self._fetch_page_and_total(
+                pool,
+                cursor,
+                fields_to_select_str=fields_to_select_str,
+                source_table_name=source_table_name,
+                where_sql=where_sql,
+                params=params_where,
+                key_field=default_order_by_field,
+                page_number=page_number,
+                page_size=page_size,
+                keyset=keyset,
+                page_cursor=page_cursor,
+                log_entity_name=log_entity_name,
+                exact_count=exact_count,
+            )
+            response["total_records"] = total_records
+            response["total_pages"] = self._total_pages(total_records, page_size)
+            response["data"] = data
+            response["next_cursor"] = next_cursor
+            response["has_next"] = has_next
+            response["success"] = True
 
             cursor.close()
 
@@ -659,15 +726,454 @@ class ODBCConnectionManager:
             response["error"] = f"Erro inesperado no sistema: {error_msg}"
         finally:
             if cnxn:
-                cnxn.close()
+                pool.release(cnxn)
         return response
 
+    def _build_where_clause(
+        self,
+        codi_emp: int,
+        filters: Optional[Dict[str, Any]],
+        default_order_by_field: str,
+        id_field_filter_name: str,
+        name_field_filter_name: str,
+        name_field_db: str,
+        cgce_field_filter_name: str,
+        cgce_field_db: str,
+    ) -> Tuple[str, List[Any]]:
+        """
+        Monta a cláusula WHERE (sem a palavra-chave) e os parâmetros para as
+        tabelas por empresa (codi_emp) a partir dos filtros da UI.
+        """
+        where_clauses_list = ["codi_emp = ?"]
+        params_where: List[Any] = [codi_emp]
+
+        if filters:
+            if filters.get(id_field_filter_name):
+                where_clauses_list.append(f"{default_order_by_field} = ?")
+                params_where.append(filters.get(id_field_filter_name))
+            if filters.get(name_field_filter_name):
+                where_clauses_list.append(f"UPPER({name_field_db}) LIKE ?")
+                params_where.append(f"%{filters.get(name_field_filter_name).upper()}%")
+            if filters.get(cgce_field_filter_name):
+                where_clauses_list.append(f"{cgce_field_db} = ?")
+                params_where.append(filters.get(cgce_field_filter_name))
+
+        return " AND ".join(where_clauses_list), params_where
+
+    def _fetch_page_and_total(
+        self,
+        pool: ODBCConnectionPool,
+        cursor: pyodbc.Cursor,
+        fields_to_select_str: str,
+        source_table_name: str,
+        where_sql: str,
+        params: List[Any],
+        key_field: str,
+        page_number: int,
+        page_size: int,
+        keyset: bool,
+        page_cursor: Optional[str],
+        log_entity_name: str,
+        exact_count: bool = True,
+    ) -> Tuple[Optional[int], List[Dict[str, Any]], Optional[str], bool]:
+        """
+        Busca uma página e o total de registros do filtro.
+
+        O total fica em cache por ODBC_CONTAGEM_CACHE_TTL segundos, por tabela e
+        filtro (cláusula WHERE e parâmetros, que incluem o codi_emp): nas
+        páginas seguintes só a página é consultada. Com exact_count=False nada
+        é contado; busca-se page_size + 1 linhas para saber se há próxima
+        página e o total só é informado se já estiver em cache.
+
+        Returns:
+            Tupla (total de registros ou None, linhas da página, cursor da
+            próxima página ou None, se há próxima página).
+        """
+        count_key = self._count_cache_key(source_table_name, where_sql, params)
+        total_records = self._get_cached_count(count_key)
+        if total_records is not None or not exact_count:
+            if keyset:
+                data, next_cursor = self._fetch_keyset_page(
+                    cursor,
+                    fields_to_select_str=fields_to_select_str,
+                    source_table_name=source_table_name,
+                    where_sql=where_sql,
+                    params=params,
+                    key_field=key_field,
+                    page_size=page_size,
+                    page_cursor=page_cursor,
+                    log_entity_name=log_entity_name,
+                )
+                return total_records, data, next_cursor, next_cursor is not None
+
+            rows = self._fetch_offset_page(
+                cursor,
+                fields_to_select_str=fields_to_select_str,
+                source_table_name=source_table_name,
+                where_sql=where_sql,
+                params=params,
+                key_field=key_field,
+                start_at=((page_number - 1) * page_size) + 1,
+                limit=page_size + 1,
+                log_entity_name=log_entity_name,
+            )
+            return total_records, rows[:page_size], None, len(rows) > page_size
+
+        total_records, data, next_cursor = self._fetch_page_counting(
+            pool,
+            cursor,
+            fields_to_select_str=fields_to_select_str,
+            source_table_name=source_table_name,
+            where_sql=where_sql,
+            params=params,
+            key_field=key_field,
+            page_number=page_number,
+            page_size=page_size,
+            keyset=keyset,
+            page_cursor=page_cursor,
+            log_entity_name=log_entity_name,
+        )
+        self._set_cached_count(count_key, total_records)
+        if keyset:
+            has_next = next_cursor is not None
+        else:
+            has_next = page_number * page_size < total_records
+        return total_records, data, next_cursor, has_next
+
+    def _fetch_page_counting(
+        self,
+        pool: ODBCConnectionPool,
+        cursor: pyodbc.Cursor,
+        fields_to_select_str: str,
+        source_table_name: str,
+        where_sql: str,
+        params: List[Any],
+        key_field: str,
+        page_number: int,
+        page_size: int,
+        keyset: bool,
+        page_cursor: Optional[str],
+        log_entity_name: str,
+    ) -> Tuple[int, List[Dict[str, Any]], Optional[str]]:
+        """
+        Busca a página e conta os registros do filtro.
+
+        Por padrão faz as duas coisas em uma única instrução, com o total
+        calculado por COUNT(*) OVER() (os predicados, como o LIKE do nome, são
+        avaliados uma vez só). Se o servidor recusar a função de janela, ou com
+        ODBC_CONTAGEM_JANELA=False, usa um SELECT COUNT(*) seguido da página; a
+        recusa é memorizada para a string de conexão.
+
+        Returns:
+            Tupla (total de registros, linhas da página, cursor da próxima
+            página ou None).
+        """
+        if (
+            getattr(settings, "ODBC_CONTAGEM_JANELA", True)
+            and pool.connection_string not in _window_count_unsupported
+        ):
+            try:
+                return self._fetch_page_with_window_count(
+                    cursor,
+                    fields_to_select_str=fields_to_select_str,
+                    source_table_name=source_table_name,
+                    where_sql=where_sql,
+                    params=params,
+                    key_field=key_field,
+                    page_number=page_number,
+                    page_size=page_size,
+                    keyset=keyset,
+                    page_cursor=page_cursor,
+                    log_entity_name=log_entity_name,
+                )
+            except pyodbc.Error as ex:
+                sqlstate = str(ex.args[0]) if ex.args else ""
+                # 42xxx/37xxx: erro de sintaxe ou recurso não suportado. Outros
+                # erros (conexão, permissão) seguem para o chamador.
+                if not sqlstate.startswith(("42", "37")):
+                    raise
+                _window_count_unsupported.add(pool.connection_string)
+                logger.warning(
+                    f"Servidor ODBC não aceitou COUNT(*) OVER() ao listar {log_entity_name} "
+                    f"({sqlstate}: {ex}). Usando consulta de contagem separada."
+                )
+
+        total_records = self._count_rows(
+            cursor, source_table_name, where_sql, params, log_entity_name
+        )
+        if total_records == 0:
+            return 0, [], None
+        if keyset:
+            data, next_cursor = self._fetch_keyset_page(
+                cursor,
+                fields_to_select_str=fields_to_select_str,
+                source_table_name=source_table_name,
+                where_sql=where_sql,
+                params=params,
+                key_field=key_field,
+                page_size=page_size,
+                page_cursor=page_cursor,
+                log_entity_name=log_entity_name,
+            )
+            return total_records, data, next_cursor
+
+        start_at = ((page_number - 1) * page_size) + 1
+        if start_at > total_records:
+            return total_records, [], None
+        data = self._fetch_offset_page(
+            cursor,
+            fields_to_select_str=fields_to_select_str,
+            source_table_name=source_table_name,
+            where_sql=where_sql,
+            params=params,
+            key_field=key_field,
+            start_at=start_at,
+            limit=page_size,
+            log_entity_name=log_entity_name,
+        )
+        return total_records, data, None
+
+    def _fetch_offset_page(
+        self,
+        cursor: pyodbc.Cursor,
+        fields_to_select_str: str,
+        source_table_name: str,
+        where_sql: str,
+        params: List[Any],
+        key_field: str,
+        start_at: int,
+        limit: int,
+        log_entity_name: str,
+    ) -> List[Dict[str, Any]]:
+        """Busca até `limit` linhas a partir da posição start_at (1 = primeira)."""
+        where_clause = f" WHERE {where_sql}" if where_sql else ""
+        query = (
+            f"SELECT TOP {limit} START AT {start_at} {fields_to_select_str} "
+            f"FROM {source_table_name}{where_clause} ORDER BY {key_field} ASC"
+        )
+        logger.debug(
+            f"Query de seleção {log_entity_name} (paginada): {query}, Params: {params}"
+        )
+        cursor.execute(query, *params)
+        rows = cursor.fetchall()
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    @staticmethod
+    def _total_pages(total_records: Optional[int], page_size: int) -> Optional[int]:
+        if total_records is None:
+            return None
+        return (total_records + page_size - 1) // page_size
+
+    @staticmethod
+    def _count_cache_key(
+        source_table_name: str, where_sql: str, params: List[Any]
+    ) -> str:
+        """Chave do cache de contagem: tabela + filtro já normalizado em SQL."""
+        raw = json.dumps(
+            [source_table_name, where_sql, list(params)],
+            default=str,
+            separators=(",", ":"),
+        )
+        return "odbc:contagem:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _get_cached_count(count_key: str) -> Optional[int]:
+        if getattr(settings, "ODBC_CONTAGEM_CACHE_TTL", 120) <= 0:
+            return None
+        return cache.get(count_key)
+
+    @staticmethod
+    def _set_cached_count(count_key: str, total_records: int) -> None:
+        ttl = getattr(settings, "ODBC_CONTAGEM_CACHE_TTL", 120)
+        if ttl > 0:
+            cache.set(count_key, total_records, ttl)
+
+    def _fetch_page_with_window_count(
+        self,
+        cursor: pyodbc.Cursor,
+        fields_to_select_str: str,
+        source_table_name: str,
+        where_sql: str,
+        params: List[Any],
+        key_field: str,
+        page_number: int,
+        page_size: int,
+        keyset: bool,
+        page_cursor: Optional[str],
+        log_entity_name: str,
+    ) -> Tuple[int, List[Dict[str, Any]], Optional[str]]:
+        """
+        Página e total em uma única instrução (ver _fetch_page_and_total).
+
+        No modo keyset a contagem fica em uma tabela derivada, para que o
+        total considere todo o filtro e não só as linhas após o cursor.
+        """
+        where_clause = f" WHERE {where_sql}" if where_sql else ""
+        columns_with_total = (
+            f"{fields_to_select_str}, COUNT(*) OVER() AS {WINDOW_TOTAL_COLUMN}"
+        )
+        from_clause = f"FROM {source_table_name}{where_clause}"
+        query_params = list(params)
+        if keyset:
+            cursor_clause = ""
+            if page_cursor:
+                cursor_clause = f" WHERE {key_field} > ?"
+                query_params.append(self._decode_page_cursor(page_cursor))
+            query = (
+                f"SELECT TOP {page_size + 1} * FROM "
+                f"(SELECT {columns_with_total} {from_clause}) AS pagina"
+                f"{cursor_clause} ORDER BY {key_field} ASC"
+            )
+            is_first_page = not page_cursor
+        else:
+            start_at = ((page_number - 1) * page_size) + 1
+            query = (
+                f"SELECT TOP {page_size} START AT {start_at} {columns_with_total} "
+                f"{from_clause} ORDER BY {key_field} ASC"
+            )
+            is_first_page = start_at == 1
+        logger.debug(
+            f"Query de seleção {log_entity_name} (com total): {query}, Params: {query_params}"
+        )
+        cursor.execute(query, *query_params)
+        rows = cursor.fetchall()
+        all_columns = [column[0] for column in cursor.description]
+
+        if not rows:
+            # Sem linhas na primeira página o total é zero; depois dela (página
+            # além do fim ou cursor na última chave) o total precisa ser contado.
+            if is_first_page:
+                return 0, [], None
+            total_records = self._count_rows(
+                cursor, source_table_name, where_sql, params, log_entity_name
+            )
+            return total_records, [], None
+
+        total_index = next(
+            i for i, col in enumerate(all_columns) if col.lower() == WINDOW_TOTAL_COLUMN
+        )
+        total_records = int(rows[0][total_index])
+        columns = [col for i, col in enumerate(all_columns) if i != total_index]
+        rows = [
+            [value for i, value in enumerate(row) if i != total_index] for row in rows
+        ]
+
+        if keyset:
+            data, next_cursor = self._build_keyset_page(
+                columns, rows, key_field, page_size
+            )
+            return total_records, data, next_cursor
+        return total_records, [dict(zip(columns, row)) for row in rows], None
+
+    def _count_rows(
+        self,
+        cursor: pyodbc.Cursor,
+        source_table_name: str,
+        where_sql: str,
+        params: List[Any],
+        log_entity_name: str,
+    ) -> int:
+        where_clause = f" WHERE {where_sql}" if where_sql else ""
+        query = f"SELECT COUNT(*) FROM {source_table_name}{where_clause}"
+        logger.debug(f"Query de contagem {log_entity_name}: {query}, Params: {params}")
+        cursor.execute(query, *params)
+        count_result = cursor.fetchone()
+        return count_result[0] if count_result else 0
+
+    def _fetch_keyset_page(
+        self,
+        cursor: pyodbc.Cursor,
+        fields_to_select_str: str,
+        source_table_name: str,
+        where_sql: str,
+        params: List[Any],
+        key_field: str,
+        page_size: int,
+        page_cursor: Optional[str],
+        log_entity_name: str,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Busca uma página por chave (seek): `WHERE <filtros> AND chave > ? ORDER BY chave`.
+
+        O custo por página é constante, ao contrário de `TOP n START AT m`, que faz o
+        servidor percorrer e descartar as m linhas anteriores. Busca page_size + 1
+        linhas para saber se existe uma próxima página sem precisar de contagem.
+
+        Returns:
+            Tupla (linhas da página como dicts, cursor da próxima página ou None).
+        """
+        clauses = [where_sql] if where_sql else []
+        query_params = list(params)
+        if page_cursor:
+            clauses.append(f"{key_field} > ?")
+            query_params.append(self._decode_page_cursor(page_cursor))
+        where_clause = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        query = (
+            f"SELECT TOP {page_size + 1} {fields_to_select_str} "
+            f"FROM {source_table_name}{where_clause} ORDER BY {key_field} ASC"
+        )
+        logger.debug(
+            f"Query de seleção {log_entity_name} (keyset): {query}, Params: {query_params}"
+        )
+        cursor.execute(query, *query_params)
+
+        rows = cursor.fetchall()
+        columns = [column[0] for column in cursor.description]
+        return self._build_keyset_page(columns, rows, key_field, page_size)
+
+    def _build_keyset_page(
+        self, columns: List[str], rows: List[Any], key_field: str, page_size: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Monta a página a partir de até page_size + 1 linhas e o próximo cursor."""
+        has_next = len(rows) > page_size
+        data = [dict(zip(columns, row)) for row in rows[:page_size]]
+
+        next_cursor = None
+        if has_next and data:
+            key_column = next(
+                (col for col in columns if col.lower() == key_field.lower()), key_field
+            )
+            next_cursor = self._encode_page_cursor(data[-1].get(key_column))
+        return data, next_cursor
+
+    @staticmethod
+    def _encode_page_cursor(key_value: Any) -> str:
+        """Codifica a última chave da página em um cursor opaco (base64 url-safe)."""
+        if isinstance(key_value, Decimal):
+            key_value = (
+                int(key_value)
+                if key_value == key_value.to_integral()
+                else str(key_value)
+            )
+        raw = json.dumps({"k": key_value}, default=str, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def _decode_page_cursor(page_cursor: str) -> Any:
+        """
+        Decodifica um cursor gerado por _encode_page_cursor.
+
+        Raises:
+            ValueError: Se o cursor estiver malformado.
+        """
+        try:
+            padded = page_cursor + "=" * (-len(page_cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            return payload["k"]
+        except (ValueError, TypeError, KeyError, UnicodeError) as e:
+            raise ValueError(f"Cursor de paginação inválido: {page_cursor!r}") from e
+
     def list_fornecedores_empresa(
         self,
         codi_emp: int,
         filters: Optional[Dict[str, Any]] = None,
         page_number: int = 1,
         page_size: int = 50,
+        keyset: bool = False,
+        page_cursor: Optional[str] = None,
+        exact_count: bool = True,
     ) -> Dict[str, Any]:
         """
         Lista fornecedores de uma empresa, com estrutura de retorno padronizada.
@@ -677,15 +1183,10 @@ class ODBCConnectionManager:
             filters=filters,
             page_number=page_number,
             page_size=page_size,
-            source_table_name="bethadba.effornece",
-            fields_to_select_str="codi_for, cgce_for, nome_for, codi_cta",
-            default_order_by_field="codi_for",
-            id_field_filter_name="f_codi_for",
-            name_field_filter_name="f_nome_for",
-            name_field_db="nome_for",
-            cgce_field_filter_name="f_cgce_for",
-            cgce_field_db="cgce_for",
-            log_entity_name="fornecedores",
+            keyset=keyset,
+            page_cursor=page_cursor,
+            exact_count=exact_count,
+            **self.ENTITY_SOURCES["fornecedores"],
         )
 
     def list_clientes_empresa(
@@ -694,6 +1195,9 @@ class ODBCConnectionManager:
         filters: Optional[Dict[str, Any]] = None,
         page_number: int = 1,
         page_size: int = 50,
+        keyset: bool = False,
+        page_cursor: Optional[str] = None,
+        exact_count: bool = True,
     ) -> Dict[str, Any]:
         """
         Lista clientes de uma empresa, com estrutura de retorno padronizada.
@@ -703,15 +1207,10 @@ class ODBCConnectionManager:
             filters=filters,
             page_number=page_number,
             page_size=page_size,
-            source_table_name="bethadba.efclientes",
-            fields_to_select_str="codi_cli, cgce_cli, nome_cli, codi_cta",
-            default_order_by_field="codi_cli",
-            id_field_filter_name="f_codi_cli",
-            name_field_filter_name="f_nome_cli",
-            name_field_db="nome_cli",
-            cgce_field_filter_name="f_cgce_cli",
-            cgce_field_db="cgce_cli",
-            log_entity_name="clientes",
+            keyset=keyset,
+            page_cursor=page_cursor,
+            exact_count=exact_count,
+            **self.ENTITY_SOURCES["clientes"],
         )
 
     def list_plano_de_contas_empresa(
@@ -720,6 +1219,9 @@ class ODBCConnectionManager:
         filters: Optional[Dict[str, Any]] = None,
         page_number: int = 1,
         page_size: int = 50,
+        keyset: bool = False,
+        page_cursor: Optional[str] = None,
+        exact_count: bool = True,
     ) -> Dict[str, Any]:
         """
         Lista os planos de contas de uma empresa, com estrutura de retorno padronizada.
@@ -729,16 +1231,10 @@ class ODBCConnectionManager:
             filters=filters,
             page_number=page_number,
             page_size=page_size,
-            source_table_name="bethadba.ctcontas",
-            fields_to_select_str="codi_cta, clas_cta, nome_cta, tipo_cta",
-            default_order_by_field="codi_cta",
-            id_field_filter_name="f_codi_cta",
-            name_field_filter_name="f_nome_cta",
-            name_field_db="nome_cta",
-            # Usando clas_cta como terceiro campo de filtro, similar ao cgce_for/cgce_cli
-            cgce_field_filter_name="f_clas_cta",
-            cgce_field_db="clas_cta",
-            log_entity_name="planos_de_contas",
+            keyset=keyset,
+            page_cursor=page_cursor,
+            exact_count=exact_count,
+            **self.ENTITY_SOURCES["planos_de_contas"],
         )
 
     def list_acumuladores_empresa(
@@ -747,6 +1243,9 @@ class ODBCConnectionManager:
         filters: Optional[Dict[str, Any]] = None,
         page_number: int = 1,
         page_size: int = 50,
+        keyset: bool = False,
+        page_cursor: Optional[str] = None,
+        exact_count: bool = True,
     ) -> Dict[str, Any]:
         """
         Lista os acumuladores de uma empresa, com estrutura de retorno padronizada.
@@ -756,15 +1255,128 @@ class ODBCConnectionManager:
             filters=filters,
             page_number=page_number,
             page_size=page_size,
-            source_table_name="bethadba.efacumuladores",
-            fields_to_select_str="CODI_ACU, NOME_ACU, DESCRICAO_ACU",
-            default_order_by_field="CODI_ACU",
-            id_field_filter_name="f_codi_acu",
-            name_field_filter_name="f_nome_acu",
-            name_field_db="NOME_ACU",
-            cgce_field_filter_name="f_descricao_acu",
-            cgce_field_db="DESCRICAO_ACU",
-            log_entity_name="acumuladores",
+            keyset=keyset,
+            page_cursor=page_cursor,
+            exact_count=exact_count,
+            **self.ENTITY_SOURCES["acumuladores"],
+        )
+
+    def iter_query(
+        self,
+        query: str,
+        params: tuple = None,
+        batch_size: int = 500,
+        max_rows: Optional[int] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Executa uma consulta e entrega os resultados em lotes, sem carregar tudo em memória.
+
+        As linhas são lidas com fetchmany(batch_size) de um único cursor, mantendo uma
+        conexão do pool durante toda a iteração. A conexão é devolvida quando o gerador
+        termina, é fechado (break / close()) ou levanta exceção.
+
+        Args:
+            query: Consulta SQL a ser executada
+            params: Parâmetros para a consulta (opcional)
+            batch_size: Quantidade de linhas por lote (cursor.arraysize)
+            max_rows: Limite total de linhas a entregar (opcional)
+            cancel_event: Se for sinalizado, a leitura é interrompida antes do próximo lote
+
+        Yields:
+            Lista de dicionários (uma por linha) com no máximo batch_size itens.
+
+        Raises:
+            pyodbc.Error: Erros de conexão ou execução são repassados ao chamador.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size deve ser maior ou igual a 1.")
+
+        delivered = 0
+        with self.pooled_connection() as connection:
+            cursor = connection.cursor()
+            cursor.arraysize = batch_size
+            try:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+
+                if not cursor.description:
+                    return
+                columns = [column[0] for column in cursor.description]
+
+                while max_rows is None or delivered < max_rows:
+                    if cancel_event is not None and cancel_event.is_set():
+                        logger.info(
+                            f"iter_query cancelada após {delivered} linhas entregues."
+                        )
+                        break
+
+                    size = batch_size
+                    if max_rows is not None:
+                        size = min(batch_size, max_rows - delivered)
+
+                    rows = cursor.fetchmany(size)
+                    if not rows:
+                        break
+                    delivered += len(rows)
+                    yield [dict(zip(columns, row)) for row in rows]
+            finally:
+                try:
+                    cursor.close()
+                except pyodbc.Error as e:
+                    logger.debug(f"Erro ignorado ao fechar cursor de iter_query: {e}")
+
+    def iter_entity(
+        self,
+        entity: str,
+        codi_emp: int,
+        filters: Optional[Dict[str, Any]] = None,
+        batch_size: int = 500,
+        max_rows: Optional[int] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Entrega em lotes todos os registros de uma entidade da empresa
+        ("fornecedores", "clientes", "planos_de_contas" ou "acumuladores"),
+        ordenados pela chave e com os mesmos filtros aceitos pelos métodos list_*.
+
+        Ver iter_query para o comportamento de batch_size, max_rows e cancel_event.
+
+        Raises:
+            ValueError: Se a entidade não for conhecida.
+        """
+        source = self.ENTITY_SOURCES.get(entity)
+        if source is None:
+            raise ValueError(
+                f"Entidade ODBC desconhecida: {entity!r}. "
+                f"Use uma de: {', '.join(self.ENTITY_SOURCES)}."
+            )
+
+        where_sql, params = self._build_where_clause(
+            codi_emp=codi_emp,
+            filters=filters,
+            default_order_by_field=source["default_order_by_field"],
+            id_field_filter_name=source["id_field_filter_name"],
+            name_field_filter_name=source["name_field_filter_name"],
+            name_field_db=source["name_field_db"],
+            cgce_field_filter_name=source["cgce_field_filter_name"],
+            cgce_field_db=source["cgce_field_db"],
+        )
+        query = (
+            f"SELECT {source['fields_to_select_str']} FROM {source['source_table_name']} "
+            f"WHERE {where_sql} ORDER BY {source['default_order_by_field']} ASC"
+        )
+        logger.debug(
+            f"iter_entity {entity} para empresa {codi_emp}: {query}, Params: {params}"
+        )
+        yield from self.iter_query(
+            query,
+            tuple(params),
+            batch_size=batch_size,
+            max_rows=max_rows,
+            cancel_event=cancel_event,
         )
 
     def list_empresas(
@@ -773,6 +1385,9 @@ class ODBCConnectionManager:
         page_number: int = 1,
         page_size: int = 25,
         codi_emp_in_list: Optional[List[int]] = None,  # Novo parâmetro
+        keyset: bool = False,
+        page_cursor: Optional[str] = None,
+        exact_count: bool = True,
     ) -> Dict[str, Any]:
         """
         Lista empresas da tabela bethadba.geempre com filtros e paginação.
@@ -783,14 +1398,20 @@ class ODBCConnectionManager:
             page_number (int, optional): Número da página solicitada. Default é 1.
             page_size (int, optional): Quantidade de registros por página. Default é 50.
             codi_emp_in_list (List[int], optional): Lista de codi_emp para filtrar com cláusula IN.
+            keyset (bool, optional): Pagina por chave (codi_emp > cursor) em vez de START AT.
+            page_cursor (str, optional): Cursor opaco retornado em 'next_cursor' pela página
+                                         anterior (modo keyset). None = primeira página.
+            exact_count (bool, optional): False dispensa a contagem; 'total_records' e
+                                          'total_pages' vêm None se o total não estiver em cache.
 
         Returns:
-            dict: Contendo 'success' (bool), 'data' (list), 'total_records' (int),
-                  'current_page' (int), 'page_size' (int), e 'error' (str, se houver falha).
+            dict: Contendo 'success' (bool), 'data' (list), 'total_records' (int ou None),
+                  'current_page' (int), 'page_size' (int), 'total_pages' (int ou None),
+                  'next_cursor' (str ou None), 'has_next' (bool) e 'error' (str, se houver falha).
         """
         logger.info(
             f"list_empresas chamado com filters: {filters}, page: {page_number}, size: {page_size}, "
-            f"codi_emp_in_list: count={len(codi_emp_in_list) if codi_emp_in_list else 0}"
+            f"codi_emp_in_list: count={len(codi_emp_in_list) if codi_emp_in_list else 0}, keyset: {keyset}"
         )
 
         config = self.get_connection_config()
@@ -812,28 +1433,17 @@ class ODBCConnectionManager:
         pwd = config.get("pwd")
         driver = config.get("driver", None)
 
-        conn_str = self.build_connection_string(config)
-
+        pool = None
         cnxn = None
         try:
+            pool = self._get_pool()
+            cnxn = pool.acquire()
             logger.debug(
-                f"Tentando conectar via ODBC para list_empresas com string: {conn_str[:conn_str.find('PWD=') if 'PWD=' in conn_str else len(conn_str)]}..."
-            )  # Log sem senha
-            cnxn = pyodbc.connect(conn_str, timeout=self.DEFAULT_TIMEOUT)
-            logger.info(
-                f"Conexão ODBC estabelecida com sucesso para list_empresas (DSN: {dsn})."
+                f"Conexão ODBC obtida do pool para list_empresas (DSN: {dsn})."
             )
 
             cursor = cnxn.cursor()
 
-            # Query base para buscar os dados das empresas
-            base_query_select = (
-                "SELECT codi_emp, cgce_emp, razao_emp FROM bethadba.geempre"
-            )
-
-            # Query base para contagem total de registros (para paginação)
-            base_query_count = "SELECT COUNT(*) FROM bethadba.geempre"
-
             # Lista para armazenar os parâmetros da query (para filtros)
             params = []
 
@@ -884,112 +1494,38 @@ class ODBCConnectionManager:
                     where_clauses.append(f"codi_emp IN ({placeholders})")
                     params.extend(codi_emp_in_list)
 
-            # Montar a cláusula WHERE final
-            where_sql = ""
-            if where_clauses:
-                where_sql = " WHERE " + " AND ".join(where_clauses)
-
-            # Anexar cláusulas WHERE às queries base
-            final_query_select = base_query_select + where_sql
-            final_query_count = base_query_count + where_sql
-
-            # Adicionar ordenação para paginação consistente
-            order_by_sql = " ORDER BY codi_emp ASC"
-            final_query_select += order_by_sql
-
-            logger.debug(f"Query de contagem: {final_query_count}, Params: {params}")
-            logger.debug(
-                f"Query de seleção (com ordenação, antes da paginação): {final_query_select}, Params: {params}"
-            )
-
-            # Lógica de Paginação para SQL Anywhere
-            # SQL Anywhere usa TOP N START AT M, onde M é 1-indexed.
-            # page_number é 1-indexed vindo da view.
-            start_at = ((page_number - 1) * page_size) + 1
-
-            # Modificar a query de seleção para incluir a paginação
-            # Ex: SELECT TOP 50 START AT 1 codi_emp, ... FROM ... ORDER BY ...
-            # Precisamos inserir TOP e START AT no lugar certo.
-            # A forma mais robusta é reconstruir a select part.
-            select_clause = f"SELECT TOP {page_size} START AT {start_at} codi_emp, cgce_emp, razao_emp"
-            from_where_order_clauses = final_query_select.split("FROM", 1)[
-                1
-            ]  # Pega tudo a partir de FROM
-            final_query_select_paginated = (
-                f"{select_clause} FROM {from_where_order_clauses}"
+            total_records, empresas_data, next_cursor, has_next = (
+                self._fetch_page_and_total(
+                    pool,
+                    cursor,
+                    fields_to_select_str="codi_emp, cgce_emp, razao_emp",
+                    source_table_name="bethadba.geempre",
+                    where_sql=" AND ".join(where_clauses),
+                    params=params,
+                    key_field="codi_emp",
+                    page_number=page_number,
+                    page_size=page_size,
+                    keyset=keyset,
+                    page_cursor=page_cursor,
+                    log_entity_name="empresas",
+                    exact_count=exact_count,
+                )
             )
-
-            logger.debug(
-                f"Query de seleção final (paginada): {final_query_select_paginated}, Params: {params}"
+            logger.info(
+                f"Total de registros encontrados: {total_records}. "
+                f"{len(empresas_data)} empresas carregadas para a página {page_number}"
+                f"{' (keyset)' if keyset else ''}."
             )
 
-            total_records = 0
-            empresas_data = []
-
-            # Executar query de contagem
-            try:
-                cursor.execute(final_query_count, *params)
-                count_result = cursor.fetchone()
-                if count_result:
-                    total_records = count_result[0]
-                logger.info(f"Total de registros encontrados: {total_records}")
-            except pyodbc.Error as ex:
-                sqlstate_count = ex.args[0]
-                error_message_count = str(ex)
-                logger.error(
-                    f"Erro ao executar query de contagem (DSN: {dsn}): {sqlstate_count} - {error_message_count} | Query: {final_query_count} | Params: {params}"
-                )
-                # Continuar para tentar buscar dados, mas total_records será 0 ou o que foi antes do erro.
-                # Ou podemos decidir retornar erro aqui mesmo.
-                # Por ora, vamos permitir que a busca de dados prossiga, mas o erro será logado.
-                # Se a contagem é crucial para a paginação da UI e falha, talvez seja melhor retornar erro.
-                # Para simplificar, vamos assumir que se a contagem falhar, a listagem pode prosseguir com contagem 0 e a UI lida com isso.
-                pass  # Erro já logado.
-
-            # Executar query de seleção de dados (somente se total_records > 0 ou se a paginação permitir offset 0)
-            # E se a página solicitada faz sentido (start_at <= total_records ou total_records=0 para a primeira página)
-            if total_records > 0 and start_at <= total_records:
-                try:
-                    cursor.execute(
-                        final_query_select_paginated, *params
-                    )  # Mesmos params da contagem
-                    rows = cursor.fetchall()
-                    empresas_data = [
-                        dict(zip([column[0] for column in cursor.description], row))
-                        for row in rows
-                    ]
-                    logger.info(
-                        f"{len(empresas_data)} empresas carregadas para a página {page_number}."
-                    )
-                except pyodbc.Error as ex:
-                    sqlstate_select = ex.args[0]
-                    error_message_select = str(ex)
-                    logger.error(
-                        f"Erro ao executar query de seleção (DSN: {dsn}): {sqlstate_select} - {error_message_select} | Query: {final_query_select_paginated} | Params: {params}"
-                    )
-                    # Retornar erro aqui é mais crítico, pois não teremos dados.
-                    raise  # Repassar a exceção para o bloco catch principal de list_empresas
-            elif (
-                total_records == 0 and page_number == 1
-            ):  # Se não há registros, mas é a primeira página
-                logger.info("Nenhum registro encontrado para os filtros aplicados.")
-                empresas_data = []  # Garante que seja uma lista vazia
-            elif (
-                start_at > total_records and total_records > 0
-            ):  # Página solicitada está além do total de registros
-                logger.info(
-                    f"Página {page_number} solicitada está fora do alcance. Total de registros: {total_records}."
-                )
-                empresas_data = (
-                    []
-                )  # Garante que seja uma lista vazia, a UI não deve permitir isso idealmente.
-
             return {
                 "success": True,
                 "data": empresas_data,
                 "total_records": total_records,
                 "current_page": page_number,
                 "page_size": page_size,
+                "total_pages": self._total_pages(total_records, page_size),
+                "next_cursor": next_cursor,
+                "has_next": has_next,
                 "error": None,
             }
 
@@ -1020,8 +1556,10 @@ class ODBCConnectionManager:
             }
         finally:
             if cnxn:
-                logger.debug(f"Fechando conexão ODBC para list_empresas (DSN: {dsn}).")
-                cnxn.close()
+                logger.debug(
+                    f"Devolvendo conexão ODBC ao pool para list_empresas (DSN: {dsn})."
+                )
+                pool.release(cnxn)
 
     # Métodos auxiliares que estavam faltando ou foram removidos:
     def _format_error_result(
@@ -0,0 +1,276 @@
+"""
+Pool de conexões ODBC compartilhado pelo processo.
+
+Abrir uma conexão com o servidor SQL Anywhere (Domínio) custa mais do que a
+maioria das consultas que executamos nele, então as conexões são mantidas
+abertas e reaproveitadas entre as chamadas do ODBCConnectionManager.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional
+
+import pyodbc
+
+logger = logging.getLogger(__name__)
+
+
+class ODBCPoolTimeoutError(pyodbc.OperationalError):
+    """
+    Nenhuma conexão ficou disponível dentro do tempo de espera do pool.
+
+    Herda de pyodbc.OperationalError para ser tratada pelos mesmos blocos
+    `except pyodbc.Error` que já existem no ODBCConnectionManager.
+    """
+
+    def __init__(self, message: str):
+        # HYT00 é o SQLSTATE ODBC para "Timeout expired"
+        super().__init__("HYT00", message)
+
+
+class _PooledConnection:
+    """Conexão física mais os metadados usados para decidir se ela ainda é útil."""
+
+    __slots__ = ("connection", "created_at", "last_used_at")
+
+    def __init__(self, connection: pyodbc.Connection):
+        now = time.monotonic()
+        self.connection = connection
+        self.created_at = now
+        self.last_used_at = now
+
+
+class ODBCConnectionPool:
+    """
+    Pool limitado e thread-safe de conexões pyodbc para uma string de conexão.
+
+    - max_size: número máximo de conexões abertas (ociosas + em uso)
+    - max_idle_time: segundos que uma conexão pode ficar ociosa antes de ser fechada
+    - max_lifetime: segundos de vida máxima de uma conexão, ociosa ou não
+    - wait_timeout: segundos que um checkout espera por uma conexão livre
+    - ping_interval: conexões usadas há mais tempo que isso são validadas com
+      `health_check_query` no checkout (0 valida sempre)
+    """
+
+    def __init__(
+        self,
+        connection_string: str,
+        max_size: int = 5,
+        max_idle_time: float = 300,
+        max_lifetime: float = 1800,
+        wait_timeout: float = 10,
+        connect_timeout: int = 10,
+        ping_interval: float = 30,
+        health_check_query: str = "SELECT 1",
+    ):
+        if max_size < 1:
+            raise ValueError("max_size do pool ODBC deve ser maior ou igual a 1.")
+
+        self.connection_string = connection_string
+        self.max_size = max_size
+        self.max_idle_time = max_idle_time
+        self.max_lifetime = max_lifetime
+        self.wait_timeout = wait_timeout
+        self.connect_timeout = connect_timeout
+        self.ping_interval = ping_interval
+        self.health_check_query = health_check_query
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle: Deque[_PooledConnection] = deque()
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._total = 0  # Conexões abertas ou sendo abertas
+        self._closed = False
+        self.pid = os.getpid()
+
+    # ------------------------------------------------------------------ #
+    # Checkout / checkin
+    # ------------------------------------------------------------------ #
+    def acquire(self) -> pyodbc.Connection:
+        """
+        Retira uma conexão saudável do pool, abrindo uma nova se houver espaço.
+
+        Raises:
+            ODBCPoolTimeoutError: Se nenhuma conexão ficar livre em wait_timeout.
+            pyodbc.Error: Se a abertura de uma nova conexão falhar.
+        """
+        deadline = time.monotonic() + self.wait_timeout
+
+        while True:
+            candidate: Optional[_PooledConnection] = None
+            expired: Optional[_PooledConnection] = None
+            must_open = False
+
+            with self._cond:
+                if self._closed:
+                    raise pyodbc.OperationalError("08003", "Pool ODBC encerrado.")
+
+                if self._idle:
+                    # LIFO: a conexão usada mais recentemente é a mais provável de estar viva
+                    pooled = self._idle.pop()
+                    if self._is_expired(pooled):
+                        self._total -= 1
+                        expired = pooled
+                    else:
+                        self._in_use[id(pooled.connection)] = pooled
+                        candidate = pooled
+                elif self._total < self.max_size:
+                    self._total += 1
+                    must_open = True
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise ODBCPoolTimeoutError(
+                            f"Tempo limite de {self.wait_timeout}s excedido aguardando "
+                            f"conexão livre no pool ODBC (máximo {self.max_size})."
+                        )
+                    self._cond.wait(remaining)
+                    continue
+
+            if expired is not None:
+                self._close_quietly(expired.connection)
+                continue
+
+            if must_open:
+                return self._open_new()
+
+            if self._is_healthy(candidate):
+                candidate.last_used_at = time.monotonic()
+                return candidate.connection
+
+            logger.info(
+                "Conexão ODBC do pool falhou na verificação de saúde. Descartando."
+            )
+            self._discard(candidate.connection)
+
+    def release(self, connection: pyodbc.Connection, discard: bool = False) -> None:
+        """
+        Devolve uma conexão ao pool. Com discard=True (ou se o pool já foi
+        encerrado) a conexão é fechada e o espaço liberado.
+        """
+        if not discard:
+            try:
+                # Encerra qualquer transação aberta para não vazar locks para o próximo uso
+                connection.rollback()
+            except pyodbc.Error as e:
+                logger.info(f"Rollback falhou ao devolver conexão ODBC ao pool: {e}")
+                discard = True
+
+        with self._cond:
+            pooled = self._in_use.pop(id(connection), None)
+            if pooled is None:
+                # Conexão que não pertence a este pool (ex.: pool recriado durante o uso)
+                discard = True
+            elif discard or self._closed or self._is_expired(pooled):
+                self._total -= 1
+                discard = True
+            else:
+                pooled.last_used_at = time.monotonic()
+                self._idle.append(pooled)
+            self._cond.notify()
+
+        if discard:
+            self._close_quietly(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[pyodbc.Connection]:
+        """
+        Context manager que faz checkout de uma conexão e a devolve ao final.
+        A conexão é devolvida mesmo que o bloco levante exceção; se ela estiver
+        quebrada o rollback em release() falha e ela é descartada.
+        """
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    # ------------------------------------------------------------------ #
+    # Manutenção
+    # ------------------------------------------------------------------ #
+    def close(self) -> None:
+        """Fecha as conexões ociosas e impede novos checkouts. Conexões em uso são fechadas ao retornar."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._total -= len(idle)
+            self._cond.notify_all()
+
+        for pooled in idle:
+            self._close_quietly(pooled.connection)
+        logger.info(f"Pool ODBC encerrado. {len(idle)} conexões ociosas fechadas.")
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna contadores do pool para diagnóstico."""
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "open": self._total,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+            }
+
+    # ------------------------------------------------------------------ #
+    # Auxiliares
+    # ------------------------------------------------------------------ #
+    def _open_new(self) -> pyodbc.Connection:
+        try:
+            connection = pyodbc.connect(
+                self.connection_string, timeout=self.connect_timeout
+            )
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+
+        pooled = _PooledConnection(connection)
+        with self._cond:
+            self._in_use[id(connection)] = pooled
+        logger.debug("Nova conexão ODBC aberta para o pool.")
+        return connection
+
+    def _discard(self, connection: pyodbc.Connection) -> None:
+        with self._cond:
+            if self._in_use.pop(id(connection), None) is not None:
+                self._total -= 1
+            self._cond.notify()
+        self._close_quietly(connection)
+
+    def _is_expired(self, pooled: _PooledConnection) -> bool:
+        now = time.monotonic()
+        if self.max_lifetime and now - pooled.created_at > self.max_lifetime:
+            return True
+        if self.max_idle_time and now - pooled.last_used_at > self.max_idle_time:
+            return True
+        return False
+
+    def _is_healthy(self, pooled: _PooledConnection) -> bool:
+        if time.monotonic() - pooled.last_used_at < self.ping_interval:
+            return True
+        cursor = None
+        try:
+            cursor = pooled.connection.cursor()
+            cursor.execute(self.health_check_query)
+            cursor.fetchall()
+            return True
+        except pyodbc.Error as e:
+            logger.debug(f"Verificação de saúde da conexão ODBC falhou: {e}")
+            return False
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except pyodbc.Error:
+                    pass
+
+    @staticmethod
+    def _close_quietly(connection: pyodbc.Connection) -> None:
+        try:
+            connection.close()
+        except pyodbc.Error as e:
+            logger.debug(f"Erro ignorado ao fechar conexão ODBC: {e}")
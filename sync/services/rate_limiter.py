@@ -0,0 +1,177 @@
+"""
+Limitador de taxa (token bucket) compartilhado entre processos.
+
+O estado de cada balde fica em um arquivo SQLite próprio. Cada retirada de
+ficha roda em uma transação BEGIN IMMEDIATE, que o SQLite serializa entre
+todos os processos (web e workers do process_tasks), de modo que N workers
+juntos respeitam exatamente a taxa configurada.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket persistido em SQLite.
+
+    - taxa: fichas repostas por segundo (requisições por segundo permitidas)
+    - capacidade: máximo de fichas acumuladas (tamanho da rajada)
+    """
+
+    def __init__(self, db_path: Optional[str] = None, lock_timeout: float = 30):
+        self._db_path = db_path
+        self.lock_timeout = lock_timeout
+        self._local = threading.local()
+
+    @property
+    def db_path(self) -> str:
+        if self._db_path is None:
+            self._db_path = str(
+                getattr(
+                    settings,
+                    "FISCAUT_RATE_LIMIT_DB",
+                    os.path.join(settings.BASE_DIR, "rate_limit.sqlite3"),
+                )
+            )
+        return self._db_path
+
+    def acquire(
+        self,
+        chave: str,
+        taxa: float,
+        capacidade: int = 1,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Retira uma ficha do balde `chave`, aguardando a reposição se necessário.
+
+        Args:
+            chave: Identificador do balde (ex.: um por configuração de API).
+            taxa: Fichas por segundo. Com taxa <= 0 não há limite.
+            capacidade: Fichas máximas acumuladas (rajada).
+            timeout: Segundos máximos de espera (None = sem limite).
+
+        Returns:
+            True se a ficha foi obtida, False se o tempo de espera esgotou.
+
+        Raises:
+            sqlite3.Error: Se o arquivo do limitador não puder ser usado.
+        """
+        if taxa <= 0:
+            return True
+        capacidade = max(1, int(capacidade))
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            espera = self._try_take(chave, taxa, capacidade)
+            if espera <= 0:
+                return True
+
+            if deadline is not None:
+                restante = deadline - time.monotonic()
+                if restante <= 0:
+                    return False
+                espera = min(espera, restante)
+            time.sleep(espera)
+
+    async def acquire_async(
+        self,
+        chave: str,
+        taxa: float,
+        capacidade: int = 1,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Versão para asyncio de acquire(): a transação no SQLite roda em uma
+        thread (pode esperar até lock_timeout pela trava de outro processo) e
+        a espera pela ficha usa asyncio.sleep, sem bloquear o event loop.
+        """
+        if taxa <= 0:
+            return True
+        capacidade = max(1, int(capacidade))
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            espera = await asyncio.to_thread(self._try_take, chave, taxa, capacidade)
+            if espera <= 0:
+                return True
+
+            if deadline is not None:
+                restante = deadline - time.monotonic()
+                if restante <= 0:
+                    return False
+                espera = min(espera, restante)
+            await asyncio.sleep(espera)
+
+    # ------------------------------------------------------------------ #
+    # Auxiliares
+    # ------------------------------------------------------------------ #
+    def _try_take(self, chave: str, taxa: float, capacidade: int) -> float:
+        """
+        Tenta retirar uma ficha. Retorna 0 em caso de sucesso ou os segundos
+        até a próxima ficha estar disponível.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            agora = time.time()
+            row = conn.execute(
+                "SELECT fichas, atualizado_em FROM token_bucket WHERE chave = ?",
+                (chave,),
+            ).fetchone()
+            if row is None:
+                fichas = float(capacidade)
+            else:
+                fichas, atualizado_em = row
+                decorrido = max(0.0, agora - atualizado_em)
+                fichas = min(float(capacidade), fichas + decorrido * taxa)
+
+            if fichas >= 1:
+                fichas -= 1
+                espera = 0.0
+            else:
+                espera = (1 - fichas) / taxa
+
+            conn.execute(
+                "INSERT INTO token_bucket (chave, fichas, atualizado_em) VALUES (?, ?, ?) "
+                "ON CONFLICT(chave) DO UPDATE SET fichas = excluded.fichas, "
+                "atualizado_em = excluded.atualizado_em",
+                (chave, fichas, agora),
+            )
+            conn.execute("COMMIT")
+            return espera
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _connection(self) -> sqlite3.Connection:
+        # Uma conexão por thread e por processo (conexões sqlite3 não
+        # devem atravessar fork nem ser usadas em threads diferentes).
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(
+            self.db_path, timeout=self.lock_timeout, isolation_level=None
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS token_bucket ("
+            "chave TEXT PRIMARY KEY, fichas REAL NOT NULL, atualizado_em REAL NOT NULL)"
+        )
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+
+# Instância única do processo para as chamadas à API Fiscaut
+fiscaut_rate_limiter = TokenBucketRateLimiter()
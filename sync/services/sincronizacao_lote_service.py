@@ -0,0 +1,229 @@
+"""
+Sincronização em lote de fornecedores de uma empresa.
+
+A view apenas cria um SincronizacaoLoteJob e agenda a tarefa produtora. A tarefa
+lê os fornecedores via ODBC em lotes (ODBCConnectionManager.iter_entity) e, a
+cada lote lido, verifica a elegibilidade (uma consulta de status por lote) e enfileira as tarefas de sincronização
+individuais. Assim o envio à API começa enquanto a extração ainda está em
+andamento e não há limite de páginas nem lista completa em memória.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from sync.db_routers import transacao_com_fila_de_tarefas
+from sync.models import SincronizacaoLoteJob
+from .fornecedor_elegibilidade_service import fornecedor_elegibilidade_service
+from .listagem_cache import listagem_cache
+from .odbc_connection import ODBCConnectionManager, odbc_manager
+
+logger = logging.getLogger(__name__)
+
+
+class SincronizacaoLoteService:
+    """
+    Cria e executa jobs de sincronização em lote de fornecedores.
+    """
+
+    def __init__(
+        self,
+        odbc_manager: Optional[ODBCConnectionManager] = None,
+        tamanho_lote: Optional[int] = None,
+        fornecedores_por_tarefa: Optional[int] = None,
+    ):
+        self.odbc_manager = odbc_manager
+        self._tamanho_lote = tamanho_lote
+        self._fornecedores_por_tarefa = fornecedores_por_tarefa
+
+    @property
+    def tamanho_lote(self) -> int:
+        if self._tamanho_lote is None:
+            return getattr(settings, "SINCRONIZACAO_LOTE_TAMANHO", 500)
+        return self._tamanho_lote
+
+    @property
+    def fornecedores_por_tarefa(self) -> int:
+        if self._fornecedores_por_tarefa is None:
+            return getattr(settings, "SINCRONIZACAO_LOTE_FORNECEDORES_POR_TAREFA", 200)
+        return self._fornecedores_por_tarefa
+
+    def iniciar_job(self, codi_emp: int, cnpj_empresa: str) -> SincronizacaoLoteJob:
+        """
+        Registra um novo job e agenda a tarefa que executa a extração.
+
+        Returns:
+            O SincronizacaoLoteJob criado (status PENDENTE).
+        """
+        from sync.tasks import executar_sincronizacao_lote_task
+
+        job = SincronizacaoLoteJob.objects.create(
+            codi_emp=codi_emp, cnpj_empresa=cnpj_empresa
+        )
+        executar_sincronizacao_lote_task(str(job.id))
+        logger.info(
+            f"Sinc. Lote: Job {job.id} criado para a empresa {codi_emp} (CNPJ: {cnpj_empresa})."
+        )
+        return job
+
+    def executar_job(self, job_id: str) -> None:
+        """
+        Lê os fornecedores da empresa do job em lotes e enfileira os elegíveis
+        em tarefas de até fornecedores_por_tarefa fornecedores cada. Os
+        contadores do job são atualizados a cada lote.
+        """
+        from sync.tasks import processar_sincronizacao_fornecedores_lote_task
+
+        try:
+            job = SincronizacaoLoteJob.objects.get(pk=job_id)
+        except SincronizacaoLoteJob.DoesNotExist:
+            logger.error(f"Sinc. Lote: Job {job_id} não encontrado.")
+            return
+
+        if job.status != SincronizacaoLoteJob.STATUS_PENDENTE:
+            # Reexecução da tarefa (ex.: retentativa do process_tasks) não deve
+            # enfileirar os mesmos fornecedores de novo.
+            logger.warning(
+                f"Sinc. Lote: Job {job.id} já está com status {job.status}. Ignorando nova execução."
+            )
+            return
+
+        self._atualizar_job(job.pk, status=SincronizacaoLoteJob.STATUS_EM_ANDAMENTO)
+        codi_emp = job.codi_emp
+        lidos = ignorados = enfileirados = tarefas = 0
+        por_tarefa = max(1, self.fornecedores_por_tarefa)
+        manager = self.odbc_manager or odbc_manager
+
+        try:
+            for lote in manager.iter_entity(
+                "fornecedores", codi_emp, batch_size=self.tamanho_lote
+            ):
+                validos, ignorados_lote = self._normalizar_fornecedores(codi_emp, lote)
+                # Só novos, com erro ou com dados alterados desde o último envio
+                elegiveis = fornecedor_elegibilidade_service.filtrar_elegiveis(
+                    codi_emp, validos, cnpj_empresa=job.cnpj_empresa
+                )
+
+                # Uma transação por lote: o SQLite faz um único commit para
+                # todas as tarefas enfileiradas em vez de um por tarefa (um por
+                # banco, se a fila estiver em um banco separado).
+                with transacao_com_fila_de_tarefas():
+                    tarefas_lote = 0
+                    for inicio in range(0, len(elegiveis), por_tarefa):
+                        processar_sincronizacao_fornecedores_lote_task(
+                            cnpj_empresa=job.cnpj_empresa,
+                            codi_emp_odbc=codi_emp,
+                            fornecedores=elegiveis[inicio : inicio + por_tarefa],
+                        )
+                        tarefas_lote += 1
+                    SincronizacaoLoteJob.objects.filter(pk=job.pk).update(
+                        fornecedores_lidos=F("fornecedores_lidos") + len(lote),
+                        fornecedores_ignorados=F("fornecedores_ignorados")
+                        + ignorados_lote,
+                        fornecedores_enfileirados=F("fornecedores_enfileirados")
+                        + len(elegiveis),
+                        tarefas_enfileiradas=F("tarefas_enfileiradas") + tarefas_lote,
+                        updated_at=timezone.now(),
+                    )
+
+                lidos += len(lote)
+                ignorados += ignorados_lote
+                enfileirados += len(elegiveis)
+                tarefas += tarefas_lote
+                logger.debug(
+                    f"Sinc. Lote: Job {job.id} - lote de {len(lote)} fornecedores processado "
+                    f"({len(elegiveis)} enfileirados). Total lido: {lidos}."
+                )
+        except Exception as e:
+            logger.error(
+                f"Sinc. Lote: Erro no job {job.id} da empresa {codi_emp} após {lidos} fornecedores lidos: {e}",
+                exc_info=True,
+            )
+            self._atualizar_job(
+                job.pk,
+                status=SincronizacaoLoteJob.STATUS_ERRO,
+                mensagem=(
+                    f"Erro ao buscar fornecedores da empresa {codi_emp} via ODBC: {e}. "
+                    f"{enfileirados} fornecedores já haviam sido enfileirados."
+                ),
+                finished_at=timezone.now(),
+            )
+            return
+
+        if not lidos:
+            msg = f"Nenhum fornecedor encontrado para a empresa {codi_emp} para sincronizar."
+        elif enfileirados:
+            msg = f"{enfileirados} fornecedores foram enfileirados para sincronização em {tarefas} tarefas para a empresa {codi_emp}."
+        else:
+            msg = f"Nenhum fornecedor elegível para sincronização encontrado para a empresa {codi_emp}."
+
+        self._atualizar_job(
+            job.pk,
+            status=SincronizacaoLoteJob.STATUS_CONCLUIDO,
+            mensagem=msg,
+            finished_at=timezone.now(),
+        )
+        # O job acabou de ler os fornecedores atuais: páginas em cache podem
+        # estar desatualizadas.
+        listagem_cache.invalidar(["fornecedores"], codi_emp)
+        logger.info(
+            f"Sinc. Lote: Job {job.id} concluído. {lidos} lidos, {ignorados} ignorados. {msg}"
+        )
+
+    # ------------------------------------------------------------------ #
+    # Auxiliares
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _atualizar_job(job_pk, **campos) -> None:
+        campos.setdefault("updated_at", timezone.now())
+        SincronizacaoLoteJob.objects.filter(pk=job_pk).update(**campos)
+
+    @staticmethod
+    def _normalizar_fornecedores(
+        codi_emp: int, lote: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, str]], int]:
+        """
+        Extrai os campos usados na sincronização e descarta fornecedores sem
+        código, CNPJ ou nome.
+
+        Returns:
+            (fornecedores válidos, quantidade ignorada)
+        """
+        validos = []
+        ignorados = 0
+        for fornecedor_data in lote:
+            codi_for_odbc = str(fornecedor_data.get("codi_for", "") or "").strip()
+            cnpj_fornecedor = str(fornecedor_data.get("cgce_for", "") or "").strip()
+            nome_fornecedor = str(
+                fornecedor_data.get("razao_social", "")
+                or fornecedor_data.get("nome_for", "")
+            ).strip()
+            conta_contabil_fornecedor = str(
+                fornecedor_data.get("codi_cta", "")
+                or fornecedor_data.get("conta_ctb", "")
+            ).strip()
+
+            if not codi_for_odbc or not cnpj_fornecedor or not nome_fornecedor:
+                logger.debug(
+                    f"Sinc. Lote: Fornecedor {codi_for_odbc or '(sem codi_for)'} da empresa {codi_emp} "
+                    f"ignorado (sem código, CNPJ ou nome)."
+                )
+                ignorados += 1
+                continue
+
+            validos.append(
+                {
+                    "codi_for_odbc": codi_for_odbc,
+                    "cnpj_fornecedor": cnpj_fornecedor,
+                    "nome_fornecedor": nome_fornecedor,
+                    "conta_contabil_fornecedor": conta_contabil_fornecedor,
+                }
+            )
+        return validos, ignorados
+
+
+# Instância única para uso nas views e tarefas
+sincronizacao_lote_service = SincronizacaoLoteService()
@@ -0,0 +1,27 @@
+"""
+Receivers de sinais do app sync.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ODBCConfiguration
+from .services.odbc_config_registry import odbc_config_registry
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=ODBCConfiguration)
+@receiver(post_delete, sender=ODBCConfiguration)
+def invalidar_cache_configuracao_odbc(sender, instance, using=None, **kwargs):
+    """Descarta a configuração ODBC em cache neste e nos demais processos."""
+    logger.debug(
+        f"ODBCConfiguration {instance.pk} alterada. Invalidando cache da configuração ODBC."
+    )
+    odbc_config_registry.invalidate(bump_version=False)
+    # O carimbo só muda depois do commit: antes disso, outro processo que o
+    # lesse recarregaria a configuração antiga e a guardaria sob a versão nova.
+    transaction.on_commit(odbc_config_registry.invalidate, using=using)
@@ -1,7 +1,8 @@
 from background_task import background
 import logging
+from django.conf import settings
 from .services.fiscaut_api_service import FiscautApiService
-import time
+from .services.fiscaut_async_sender import FiscautAsyncSender
 
 # Se FornecedorStatusSincronizacao ou outros modelos forem diretamente necessários aqui, importe-os.
 # Ex: from .models import FornecedorStatusSincronizacao
@@ -26,9 +27,8 @@ def processar_sincronizacao_fornecedor_task(
         f"da Empresa ODBC {codi_emp_odbc} (CNPJ Emp: {cnpj_empresa}, CNPJ Forn: {cnpj_fornecedor})."
     )
     try:
-        # Adiciona uma pausa de 1 segundo antes de cada chamada à API
-        time.sleep(1)
-
+        # O ritmo das chamadas é controlado pelo limitador de taxa do
+        # FiscautApiService (requisicoes_por_segundo da configuração).
         api_service = FiscautApiService()
         # A lógica de chamada à API, tratamento de resposta e registro de status
         # (sucesso/erro) já está encapsulada em sincronizar_fornecedor.
@@ -65,3 +65,124 @@ def processar_sincronizacao_fornecedor_task(
         # Não é necessário um 'raise' aqui, pois a falha já deve ser registrada pelo
         # FiscautApiService. Se o FiscautApiService falhar em registrar,
         # teremos este log da task para diagnóstico.
+
+
+@background(schedule=0)
+def processar_sincronizacao_fornecedores_lote_task(
+    cnpj_empresa: str,
+    codi_emp_odbc: int,
+    fornecedores: list,
+):
+    """
+    Tarefa de background para sincronizar um grupo de fornecedores da mesma
+    empresa com a API Fiscaut: uma instância do serviço, uma sessão HTTP e uma
+    única escrita em lote dos status ao final.
+
+    Cada item de `fornecedores` tem codi_for_odbc, nome_fornecedor,
+    cnpj_fornecedor e conta_contabil_fornecedor.
+    """
+    logger.info(
+        f"BG_TASK: Iniciando sincronização em lote de {len(fornecedores)} fornecedores "
+        f"da Empresa ODBC {codi_emp_odbc} (CNPJ Emp: {cnpj_empresa})."
+    )
+    try:
+        api_service = FiscautApiService()
+        config = api_service.get_config()
+        usar_envio_assincrono = (
+            getattr(settings, "FISCAUT_ENVIO_ASSINCRONO", False)
+            and FiscautAsyncSender.disponivel()
+            and config is not None
+            and config.tamanho_lote_envio <= 1
+        )
+        if usar_envio_assincrono:
+            # Várias requisições simultâneas, um único escritor de status
+            resultado = FiscautAsyncSender(
+                api_service=api_service
+            ).sincronizar_fornecedores(
+                cnpj_empresa=cnpj_empresa,
+                codi_emp_odbc=codi_emp_odbc,
+                fornecedores=fornecedores,
+            )
+        else:
+            resultado = api_service.sincronizar_fornecedores_lote(
+                cnpj_empresa=cnpj_empresa,
+                codi_emp_odbc=codi_emp_odbc,
+                fornecedores=fornecedores,
+            )
+
+        if not resultado.get("success"):
+            logger.warning(
+                f"BG_TASK: Lote de fornecedores da Emp. ODBC {codi_emp_odbc} não enviado. "
+                f"Msg: {resultado.get('message')}"
+            )
+            return
+
+        for item in resultado.get("resultados", []):
+            if not item["success"]:
+                logger.warning(
+                    f"BG_TASK: Falha na sincronização para Forn. ODBC {item['codi_for_odbc']}. "
+                    f"Msg: {item['message']}"
+                )
+        logger.info(
+            f"BG_TASK: Lote da Emp. ODBC {codi_emp_odbc} concluído. {resultado.get('message')}"
+        )
+
+    except Exception as e:
+        # sincronizar_fornecedores_lote registra o status do que já foi enviado
+        # mesmo quando o laço é interrompido; este log cobre falhas da própria task.
+        logger.error(
+            f"BG_TASK: Erro crítico na tarefa de sincronização em lote da Emp. ODBC {codi_emp_odbc}: {e}",
+            exc_info=True,
+        )
+
+
+# Fila própria da tarefa produtora do lote. Com um worker dedicado
+# (`process_tasks --queue sincronizacao-lote`) a extração roda em paralelo ao
+# worker padrão, que já vai consumindo as tarefas de fornecedores enfileiradas.
+FILA_SINCRONIZACAO_LOTE = "sincronizacao-lote"
+
+
+@background(schedule=0, queue=FILA_SINCRONIZACAO_LOTE)
+def executar_sincronizacao_lote_task(job_id: str):
+    """
+    Tarefa de background que extrai os fornecedores de uma empresa via ODBC e
+    enfileira, lote a lote, as tarefas de sincronização em grupo dos elegíveis.
+    """
+    # Import tardio: o serviço importa as tarefas deste módulo
+    from .services.sincronizacao_lote_service import sincronizacao_lote_service
+
+    logger.info(f"BG_TASK: Iniciando job de sincronização em lote {job_id}.")
+    sincronizacao_lote_service.executar_job(job_id)
+
+
+# Fila da atualização do espelho ODBC: leituras longas que não devem atrasar o
+# envio de fornecedores no worker padrão (`process_tasks --queue espelho-odbc`).
+FILA_ESPELHO_ODBC = "espelho-odbc"
+
+
+@background(schedule=0, queue=FILA_ESPELHO_ODBC)
+def atualizar_espelho_task(codi_emp: int = None, entidades: list = None):
+    """
+    Tarefa de background que atualiza o espelho local das tabelas ODBC de uma
+    empresa ou, sem codi_emp, de todas as empresas habilitadas.
+    """
+    from .services.espelho_service import espelho_service
+
+    if codi_emp is None:
+        logger.info("BG_TASK: Atualizando o espelho ODBC das empresas habilitadas.")
+        espelho_service.atualizar_todas(entidades)
+    else:
+        logger.info(f"BG_TASK: Atualizando o espelho ODBC da empresa {codi_emp}.")
+        espelho_service.atualizar_empresa(codi_emp, entidades)
+
+
+@background(schedule=0)
+def purgar_logs_task():
+    """
+    Tarefa de background que aplica a retenção dos logs do banco
+    (LOG_RETENCAO_DIAS); agendada pelo comando `purgar_logs --agendar`.
+    """
+    from .services.log_retencao_service import log_retencao_service
+
+    logger.info("BG_TASK: Aplicando a retenção dos logs do banco.")
+    log_retencao_service.purgar()
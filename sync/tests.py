@@ -1,3 +1,118 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+
+from sync.fiscaut_stub import iniciar_servidor_em_thread
+from sync.models import FiscautApiConfig, FornecedorStatusSincronizacao
+from sync.services.fiscaut_api_service import FiscautApiService
+
+CNPJ_EMPRESA = "11222333000181"
+CODI_EMP = 1
+
+
+@override_settings(FISCAUT_RETRY_TENTATIVAS=3, FISCAUT_RETRY_ESPERA_BASE=0)
+class SincronizacaoFornecedoresLoteStubTests(TestCase):
+    """
+    Envio em lote de fornecedores contra o servidor de testes (fiscaut_stub).
+    """
+
+    def setUp(self):
+        # A thread do BufferedDatabaseLogHandler gravaria os logs fora da
+        # transação do teste e disputaria a trava do banco em memória
+        emit = mock.patch("sync.log_handlers.BufferedDatabaseLogHandler.emit")
+        emit.start()
+        self.addCleanup(emit.stop)
+
+    def iniciar_stub(self, tamanho_lote_envio: int, **opcoes):
+        servidor = iniciar_servidor_em_thread(api_key="chave-teste", **opcoes)
+        self.addCleanup(servidor.server_close)
+        self.addCleanup(servidor.shutdown)
+        FiscautApiConfig.objects.create(
+            api_url=f"http://127.0.0.1:{servidor.server_port}",
+            api_key="chave-teste",
+            requisicoes_por_segundo=0,  # sem limitador de taxa
+            tamanho_lote_envio=tamanho_lote_envio,
+        )
+        return servidor
+
+    @staticmethod
+    def fornecedores(quantidade: int):
+        return [
+            {
+                "codi_for_odbc": str(codi_for),
+                "nome_fornecedor": f"Fornecedor {codi_for}",
+                "cnpj_fornecedor": f"{codi_for:014d}",
+                "conta_contabil_fornecedor": "2.1.1",
+            }
+            for codi_for in range(1, quantidade + 1)
+        ]
+
+    @staticmethod
+    def status_por_fornecedor():
+        return dict(
+            FornecedorStatusSincronizacao.objects.filter(
+                codi_emp_odbc=CODI_EMP
+            ).values_list("codi_for_odbc", "status_sincronizacao")
+        )
+
+    def test_resultado_de_cada_item_do_lote_vira_status_do_fornecedor(self):
+        servidor = self.iniciar_stub(tamanho_lote_envio=5, falha_a_cada=3)
+
+        resultado = FiscautApiService().sincronizar_fornecedores_lote(
+            CNPJ_EMPRESA, CODI_EMP, self.fornecedores(5)
+        )
+
+        self.assertEqual(servidor.posts, 1)
+        self.assertEqual((resultado["sucessos"], resultado["falhas"]), (4, 1))
+        self.assertEqual(
+            self.status_por_fornecedor(),
+            {
+                "1": FornecedorStatusSincronizacao.STATUS_SINCRONIZADO,
+                "2": FornecedorStatusSincronizacao.STATUS_SINCRONIZADO,
+                "3": FornecedorStatusSincronizacao.STATUS_ERRO,
+                "4": FornecedorStatusSincronizacao.STATUS_SINCRONIZADO,
+                "5": FornecedorStatusSincronizacao.STATUS_SINCRONIZADO,
+            },
+        )
+        self.assertIn(
+            "Falha simulada",
+            FornecedorStatusSincronizacao.objects.get(
+                codi_emp_odbc=CODI_EMP, codi_for_odbc="3"
+            ).detalhes_ultima_resposta,
+        )
+
+    def test_lote_recusado_e_reenviado_item_a_item(self):
+        servidor = self.iniciar_stub(tamanho_lote_envio=4, aceita_lote=False)
+
+        resultado = FiscautApiService().sincronizar_fornecedores_lote(
+            CNPJ_EMPRESA, CODI_EMP, self.fornecedores(4)
+        )
+
+        # Um POST com o array (recusado) e um por fornecedor
+        self.assertEqual(servidor.posts, 5)
+        self.assertEqual(resultado["sucessos"], 4)
+        self.assertEqual(len(servidor.fornecedores), 4)
+        self.assertEqual(
+            set(self.status_por_fornecedor().values()),
+            {FornecedorStatusSincronizacao.STATUS_SINCRONIZADO},
+        )
+
+    def test_http_503_com_retry_after_e_repetido(self):
+        servidor = self.iniciar_stub(
+            tamanho_lote_envio=1, indisponivel_a_cada=2, retry_after=2
+        )
+
+        with mock.patch(
+            "sync.services.fiscaut_api_service.time.sleep"
+        ) as sleep_simulado:
+            resultado = FiscautApiService().sincronizar_fornecedores_lote(
+                CNPJ_EMPRESA, CODI_EMP, self.fornecedores(3)
+            )
+
+        # POSTs 2 e 4 recebem 503 e são repetidos
+        self.assertEqual(servidor.posts, 5)
+        self.assertEqual(resultado["sucessos"], 3)
+        self.assertEqual(len(servidor.fornecedores), 3)
+        esperas = [chamada.args[0] for chamada in sleep_simulado.call_args_list]
+        self.assertEqual(len(esperas), 2)
+        self.assertTrue(all(espera >= 2 for espera in esperas))
@@ -27,6 +27,11 @@ urlpatterns = [
         views.EmpresaDetailView.as_view(),
         name="sync_empresa_detalhes",
     ),
+    path(
+        "empresas/<int:codi_emp>/detalhes/aba/<str:aba>/",
+        views.EmpresaAbaView.as_view(),
+        name="sync_empresa_detalhes_aba",
+    ),
     # APIs para configuração da Fiscaut API
     path(
         "api/fiscaut/config/",
@@ -49,10 +54,20 @@ urlpatterns = [
         views.SincronizarFornecedoresLoteView.as_view(),
         name="sync_api_sincronizar_fornecedores_lote",
     ),
+    path(
+        "api/empresas/sincronizar-lote/<uuid:job_id>/",
+        views.SincronizacaoLoteStatusView.as_view(),
+        name="sync_api_sincronizar_fornecedores_lote_status",
+    ),
     # Logs da Aplicação - AGORA EM /logs/
     path(
         "logs/",
         views.ApplicationLogsView.as_view(),
         name="sync_logs",
     ),
+    path(
+        "logs/analise/",
+        views.LogAnaliseView.as_view(),
+        name="sync_logs_analise",
+    ),
 ]
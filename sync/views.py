@@ -3,7 +3,7 @@ from django.shortcuts import render
 # from django.contrib.auth.models import User # Removida
 from django.views.generic import TemplateView, ListView
 import json
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.views.decorators.http import require_http_methods
 from sync.services.odbc_connection import odbc_manager
 from .services.empresa_sincronizacao_service import empresa_sinc_service
@@ -16,6 +16,7 @@ from .models import (
     FiscautApiConfig,
     FornecedorStatusSincronizacao,
     ApplicationLog,
+    SincronizacaoLoteJob,
 )  # Adicionado FornecedorStatusSincronizacao e ApplicationLog
 import requests  # Adicionar importação para a biblioteca requests
 from .services.fiscaut_api_service import (
@@ -26,8 +27,15 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
-from .tasks import processar_sincronizacao_fornecedor_task
-from django.urls import reverse_lazy
+from .services.sincronizacao_lote_service import sincronizacao_lote_service
+from .services.espelho_service import espelho_service
+from .services.log_busca_service import log_busca_service
+from .services.log_retencao_service import log_retencao_service
+from .services.log_resumo_service import NIVEIS, log_resumo_service
+from .services.dashboard_metricas_service import dashboard_metricas_service
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from datetime import timedelta
 
 logger = logging.getLogger(__name__)
 
@@ -299,18 +307,77 @@ def api_test_odbc_connection(request):
         )
 
 
+# Cores das barras dos gráficos de logs, por nível
+CORES_NIVEIS_LOG = {
+    "DEBUG": "bg-gray-300",
+    "INFO": "bg-blue-500",
+    "WARNING": "bg-yellow-500",
+    "ERROR": "bg-red-500",
+    "CRITICAL": "bg-red-600",
+}
+
+
+def _ultimas_horas(horas):
+    """Intervalo [início, fim) das últimas `horas` horas, alinhado à hora cheia."""
+    fim = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    return fim - timedelta(hours=horas), fim
+
+
+def _grafico_logs(serie, por_dia=False):
+    """
+    Converte a série do resumo de logs em barras empilhadas por nível, com a
+    altura de cada segmento em % da maior barra.
+    """
+    maximo = max((p["total"] for p in serie), default=0) or 1
+    barras = []
+    for ponto in serie:
+        if por_dia:
+            rotulo = ponto["periodo"].strftime("%d/%m")
+        else:
+            rotulo = timezone.localtime(ponto["periodo"]).strftime("%d/%m %Hh")
+        barras.append(
+            {
+                "rotulo": rotulo,
+                "total": ponto["total"],
+                "niveis": ponto["niveis"],
+                # De cima para baixo: os níveis mais graves ficam na base
+                "segmentos": [
+                    {
+                        "nivel": nivel,
+                        "quantidade": ponto["niveis"][nivel],
+                        "altura": round(ponto["niveis"][nivel] * 100 / maximo, 2),
+                        "cor": CORES_NIVEIS_LOG[nivel],
+                    }
+                    for nivel in NIVEIS
+                    if ponto["niveis"][nivel]
+                ],
+            }
+        )
+    return {"barras": barras, "maximo": maximo}
+
+
 class DashboardView(TemplateView):
     template_name = "sync/dashboard.html"  # Caminho do template precisa ser verificado
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        # Logs das últimas 24h pelo resumo por hora (no máximo 24 x 5 linhas)
+        inicio, fim = _ultimas_horas(24)
+        context["logs_grafico"] = _grafico_logs(log_resumo_service.serie(inicio, fim))
+        context["logs_totais"] = log_resumo_service.totais(inicio, fim)
+        context["cores_niveis_log"] = CORES_NIVEIS_LOG
+        # Uma consulta agregada, em cache por DASHBOARD_METRICAS_TTL segundos
+        try:
+            context["metricas"] = dashboard_metricas_service.obter()
+        except Exception as e:
+            logger.error(
+                f"Erro ao calcular as métricas do dashboard: {e}", exc_info=True
+            )
+            context["metricas"] = None
+        context["metricas_ttl"] = dashboard_metricas_service.ttl
         context.update(
             {
                 "active_page": "dashboard",
-                "total_users": 0,  # Valor estático, ou remover completamente
-                "total_syncs": 145,  # Dados de exemplo
-                "success_rate": 98.5,  # Dados de exemplo
-                "connected_systems": 4,  # Dados de exemplo
                 "recent_activities": [
                     {
                         "icon": "refresh-cw",
@@ -535,39 +602,51 @@ class EmpresasListView(TemplateView):
         return context
 
 
+# Objetos mínimos com a interface de Page/Paginator usada por
+# partials/pagination_controls.html, para paginação feita no ODBC.
+class MockPage:
+    def __init__(
+        self,
+        number,
+        paginator_instance,
+        object_list,
+        has_next,
+        has_previous,
+        start_index,
+        end_index,
+    ):
+        self.number = number
+        self.paginator = paginator_instance
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.start_index = start_index
+        self.end_index = end_index
+
+
+class MockPaginator:
+    def __init__(self, count, num_pages, page_range):
+        self.count = count
+        self.num_pages = num_pages
+        self.page_range = page_range
+
+
 class EmpresaDetailView(View):
     template_name = "sync/empresa_detalhes.html"
 
+    # Valor do parâmetro "tab" -> prefixo das variáveis de contexto da aba
+    ABAS = {
+        "acumuladores": "acumuladores",
+        "clientes": "clientes",
+        "fornecedores": "fornecedores",
+        "planos_contas": "plano_contas",
+    }
+    # Mesma aba padrão do $persist do template
+    ABA_PADRAO = "acumuladores"
+
     def get(self, request, codi_emp, *args, **kwargs):
         logger.info(f"Acessando detalhes da empresa com codi_emp: {codi_emp}")
 
-        # Definição das classes MockPage e MockPaginator no escopo do método
-        # TODO: Considerar mover para um local mais global se usadas em múltiplas views
-        class MockPage:
-            def __init__(
-                self,
-                number,
-                paginator_instance,
-                object_list,
-                has_next,
-                has_previous,
-                start_index,
-                end_index,
-            ):
-                self.number = number
-                self.paginator = paginator_instance
-                self.object_list = object_list
-                self.has_next = has_next
-                self.has_previous = has_previous
-                self.start_index = start_index
-                self.end_index = end_index
-
-        class MockPaginator:
-            def __init__(self, count, num_pages, page_range):
-                self.count = count
-                self.num_pages = num_pages
-                self.page_range = page_range
-
         empresa_detalhes = empresa_sinc_service.get_detalhes_empresa(codi_emp)
 
         if not empresa_detalhes:
@@ -580,7 +659,30 @@ class EmpresaDetailView(View):
             "empresa": empresa_detalhes,
         }
 
-        # --- Início da Lógica para Fornecedores ---
+        # Só a aba visível é consultada aqui; as demais são buscadas pelo
+        # navegador em EmpresaAbaView quando abertas. Os filtros de todas as
+        # abas vão para o contexto porque os formulários são renderizados aqui.
+        aba = request.GET.get("tab")
+        if aba not in self.ABAS:
+            aba = self.ABA_PADRAO
+        context["aba_inicial"] = aba
+        for chave in self.ABAS.values():
+            consulta = getattr(self, f"_preparar_{chave}")(request, codi_emp, context)
+            if chave == self.ABAS[aba]:
+                self._carregar_aba(request, codi_emp, chave, consulta, context)
+
+        return render(request, self.template_name, context)
+
+    def _carregar_aba(self, request, codi_emp, chave, consulta, context):
+        # Com prazo: se a consulta demorar, a aba mostra o aviso de carregamento
+        resultado = espelho_service.listar_em_paralelo({chave: consulta})[chave]
+        context[f"{chave}_carregando"] = resultado is None
+        getattr(self, f"_montar_{chave}")(
+            request, codi_emp, consulta, resultado, context
+        )
+
+    def _preparar_fornecedores(self, request, codi_emp, context):
+        """Lê os filtros e a página de fornecedores; retorna os argumentos de listar()."""
         fornecedor_page_size = 50
         current_f_codi_for = request.GET.get("f_codi_for", None)
         current_f_nome_for = request.GET.get("f_nome_for", None)
@@ -626,13 +728,28 @@ class EmpresaDetailView(View):
             f"Buscando fornecedores para empresa {codi_emp} com filtros ODBC: {fornecedor_filters}, página: {f_page_number}, filtro status sinc: {current_f_status_sinc}"
         )
 
-        fornecedores_result = odbc_manager.list_fornecedores_empresa(
-            codi_emp=codi_emp,
-            filters=fornecedor_filters,  # Filtros que vão para o ODBC
-            page_number=f_page_number,
-            page_size=fornecedor_page_size,
+        context["current_f_codi_for"] = current_f_codi_for
+        context["current_f_nome_for"] = current_f_nome_for
+        context["current_f_cgce_for"] = current_f_cgce_for
+        context["current_f_status_sinc"] = (
+            current_f_status_sinc  # Adicionar ao contexto
         )
 
+        return {
+            "entidade": "fornecedores",
+            "codi_emp": codi_emp,
+            "filters": fornecedor_filters,  # Filtros do ODBC (ou do espelho local)
+            "page_number": f_page_number,
+            "page_size": fornecedor_page_size,
+        }
+
+    def _montar_fornecedores(self, request, codi_emp, consulta, resultado, context):
+        """Lista e paginação de fornecedores a partir do resultado (None = fora do prazo)."""
+        f_page_number = consulta["page_number"]
+        fornecedor_page_size = consulta["page_size"]
+        current_f_status_sinc = context["current_f_status_sinc"]
+        fornecedores_result = resultado or {}
+
         fornecedores_list_com_status = []  # Inicializa a lista final
         fornecedores_total_records_odbc = (
             0  # Total de registros retornados pelo ODBC para a página atual
@@ -642,8 +759,8 @@ class EmpresaDetailView(View):
         )
 
         if fornecedores_result.get("error"):
-            messages.error(
-                request, f"Erro ao buscar fornecedores: {fornecedores_result['error']}"
+            context["fornecedores_erro"] = (
+                f"Erro ao buscar fornecedores: {fornecedores_result['error']}"
             )
         else:
             fornecedores_raw_odbc = fornecedores_result.get("data", [])
@@ -753,15 +870,9 @@ class EmpresaDetailView(View):
 
         context["fornecedores_list"] = fornecedores_list_com_status
         context["fornecedores_page_obj"] = fornecedores_page_obj
-        context["current_f_codi_for"] = current_f_codi_for
-        context["current_f_nome_for"] = current_f_nome_for
-        context["current_f_cgce_for"] = current_f_cgce_for
-        context["current_f_status_sinc"] = (
-            current_f_status_sinc  # Adicionar ao contexto
-        )
-        # --- Fim da Lógica para Fornecedores ---
 
-        # --- Início da Lógica para Clientes ---
+    def _preparar_clientes(self, request, codi_emp, context):
+        """Lê os filtros e a página de clientes; retorna os argumentos de listar()."""
         cliente_page_size = 50
         current_c_codi_cli = request.GET.get("c_codi_cli", None)
         current_c_nome_cli = request.GET.get("c_nome_cli", None)
@@ -800,20 +911,31 @@ class EmpresaDetailView(View):
             f"Buscando clientes para empresa {codi_emp} com filtros ODBC: {cliente_filters}, página: {c_page_number}"
         )
 
-        clientes_result = odbc_manager.list_clientes_empresa(
-            codi_emp=codi_emp,
-            filters=cliente_filters,
-            page_number=c_page_number,
-            page_size=cliente_page_size,
-        )
+        context["current_c_codi_cli"] = current_c_codi_cli
+        context["current_c_nome_cli"] = current_c_nome_cli
+        context["current_c_cgce_cli"] = current_c_cgce_cli
+
+        return {
+            "entidade": "clientes",
+            "codi_emp": codi_emp,
+            "filters": cliente_filters,
+            "page_number": c_page_number,
+            "page_size": cliente_page_size,
+        }
+
+    def _montar_clientes(self, request, codi_emp, consulta, resultado, context):
+        """Lista e paginação de clientes a partir do resultado (None = fora do prazo)."""
+        c_page_number = consulta["page_number"]
+        cliente_page_size = consulta["page_size"]
+        clientes_result = resultado or {}
 
         clientes_list = []
         clientes_total_records_odbc = 0
         clientes_total_pages_odbc = 0
 
         if clientes_result.get("error"):
-            messages.error(
-                request, f"Erro ao buscar clientes: {clientes_result['error']}"
+            context["clientes_erro"] = (
+                f"Erro ao buscar clientes: {clientes_result['error']}"
             )
         else:
             clientes_list = clientes_result.get("data", [])
@@ -846,12 +968,9 @@ class EmpresaDetailView(View):
 
         context["clientes_list"] = clientes_list
         context["clientes_page_obj"] = clientes_page_obj
-        context["current_c_codi_cli"] = current_c_codi_cli
-        context["current_c_nome_cli"] = current_c_nome_cli
-        context["current_c_cgce_cli"] = current_c_cgce_cli
-        # --- Fim da Lógica para Clientes ---
 
-        # --- Início da Lógica para Planos de Contas ---
+    def _preparar_plano_contas(self, request, codi_emp, context):
+        """Lê os filtros e a página de planos de contas; retorna os argumentos de listar()."""
         plano_contas_page_size = 50
         current_pc_codi_cta = request.GET.get("pc_codi_cta", None)
         current_pc_nome_cta = request.GET.get("pc_nome_cta", None)
@@ -890,21 +1009,31 @@ class EmpresaDetailView(View):
             f"Buscando planos de contas para empresa {codi_emp} com filtros ODBC: {plano_contas_filters}, página: {pc_page_number}"
         )
 
-        plano_contas_result = odbc_manager.list_plano_de_contas_empresa(
-            codi_emp=codi_emp,
-            filters=plano_contas_filters,
-            page_number=pc_page_number,
-            page_size=plano_contas_page_size,
-        )
+        context["current_pc_codi_cta"] = current_pc_codi_cta
+        context["current_pc_nome_cta"] = current_pc_nome_cta
+        context["current_pc_clas_cta"] = current_pc_clas_cta
+
+        return {
+            "entidade": "planos_de_contas",
+            "codi_emp": codi_emp,
+            "filters": plano_contas_filters,
+            "page_number": pc_page_number,
+            "page_size": plano_contas_page_size,
+        }
+
+    def _montar_plano_contas(self, request, codi_emp, consulta, resultado, context):
+        """Lista e paginação de planos de contas a partir do resultado (None = fora do prazo)."""
+        pc_page_number = consulta["page_number"]
+        plano_contas_page_size = consulta["page_size"]
+        plano_contas_result = resultado or {}
 
         plano_contas_list = []
         plano_contas_total_records_odbc = 0
         plano_contas_total_pages_odbc = 0
 
         if plano_contas_result.get("error"):
-            messages.error(
-                request,
-                f"Erro ao buscar planos de contas: {plano_contas_result['error']}",
+            context["plano_contas_erro"] = (
+                f"Erro ao buscar planos de contas: {plano_contas_result['error']}"
             )
         else:
             plano_contas_list = plano_contas_result.get("data", [])
@@ -945,12 +1074,9 @@ class EmpresaDetailView(View):
 
         context["plano_contas_list"] = plano_contas_list
         context["plano_contas_page_obj"] = plano_contas_page_obj
-        context["current_pc_codi_cta"] = current_pc_codi_cta
-        context["current_pc_nome_cta"] = current_pc_nome_cta
-        context["current_pc_clas_cta"] = current_pc_clas_cta
-        # --- Fim da Lógica para Planos de Contas ---
 
-        # --- Início da Lógica para Acumuladores ---
+    def _preparar_acumuladores(self, request, codi_emp, context):
+        """Lê os filtros e a página de acumuladores; retorna os argumentos de listar()."""
         acumuladores_page_size = 50
         current_ac_codi_acu = request.GET.get("ac_codi_acu", None)
         current_ac_nome_acu = request.GET.get("ac_nome_acu", None)
@@ -989,21 +1115,31 @@ class EmpresaDetailView(View):
             f"Buscando acumuladores para empresa {codi_emp} com filtros ODBC: {acumuladores_filters}, página: {ac_page_number}"
         )
 
-        acumuladores_result = odbc_manager.list_acumuladores_empresa(
-            codi_emp=codi_emp,
-            filters=acumuladores_filters,
-            page_number=ac_page_number,
-            page_size=acumuladores_page_size,
-        )
+        context["current_ac_codi_acu"] = current_ac_codi_acu
+        context["current_ac_nome_acu"] = current_ac_nome_acu
+        context["current_ac_descricao_acu"] = current_ac_descricao_acu
+
+        return {
+            "entidade": "acumuladores",
+            "codi_emp": codi_emp,
+            "filters": acumuladores_filters,
+            "page_number": ac_page_number,
+            "page_size": acumuladores_page_size,
+        }
+
+    def _montar_acumuladores(self, request, codi_emp, consulta, resultado, context):
+        """Lista e paginação de acumuladores a partir do resultado (None = fora do prazo)."""
+        ac_page_number = consulta["page_number"]
+        acumuladores_page_size = consulta["page_size"]
+        acumuladores_result = resultado or {}
 
         acumuladores_list = []
         acumuladores_total_records_odbc = 0
         acumuladores_total_pages_odbc = 0
 
         if acumuladores_result.get("error"):
-            messages.error(
-                request,
-                f"Erro ao buscar acumuladores: {acumuladores_result['error']}",
+            context["acumuladores_erro"] = (
+                f"Erro ao buscar acumuladores: {acumuladores_result['error']}"
             )
         else:
             acumuladores_list = acumuladores_result.get("data", [])
@@ -1044,11 +1180,23 @@ class EmpresaDetailView(View):
 
         context["acumuladores_list"] = acumuladores_list
         context["acumuladores_page_obj"] = acumuladores_page_obj
-        context["current_ac_codi_acu"] = current_ac_codi_acu
-        context["current_ac_nome_acu"] = current_ac_nome_acu
-        context["current_ac_descricao_acu"] = current_ac_descricao_acu
-        # --- Fim da Lógica para Acumuladores ---
 
+
+class EmpresaAbaView(EmpresaDetailView):
+    """
+    Conteúdo de uma aba dos detalhes da empresa (lista e paginação), buscado
+    pelo navegador quando a aba é aberta ou paginada.
+    """
+
+    template_name = "sync/partials/empresa_aba.html"
+
+    def get(self, request, codi_emp, aba, *args, **kwargs):
+        if aba not in self.ABAS:
+            raise Http404("Aba inexistente.")
+        chave = self.ABAS[aba]
+        context = {"empresa": {"codi_emp": codi_emp}, "aba": aba}
+        consulta = getattr(self, f"_preparar_{chave}")(request, codi_emp, context)
+        self._carregar_aba(request, codi_emp, chave, consulta, context)
         return render(request, self.template_name, context)
 
 
@@ -1128,6 +1276,9 @@ def api_manage_fiscaut_config(request):
                         "success": True,
                         "api_url": config.api_url,
                         "api_key": config.api_key,  # Lembre-se de que a chave está em texto plano
+                        "requisicoes_por_segundo": config.requisicoes_por_segundo,
+                        "rajada_maxima": config.rajada_maxima,
+                        "tamanho_lote_envio": config.tamanho_lote_envio,
                     }
                 )
             else:
@@ -1172,6 +1323,38 @@ def api_manage_fiscaut_config(request):
                     {"success": False, "message": "URL da API inválida."}, status=400
                 )
 
+            # Limite de taxa (opcional; mantém o valor atual se não for enviado)
+            limites = {}
+            try:
+                if data.get("requisicoesPorSegundo") not in (None, ""):
+                    limites["requisicoes_por_segundo"] = float(
+                        data["requisicoesPorSegundo"]
+                    )
+                if data.get("rajadaMaxima") not in (None, ""):
+                    limites["rajada_maxima"] = int(data["rajadaMaxima"])
+                if data.get("tamanhoLoteEnvio") not in (None, ""):
+                    limites["tamanho_lote_envio"] = int(data["tamanhoLoteEnvio"])
+            except (TypeError, ValueError):
+                return JsonResponse(
+                    {
+                        "success": False,
+                        "message": "Requisições por segundo, rajada máxima e fornecedores por requisição devem ser numéricos.",
+                    },
+                    status=400,
+                )
+            if (
+                limites.get("requisicoes_por_segundo", 0) < 0
+                or limites.get("rajada_maxima", 1) < 1
+                or limites.get("tamanho_lote_envio", 1) < 1
+            ):
+                return JsonResponse(
+                    {
+                        "success": False,
+                        "message": "Requisições por segundo não pode ser negativa; rajada máxima e fornecedores por requisição devem ser ao menos 1.",
+                    },
+                    status=400,
+                )
+
             config, created = FiscautApiConfig.objects.update_or_create(
                 # Como queremos uma única config, podemos usar um ID fixo se soubermos que é sempre 1,
                 # ou buscar o primeiro objeto e atualizar seus campos, ou criar se não existir.
@@ -1185,10 +1368,14 @@ def api_manage_fiscaut_config(request):
             if existing_config:
                 existing_config.api_url = api_url
                 existing_config.api_key = api_key
+                for campo, valor in limites.items():
+                    setattr(existing_config, campo, valor)
                 existing_config.save()
                 logger.info(f"Configuração da API Fiscaut atualizada: URL={api_url}")
             else:
-                FiscautApiConfig.objects.create(api_url=api_url, api_key=api_key)
+                FiscautApiConfig.objects.create(
+                    api_url=api_url, api_key=api_key, **limites
+                )
                 logger.info(f"Configuração da API Fiscaut criada: URL={api_url}")
 
             return JsonResponse(
@@ -1561,161 +1748,25 @@ class SincronizarFornecedoresLoteView(APIView):
                 "razao_emp", f"Empresa {codi_emp}"
             )
 
-            logger.info(
-                f"Sinc. Lote: Iniciando busca de fornecedores para empresa {codi_emp} - {nome_empresa_para_log} (CNPJ: {cnpj_empresa_para_sinc})."
+            # 2. A extração e o enfileiramento rodam em segundo plano; aqui só
+            # registramos o job e devolvemos o id para acompanhamento.
+            job = sincronizacao_lote_service.iniciar_job(
+                codi_emp=codi_emp, cnpj_empresa=cnpj_empresa_para_sinc
             )
-
-            # 2. Listar TODOS os fornecedores da empresa via ODBC, implementando paginação manual.
-            todos_fornecedores_odbc_data_list = []
-            page_number = 1
-            page_size_para_busca = (
-                100  # Buscar em lotes de 100, ajuste conforme necessário
-            )
-            max_paginas_seguranca = (
-                500  # Limite de segurança para evitar loops infinitos
-            )
-            paginas_buscadas = 0
-
-            while paginas_buscadas < max_paginas_seguranca:
-                logger.debug(
-                    f"Sinc. Lote: Buscando fornecedores da empresa {codi_emp}, página {page_number}, tamanho {page_size_para_busca}"
-                )
-                resultado_pagina_fornecedores = odbc_manager.list_fornecedores_empresa(
-                    codi_emp=codi_emp,
-                    filters={},  # Sem filtros específicos para buscar todos
-                    page_number=page_number,
-                    page_size=page_size_para_busca,
-                )
-
-                if resultado_pagina_fornecedores.get("error"):
-                    error_msg = resultado_pagina_fornecedores.get("error")
-                    logger.error(
-                        f"Sinc. Lote: Erro ao buscar página {page_number} de fornecedores da empresa {codi_emp} via ODBC: {error_msg}"
-                    )
-                    return Response(
-                        {
-                            "success": False,
-                            "message": f"Erro ao buscar fornecedores (página {page_number}) para a empresa {codi_emp} via ODBC: {error_msg}",
-                        },
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    )
-
-                fornecedores_nesta_pagina = resultado_pagina_fornecedores.get(
-                    "data", []
-                )
-
-                if not fornecedores_nesta_pagina:
-                    logger.debug(
-                        f"Sinc. Lote: Página {page_number} não retornou fornecedores. Fim da busca para empresa {codi_emp}."
-                    )
-                    break
-
-                todos_fornecedores_odbc_data_list.extend(fornecedores_nesta_pagina)
-                logger.debug(
-                    f"Sinc. Lote: {len(fornecedores_nesta_pagina)} fornecedores adicionados da página {page_number}. Total parcial: {len(todos_fornecedores_odbc_data_list)}."
-                )
-
-                if len(fornecedores_nesta_pagina) < page_size_para_busca:
-                    logger.debug(
-                        f"Sinc. Lote: Página {page_number} retornou menos que o page_size ({len(fornecedores_nesta_pagina)} < {page_size_para_busca}). Assumindo ser a última página."
-                    )
-                    break
-
-                page_number += 1
-                paginas_buscadas += 1
-                if paginas_buscadas >= max_paginas_seguranca:
-                    logger.warning(
-                        f"Sinc. Lote: Atingido o limite máximo de {max_paginas_seguranca} páginas buscadas para empresa {codi_emp}. Interrompendo busca."
-                    )
-                    break
-
-            if not todos_fornecedores_odbc_data_list:
-                logger.info(
-                    f"Sinc. Lote: Nenhum fornecedor encontrado para a empresa {codi_emp} ({nome_empresa_para_log}) via ODBC."
-                )
-                return Response(
-                    {
-                        "success": True,
-                        "message": f"Nenhum fornecedor encontrado para a empresa {codi_emp} ({nome_empresa_para_log}) para sincronizar.",
-                    },
-                    status=status.HTTP_200_OK,
-                )
-
             logger.info(
-                f"Sinc. Lote: {len(todos_fornecedores_odbc_data_list)} fornecedores encontrados via ODBC para empresa {codi_emp}. Verificando elegibilidade..."
-            )
-            contador_tarefas_enfileiradas = 0
-
-            for fornecedor_data in todos_fornecedores_odbc_data_list:
-                codi_for_odbc = str(fornecedor_data.get("codi_for", "")).strip()
-                cnpj_fornecedor = str(fornecedor_data.get("cgce_for", "")).strip()
-                nome_fornecedor = str(
-                    fornecedor_data.get("razao_social", "")
-                    or fornecedor_data.get("nome_for", "")
-                ).strip()
-                conta_contabil_fornecedor = str(
-                    fornecedor_data.get("codi_cta", "")
-                    or fornecedor_data.get("conta_ctb", "")
-                ).strip()
-
-                if not codi_for_odbc:
-                    logger.debug(
-                        f"Sinc. Lote: Fornecedor da empresa {codi_emp} ignorado (sem codi_for). Data: {fornecedor_data}"
-                    )
-                    continue
-                if not cnpj_fornecedor:
-                    logger.debug(
-                        f"Sinc. Lote: Fornecedor {codi_for_odbc} ({nome_fornecedor if nome_fornecedor else 'Nome não disponível'}) da empresa {codi_emp} ignorado (sem CNPJ)."
-                    )
-                    continue
-                if not nome_fornecedor:
-                    logger.debug(
-                        f"Sinc. Lote: Fornecedor {codi_for_odbc} (CNPJ: {cnpj_fornecedor}) da empresa {codi_emp} ignorado (sem nome)."
-                    )
-                    continue
-
-                status_valido_para_sinc = False
-                try:
-                    status_obj = FornecedorStatusSincronizacao.objects.get(
-                        codi_emp_odbc=codi_emp,  # codi_emp é int
-                        codi_for_odbc=codi_for_odbc,  # codi_for_odbc é str
-                    )
-                    if status_obj.status_sincronizacao in ["NAO_SINCRONIZADO", "ERRO"]:
-                        status_valido_para_sinc = True
-                except FornecedorStatusSincronizacao.DoesNotExist:
-                    status_valido_para_sinc = True
-
-                if status_valido_para_sinc:
-                    logger.info(
-                        f"Sinc. Lote: Enfileirando tarefa para Forn. ODBC {codi_for_odbc} (CNPJ: {cnpj_fornecedor}, Nome: {nome_fornecedor}) da Emp. {codi_emp}"
-                    )
-                    processar_sincronizacao_fornecedor_task(
-                        cnpj_empresa=cnpj_empresa_para_sinc,
-                        nome_fornecedor=nome_fornecedor,
-                        cnpj_fornecedor=cnpj_fornecedor,
-                        conta_contabil_fornecedor=conta_contabil_fornecedor,
-                        codi_emp_odbc=codi_emp,
-                        codi_for_odbc=codi_for_odbc,
-                    )
-                    contador_tarefas_enfileiradas += 1
-                else:
-                    logger.debug(
-                        f"Sinc. Lote: Fornecedor ODBC {codi_for_odbc} (Nome: {nome_fornecedor}) da emp {codi_emp} não elegível para sinc. Status: {status_obj.get_status_sincronizacao_display()} (ID: {status_obj.id if hasattr(status_obj, 'id') else 'N/A'})."
-                    )
-
-            msg = (
-                f"{contador_tarefas_enfileiradas} tarefas de sincronização de fornecedores foram enfileiradas para a empresa {codi_emp} - {nome_empresa_para_log}."
-                if contador_tarefas_enfileiradas > 0
-                else f"Nenhum fornecedor elegível para sincronização encontrado para a empresa {codi_emp} - {nome_empresa_para_log}."
+                f"Sinc. Lote: Job {job.id} agendado para empresa {codi_emp} - {nome_empresa_para_log} (CNPJ: {cnpj_empresa_para_sinc})."
             )
-            logger.info(f"Sinc. Lote: Concluído para empresa {codi_emp}. {msg}")
             return Response(
                 {
                     "success": True,
-                    "message": msg,
-                    "tarefas_enfileiradas": contador_tarefas_enfileiradas,
+                    "message": f"Sincronização em lote iniciada para a empresa {codi_emp} - {nome_empresa_para_log}. Os fornecedores elegíveis serão enfileirados em segundo plano.",
+                    "job_id": str(job.id),
+                    "status_url": reverse(
+                        "sync_api_sincronizar_fornecedores_lote_status",
+                        kwargs={"job_id": job.id},
+                    ),
                 },
-                status=status.HTTP_200_OK,
+                status=status.HTTP_202_ACCEPTED,
             )
 
         except Exception as e:
@@ -1729,6 +1780,88 @@ class SincronizarFornecedoresLoteView(APIView):
             )
 
 
+class SincronizacaoLoteStatusView(APIView):
+    """
+    Retorna o andamento de um job de sincronização em lote.
+    """
+
+    def get(self, request, job_id, *args, **kwargs):
+        job = get_object_or_404(SincronizacaoLoteJob, pk=job_id)
+        finalizado = job.status in (
+            SincronizacaoLoteJob.STATUS_CONCLUIDO,
+            SincronizacaoLoteJob.STATUS_ERRO,
+        )
+        return Response(
+            {
+                "success": job.status != SincronizacaoLoteJob.STATUS_ERRO,
+                "job_id": str(job.id),
+                "codi_emp": job.codi_emp,
+                "status": job.status,
+                "status_display": job.get_status_display(),
+                "finalizado": finalizado,
+                "fornecedores_lidos": job.fornecedores_lidos,
+                "fornecedores_ignorados": job.fornecedores_ignorados,
+                "fornecedores_enfileirados": job.fornecedores_enfileirados,
+                "tarefas_enfileiradas": job.tarefas_enfileiradas,
+                "message": job.mensagem,
+                "created_at": job.created_at,
+                "finished_at": job.finished_at,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class LogAnaliseView(TemplateView):
+    """
+    Análise dos logs ao longo do tempo: volume por nível (por hora até 2 dias,
+    por dia acima disso) e módulos com mais erros, lidos do resumo de logs.
+    """
+
+    template_name = "sync/log_analise.html"
+    PERIODOS_DIAS = (1, 2, 7, 30, 90)
+    PERIODO_PADRAO = 7
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        try:
+            dias = int(self.request.GET.get("dias", self.PERIODO_PADRAO))
+        except ValueError:
+            dias = self.PERIODO_PADRAO
+        if dias not in self.PERIODOS_DIAS:
+            dias = self.PERIODO_PADRAO
+        modulo = self.request.GET.get("modulo", "").strip()
+
+        por_dia = dias > 2
+        if por_dia:
+            hoje = timezone.localtime().replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
+            inicio, fim = hoje - timedelta(days=dias - 1), hoje + timedelta(days=1)
+        else:
+            inicio, fim = _ultimas_horas(24 * dias)
+
+        serie = log_resumo_service.serie(inicio, fim, por_dia=por_dia, modulo=modulo)
+        totais = log_resumo_service.totais(inicio, fim, modulo=modulo)
+        context.update(
+            {
+                "active_page": "logs",
+                "dias": dias,
+                "periodos_dias": self.PERIODOS_DIAS,
+                "modulo": modulo,
+                "por_dia": por_dia,
+                "grafico": _grafico_logs(serie, por_dia=por_dia),
+                "totais": totais,
+                "total_geral": sum(totais.values()),
+                "cores_niveis_log": CORES_NIVEIS_LOG,
+                "modulos_erros": log_resumo_service.modulos(inicio, fim),
+                "modulos_avisos": log_resumo_service.modulos(
+                    inicio, fim, niveis=("WARNING",)
+                ),
+            }
+        )
+        return context
+
+
 class ApplicationLogsView(ListView):
     model = ApplicationLog
     template_name = "sync/application_logs.html"
@@ -1744,12 +1877,13 @@ class ApplicationLogsView(ListView):
 
         if log_level:
             queryset = queryset.filter(level=log_level)
-        if message_contains:
-            queryset = queryset.filter(message__icontains=message_contains)
-        if module_filter:
-            queryset = queryset.filter(module__icontains=module_filter)
-        if func_name_filter:
-            queryset = queryset.filter(func_name__icontains=func_name_filter)
+        # Filtros de texto pelo índice FTS5 dos logs (icontains se indisponível)
+        queryset = log_busca_service.filtrar(
+            queryset,
+            message=message_contains,
+            module=module_filter,
+            func_name=func_name_filter,
+        )
 
         return queryset
 
@@ -1794,9 +1928,11 @@ class ApplicationLogsView(ListView):
 
         elif action == "delete_all_logs":
             try:
-                ApplicationLog.objects.all().delete()
+                # Em lotes: um único DELETE da tabela inteira travaria o banco
+                apagados = log_retencao_service.apagar_todos()
                 messages.success(
-                    request, "Todos os logs da aplicação foram excluídos com sucesso."
+                    request,
+                    f"Todos os logs da aplicação foram excluídos com sucesso ({apagados} registros).",
                 )
             except Exception as e:
                 messages.error(request, f"Erro ao excluir todos os logs: {e}")